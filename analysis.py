@@ -0,0 +1,241 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sys
+
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 2
+FILE_FIELD = "file"     # Pseudo-field to group by: the name of the results file (one per seed)
+# The key=value fields that are results, not hyperparameters
+GAP_PREFIX = b"gap_to_optimum="
+STOP_REASON_PREFIX = b"stop_reason="
+
+"""Configuration of a run: its 'name=value' hyperparameter fields, as written in the results file"""
+ConfigurationKey = Tuple[str, ...]
+
+
+"""Mergeable sums and counts of a set of runs; a run is solved when it reached the optimum"""
+class RunStats:
+    __slots__ = ("runs", "fitness_sum", "best_fitness", "generations_sum", "solved", "solved_generations_sum", "stop_reasons")
+
+    def __init__(self, runs: int = 0, fitness_sum: float = 0.0, best_fitness: float = float("inf"),
+                 generations_sum: int = 0, solved: int = 0, solved_generations_sum: int = 0,
+                 stop_reasons: Optional[Dict[str, int]] = None) -> None:
+        self.runs: int = runs
+        self.fitness_sum: float = fitness_sum
+        self.best_fitness: float = best_fitness
+        self.generations_sum: int = generations_sum
+        self.solved: int = solved
+        self.solved_generations_sum: int = solved_generations_sum
+        self.stop_reasons: Dict[str, int] = {} if stop_reasons is None else stop_reasons
+
+    def add_run(self, n_generation: int, best_fitness: float, solved: bool, stop_reason: Optional[str] = None) -> None:
+        self.runs += 1
+        self.fitness_sum += best_fitness
+        if best_fitness < self.best_fitness:
+            self.best_fitness = best_fitness
+        self.generations_sum += n_generation
+        if solved:
+            self.solved += 1
+            self.solved_generations_sum += n_generation
+        if stop_reason is not None:
+            self.stop_reasons[stop_reason] = self.stop_reasons.get(stop_reason, 0) + 1
+
+    def add(self, other: "RunStats") -> None:
+        self.runs += other.runs
+        self.fitness_sum += other.fitness_sum
+        self.best_fitness = min(self.best_fitness, other.best_fitness)
+        self.generations_sum += other.generations_sum
+        self.solved += other.solved
+        self.solved_generations_sum += other.solved_generations_sum
+        for (stop_reason,runs) in other.stop_reasons.items():
+            self.stop_reasons[stop_reason] = self.stop_reasons.get(stop_reason, 0) + runs
+
+    def mean_fitness(self) -> float:
+        return self.fitness_sum / self.runs
+
+    def mean_generations(self) -> float:
+        return self.generations_sum / self.runs
+
+    """Mean number of generations of the solved runs (None when none was solved)"""
+    def mean_generations_to_solution(self) -> Optional[float]:
+        return self.solved_generations_sum / self.solved if self.solved > 0 else None
+
+    def to_list(self) -> list:
+        return [self.runs, self.fitness_sum, self.best_fitness, self.generations_sum, self.solved, self.solved_generations_sum, self.stop_reasons]
+
+
+"""Stats of every configuration in a results file up to 'offset', the end of the line hashed in 'tail_hash'"""
+class FileSummary:
+    def __init__(self, offset: int = 0, tail_hash: str = "", configurations: Optional[Dict[ConfigurationKey, RunStats]] = None) -> None:
+        self.offset: int = offset
+        self.tail_hash: str = tail_hash
+        self.configurations: Dict[ConfigurationKey, RunStats] = {} if configurations is None else configurations
+
+
+"""Name and value of every hyperparameter field of a configuration"""
+def configuration_fields(key: ConfigurationKey) -> Dict[str, str]:
+    return dict(field.split("=", 1) for field in key)
+
+
+def line_hash(line: bytes) -> str:
+    return hashlib.sha256(line).hexdigest()
+
+
+"""Adds the runs of the complete lines of 'buffer' from 'offset' on to the summary"""
+def scan(buffer, offset: int, summary: FileSummary) -> None:
+    configurations = summary.configurations
+    line_start = None
+
+    while True:
+        newline = buffer.find(b"\n", offset)
+        if newline < 0:
+            break
+        (line_start, line) = (offset, buffer[offset:newline])
+        offset = newline + 1
+        if len(line) == 0:
+            continue
+
+        fields = line.split(b";")
+        n_generation = int(fields[0])
+        best_fitness = float(fields[1])
+        # fields[2] is the gene list, the last one is empty (the line ends with ';')
+        gap: Optional[float] = None
+        stop_reason: Optional[str] = None
+        key: List[str] = []
+        for field in fields[3:-1]:
+            if field.startswith(GAP_PREFIX):
+                gap = float(field[len(GAP_PREFIX):])
+            elif field.startswith(STOP_REASON_PREFIX):
+                stop_reason = field[len(STOP_REASON_PREFIX):].decode()
+            else:
+                key.append(field.decode())
+
+        stats = configurations.get(tuple(key))
+        if stats is None:
+            stats = configurations[tuple(key)] = RunStats()
+        stats.add_run(n_generation, best_fitness, (best_fitness if gap is None else gap) <= 0, stop_reason)
+
+    if line_start is not None:
+        summary.offset = offset
+        summary.tail_hash = line_hash(buffer[line_start:offset])
+
+
+def load_index(path: str) -> Optional[FileSummary]:
+    try:
+        with open(path, "r") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != INDEX_VERSION:
+        return None
+    return FileSummary(
+        index["offset"],
+        index["tail_hash"],
+        {tuple(key): RunStats(*stats) for (key,stats) in index["configurations"]}
+    )
+
+
+def save_index(path: str, summary: FileSummary) -> None:
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w") as f:
+        json.dump({
+            "version": INDEX_VERSION,
+            "offset": summary.offset,
+            "tail_hash": summary.tail_hash,
+            "configurations": [[list(key), stats.to_list()] for (key,stats) in summary.configurations.items()]
+        }, f)
+    os.replace(temporary_path, path)
+
+
+"""Whether the indexed part of the file is still there, unchanged (results files are
+only appended to)"""
+def index_is_valid(buffer, summary: FileSummary) -> bool:
+    if summary.offset == 0:
+        return True
+    if summary.offset > len(buffer)  or  buffer[summary.offset-1:summary.offset] != b"\n":
+        return False
+    start = buffer.rfind(b"\n", 0, summary.offset-1) + 1
+    return line_hash(buffer[start:summary.offset]) == summary.tail_hash
+
+
+"""Summary of a memory-mapped results file, kept up to date in an index file next to it with 'use_index'"""
+def summarize_file(path: str, use_index: bool = True) -> FileSummary:
+    index_path = path + INDEX_SUFFIX
+    summary = load_index(index_path) if use_index else None
+
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return FileSummary()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if summary is None  or  not index_is_valid(buffer, summary):
+                summary = FileSummary()
+            indexed_offset = summary.offset
+            scan(buffer, summary.offset, summary)
+
+    if use_index  and  summary.offset != indexed_offset:
+        save_index(index_path, summary)
+    return summary
+
+
+"""Stats of the runs of all the files grouped by the values of the 'group_by' fields"""
+def aggregate(paths: Iterable[str], group_by: List[str], use_index: bool = True) -> Dict[Tuple[str, ...], RunStats]:
+    groups: Dict[Tuple[str, ...], RunStats] = {}
+    for path in paths:
+        file_name = os.path.basename(path)
+        for (key,stats) in summarize_file(path, use_index).configurations.items():
+            fields = configuration_fields(key)
+            fields[FILE_FIELD] = file_name
+            group = tuple(fields.get(name, "") for name in group_by)
+            total = groups.get(group)
+            if total is None:
+                total = groups[group] = RunStats()
+            total.add(stats)
+    return groups
+
+
+"""Groups from best to worst: by mean fitness, then by mean number of generations"""
+def ranked_groups(groups: Dict[Tuple[str, ...], RunStats]) -> Iterator[Tuple[Tuple[str, ...], RunStats]]:
+    ranking = sorted(groups, key=lambda group: (groups[group].mean_fitness(), groups[group].mean_generations()))
+    for group in ranking:
+        yield group, groups[group]
+
+
+"""One semicolon separated line per group, with the same name=value style as the results files"""
+def format_group(group_by: List[str], group: Tuple[str, ...], stats: RunStats) -> str:
+    to_solution = stats.mean_generations_to_solution()
+    return "".join(
+        [f"{name}={value};" for (name,value) in zip(group_by, group)] + [
+        f"runs={stats.runs};",
+        f"best_fitness={stats.best_fitness};",
+        f"mean_fitness={stats.mean_fitness()};",
+        f"mean_generations={stats.mean_generations()};",
+        f"solved={stats.solved};",
+        f"mean_generations_to_solution={'' if to_solution is None else to_solution};",
+        f"stop_reasons={','.join(f'{reason}:{runs}' for (reason,runs) in sorted(stats.stop_reasons.items()))};",
+        "\n"
+    ])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Aggregates the results files of the sweeps (results_{seed}.txt) by hyperparameter, in a single streaming pass")
+    parser.add_argument("paths", nargs="+", metavar="PATH", help="results files, merged together")
+    parser.add_argument("--by", nargs="*", default=[], metavar="FIELD", help=f"hyperparameter fields to group by (e.g. selection_method m_updater, or '{FILE_FIELD}' for one group per file)")
+    parser.add_argument("--top", type=int, default=None, help="only the best groups")
+    parser.add_argument("--no-index", action="store_true", help=f"scan the files without reading or writing their {INDEX_SUFFIX} index")
+    args = parser.parse_args(argv)
+
+    groups = aggregate(args.paths, args.by, not args.no_index)
+    for (rank,(group,stats)) in enumerate(ranked_groups(groups)):
+        if args.top is not None  and  rank >= args.top:
+            break
+        sys.stdout.write(format_group(args.by, group, stats))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
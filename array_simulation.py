@@ -0,0 +1,337 @@
+from typing import List, Optional, Tuple
+import bisect
+from individual import Individual
+from sequence.sequence import Sequence, ARITHMETIC_OPERATORS, encode_operators
+from sequence.sequence_evaluator import SequenceEvaluator
+from operators.crossover import CrossoverOperator
+from operators.mutation import MutationOperator
+from operators.selection import SelectionOperator
+from population import BestSelector
+from result_sink import ResultSink, SimulationRecord
+from instrumentation import SimulationInstrumentation, NULL_INSTRUMENTATION, SELECTION, CROSSOVER, MUTATION, REPLACEMENT, EVALUATION, REPORT
+import random
+import m_updater
+import rng
+from rng import GLOBAL_GENERATOR
+import simulation
+from termination import TerminationPolicy
+from convergence_trace import ConvergenceTrace
+
+"""Genes of the matrix are operator codes, i.e. positions in ARITHMETIC_OPERATORS"""
+OPERATOR_CODES = range(len(ARITHMETIC_OPERATORS))
+
+
+"""Struct-of-arrays population: the genes are the rows of a flat uint8 matrix, the fitness values a parallel list"""
+class GeneMatrix:
+    def __init__(self, genes: bytearray, n_genes: int, fitness_values: List[float]) -> None:
+        assert n_genes > 0
+        assert len(genes) == n_genes * len(fitness_values)
+        self.genes: bytearray = genes
+        self.n_genes: int = n_genes
+        self.fitness_values: List[float] = fitness_values
+
+    @staticmethod
+    def stack(rows: List[bytearray], n_genes: int, fitness_values: List[float]) -> "GeneMatrix":
+        assert len(rows) == len(fitness_values)
+        return GeneMatrix(bytearray().join(rows), n_genes, fitness_values)
+
+    def row(self, i: int) -> bytearray:
+        return self.genes[i*self.n_genes : (i+1)*self.n_genes]
+
+    def take(self, indices: List[int]) -> List[bytearray]:
+        return [self.row(i) for i in indices]
+
+    def take_fitness(self, indices: List[int]) -> List[float]:
+        return [self.fitness_values[i] for i in indices]
+
+    """Same matrix with the rows reordered by fitness, best first (ties keep their order)"""
+    def ordered(self, minimize: bool) -> "GeneMatrix":
+        order = sorted(range(len(self)), key=self.fitness_values.__getitem__, reverse=(not minimize))
+        return GeneMatrix.stack(self.take(order), self.n_genes, self.take_fitness(order))
+
+    """Position of the first row with the lowest fitness (like min() over Individuals)"""
+    def best_index(self) -> int:
+        return min(range(len(self)), key=self.fitness_values.__getitem__)
+
+    def to_population(self) -> List[Sequence]:
+        population: List[Sequence] = []
+        for (i,fitness_value) in enumerate(self.fitness_values):
+            individual = Sequence(decode_row(self.row(i)))
+            individual.set_fitness_value(fitness_value)
+            population.append(individual)
+        return population
+
+    def __len__(self) -> int:
+        return len(self.fitness_values)
+
+
+def decode_row(row: bytearray) -> List[str]:
+    return [ARITHMETIC_OPERATORS[code] for code in row]
+
+
+"""Array version of simulation.do_crossover: shuffles the parent rows and crosses
+consecutive pairs in one call, consuming the random numbers in the same order"""
+def crossover_rows(
+    parents: List[bytearray],
+    crossover_probability: float,
+    crossover_operator: CrossoverOperator,
+    generator: random.Random = GLOBAL_GENERATOR
+) -> List[bytearray]:
+    assert len(parents) % 2 == 0
+    assert 0 <= crossover_probability <= 1
+
+    generator.shuffle(parents)
+    pairs = [(parents[i], parents[i-1]) for i in range(len(parents)-1, 0, -2)]
+
+    offspring: List[bytearray] = []
+    for (_,genes1,genes2) in crossover_operator.crossover_pairs(pairs, crossover_probability, generator):
+        offspring.append(genes1)
+        offspring.append(genes2)
+
+    return offspring
+
+
+"""Array version of simulation.mutate_population. It modifies the rows"""
+def mutate_rows(
+    rows: List[bytearray],
+    mutation_operator: MutationOperator,
+    mutation_probability: float,
+    generator: random.Random = GLOBAL_GENERATOR
+) -> None:
+    assert 0 <= mutation_probability <= 1
+    for row in rows:
+        mutation_operator.mutate_genes(row, mutation_probability, OPERATOR_CODES, generator)
+
+
+def evaluate_rows(rows: List[bytearray], individual_evaluator: SequenceEvaluator) -> List[float]:
+    return [fitness_value for (_,fitness_value) in individual_evaluator.evaluate_operator_codes(rows)]
+
+
+"""Fitness values of the initial population. The individuals already evaluated for this
+evaluator (e.g. the clones of a PopulationSnapshot) are not scored again"""
+def initial_fitness_values(population: List[Sequence], rows: List[bytearray], individual_evaluator: SequenceEvaluator) -> List[float]:
+    fitness_values = [individual.fitness_value for individual in population]
+    missing = [
+        i for (i,individual) in enumerate(population)
+        if individual.fitness_value is None  or  individual.dirty_start(individual_evaluator.values) < len(individual.gene_list)
+    ]
+    for (i,fitness_value) in zip(missing, evaluate_rows([rows[i] for i in missing], individual_evaluator)):
+        fitness_values[i] = fitness_value
+    return fitness_values
+
+
+"""Selection, crossover and mutation over a GeneMatrix; returns the kept rows and the unevaluated offspring"""
+def breed_generation(
+    matrix: GeneMatrix,
+    m: int,
+    minimize: bool,
+    selection_method: SelectionOperator,
+    crossover_operator: CrossoverOperator,
+    crossover_threshold: float,
+    mutation_operator: MutationOperator,
+    mutation_threshold: float,
+    best_selector: BestSelector,
+    instrumentation: Optional[SimulationInstrumentation] = None,
+    generator: random.Random = GLOBAL_GENERATOR,
+    ordered: bool = False
+) -> Tuple[List[int], List[bytearray]]:
+    instrumentation = NULL_INSTRUMENTATION if instrumentation is None else instrumentation
+
+    with instrumentation.phase(SELECTION):
+        parents = matrix.take(selection_method.select_indices(matrix.fitness_values, m, minimize, generator, ordered))
+
+    with instrumentation.phase(CROSSOVER):
+        offspring = crossover_rows(parents, crossover_threshold, crossover_operator, generator)
+
+    with instrumentation.phase(MUTATION):
+        mutate_rows(offspring, mutation_operator, mutation_threshold, generator)
+
+    with instrumentation.phase(REPLACEMENT):
+        kept = best_selector.select_best_indices(matrix.fitness_values, len(offspring), minimize, generator, ordered)
+
+    return kept, offspring
+
+
+"""Next generation: the kept rows, with their fitness values, followed by the offspring"""
+def replace_rows(matrix: GeneMatrix, kept: List[int], offspring: List[bytearray], offspring_fitness: List[float]) -> GeneMatrix:
+    return GeneMatrix.stack(
+        matrix.take(kept) + offspring,
+        matrix.n_genes,
+        matrix.take_fitness(kept) + offspring_fitness
+    )
+
+
+"""replace_rows for an ordered matrix: merges the sorted offspring into the kept rows"""
+def merge_rows(matrix: GeneMatrix, kept: List[int], offspring: List[bytearray], offspring_fitness: List[float], minimize: bool) -> GeneMatrix:
+    n_genes = matrix.n_genes
+    kept = sorted(kept)
+
+    # The kept rows of an ordered matrix are usually its best ones, a prefix
+    if len(kept) == 0  or  kept[-1] == len(kept)-1:
+        genes = memoryview(matrix.genes)[: len(kept)*n_genes]
+        fitness_values = matrix.fitness_values[: len(kept)]
+    else:
+        genes = memoryview(bytearray().join(matrix.take(kept)))
+        fitness_values = matrix.take_fitness(kept)
+
+    # Each offspring goes after the kept rows that are at least as good
+    position_key = None if minimize else (lambda value: -value)
+    pieces: List[memoryview] = []
+    merged_fitness: List[float] = []
+    start = 0
+    for i in sorted(range(len(offspring)), key=offspring_fitness.__getitem__, reverse=(not minimize)):
+        value = offspring_fitness[i]
+        position = bisect.bisect_right(fitness_values, value if minimize else -value, start, key=position_key)
+        pieces.append(genes[start*n_genes : position*n_genes])
+        pieces.append(offspring[i])
+        merged_fitness += fitness_values[start:position]
+        merged_fitness.append(value)
+        start = position
+    pieces.append(genes[start*n_genes :])
+    merged_fitness += fitness_values[start:]
+
+    return GeneMatrix(bytearray().join(pieces), n_genes, merged_fitness)
+
+
+"""One generation over a GeneMatrix; returns the next matrix and its number of offspring"""
+def evolve_generation(
+    matrix: GeneMatrix,
+    m: int,
+    minimize: bool,
+    individual_evaluator: SequenceEvaluator,
+    selection_method: SelectionOperator,
+    crossover_operator: CrossoverOperator,
+    crossover_threshold: float,
+    mutation_operator: MutationOperator,
+    mutation_threshold: float,
+    best_selector: BestSelector,
+    instrumentation: Optional[SimulationInstrumentation] = None,
+    generator: random.Random = GLOBAL_GENERATOR,
+    ordered: bool = False
+) -> Tuple[GeneMatrix, int]:
+    instrumentation = NULL_INSTRUMENTATION if instrumentation is None else instrumentation
+
+    (kept, offspring) = breed_generation(
+        matrix,
+        m,
+        minimize,
+        selection_method,
+        crossover_operator,
+        crossover_threshold,
+        mutation_operator,
+        mutation_threshold,
+        best_selector,
+        instrumentation,
+        generator,
+        ordered
+    )
+
+    # Only the offspring are evaluated, the kept rows keep their fitness values
+    with instrumentation.phase(EVALUATION, len(offspring)):
+        offspring_fitness = evaluate_rows(offspring, individual_evaluator)
+
+    if ordered:
+        return merge_rows(matrix, kept, offspring, offspring_fitness, minimize), len(offspring)
+    return replace_rows(matrix, kept, offspring, offspring_fitness), len(offspring)
+
+
+"""simulation.run_simulation over a GeneMatrix, with the same draws and results record
+'ordered_population' keeps the matrix sorted by fitness, which changes the results"""
+def run_array_simulation(
+    population: List[Individual],
+    MAX_ITERATIONS: int,
+    m: int,
+    m_updater: m_updater.MUpdater,
+    minimize: bool,
+    individual_evaluator: SequenceEvaluator,
+    selection_method: SelectionOperator,
+    crossover_operator: CrossoverOperator,
+    crossover_threshold: float,
+    mutation_operator: MutationOperator,
+    mutation_threshold: float,
+    best_selector: BestSelector,
+    output_file_name: Optional[str] = "results.txt",
+    optimum_fitness: Optional[float] = None,
+    result_sink: Optional[ResultSink] = None,
+    ordered_population: bool = False,
+    instrumentation: Optional[SimulationInstrumentation] = None,
+    termination_policies: Tuple[TerminationPolicy, ...] = (),
+    generator: Optional[random.Random] = None,
+    trace: Optional[ConvergenceTrace] = None
+) -> SimulationRecord:
+    generator = rng.simulation_generator(generator)
+
+    instrumentation = NULL_INSTRUMENTATION if instrumentation is None else instrumentation
+    instrumentation.start_run(individual_evaluator)
+
+    # Initialize the m_updater
+    m_updater.set_initial_m(m)
+
+    # Copy of the initial m
+    initial_m = m
+
+    # Encode and evaluate the initial population
+    n_genes = len(population[0].get_genes())
+    rows = [bytearray(encode_operators(individual.get_genes())) for individual in population]
+    with instrumentation.phase(EVALUATION, len(rows)):
+        matrix = GeneMatrix.stack(rows, n_genes, initial_fitness_values(population, rows, individual_evaluator))
+    if ordered_population:
+        matrix = matrix.ordered(minimize)
+
+    best_index = matrix.best_index()
+    best_genes, best_fitness = matrix.row(best_index), matrix.fitness_values[best_index]
+
+    fitness_values = lambda: matrix.fitness_values
+    population_genes = lambda: matrix.take(range(len(matrix)))
+    progress = simulation.RunProgress(MAX_ITERATIONS, optimum_fitness, termination_policies, trace)
+    progress.start(best_fitness, m, fitness_values, population_genes)
+
+    while progress.running():
+        assert m>0  and  m % 2 == 0
+        assert len(matrix) % 2 == 0
+
+        (matrix, n_offspring) = evolve_generation(
+            matrix,
+            m,
+            minimize,
+            individual_evaluator,
+            selection_method,
+            crossover_operator,
+            crossover_threshold,
+            mutation_operator,
+            mutation_threshold,
+            best_selector,
+            instrumentation,
+            generator,
+            ordered_population
+        )
+
+        generation_best = 0 if (ordered_population  and  minimize) else matrix.best_index()
+        if matrix.fitness_values[generation_best] < best_fitness:
+            best_genes, best_fitness = matrix.row(generation_best), matrix.fitness_values[generation_best]
+
+        progress.end_generation(best_fitness, m, n_offspring, fitness_values, population_genes)
+        m = m_updater.update_m()
+
+    best_individual = Sequence(decode_row(best_genes))
+    best_individual.set_fitness_value(best_fitness)
+
+    record = simulation.make_record(
+        progress.n_generation, 
+        best_individual, 
+        matrix.to_population(), 
+        initial_m, 
+        m_updater,
+        selection_method, 
+        crossover_operator, 
+        crossover_threshold, 
+        mutation_operator, 
+        mutation_threshold, 
+        best_selector,
+        optimum_fitness,
+        progress.finish(fitness_values, population_genes)
+    )
+    with instrumentation.phase(REPORT):
+        simulation.report_results(record, output_file_name, result_sink)
+    instrumentation.end_run(record)
+    return record
\ No newline at end of file
@@ -0,0 +1,222 @@
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from individual import IndividualEvaluator
+from operators.crossover import CrossoverOperator
+from operators.mutation import MutationOperator
+from operators.selection import SelectionOperator
+from population import PopulationGenerator, BestSelector
+from sequence.sequence_cache import FitnessCache, CachedSequenceEvaluator
+from sequence.sequence_solver import BranchAndBoundSequenceSolver
+from sequence.numeric_mode import NumericMode, DEFAULT_NUMERIC_MODE
+from result_sink import SimulationRecord
+from termination import TerminationPolicy
+import collections
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import re
+import rng
+import array_simulation
+import m_updater
+import validation
+from validation import ValidationLevel
+
+
+"""One puzzle: the values, in order, and the target value"""
+class PuzzleInstance(NamedTuple):
+    puzzle_id: str
+    values: List[int]
+    target_value: int
+
+
+"""Values of a CSV cell, separated by spaces, commas or semicolons"""
+def parse_values(text: str) -> List[int]:
+    return [int(value) for value in re.split(r"[\s,;]+", text.strip()) if value != ""]
+
+
+"""Puzzle of a {"id": ..., "values": [...], "target": ...} JSON object, whose id defaults to 'number'"""
+def parse_puzzle(puzzle: dict, number: int) -> PuzzleInstance:
+    return PuzzleInstance(str(puzzle.get("id", number)), [int(value) for value in puzzle["values"]], int(puzzle["target"]))
+
+
+"""Streams the puzzles of a JSON lines file, one object per line. The id defaults to the line number"""
+def read_jsonl(path: str) -> Iterator[PuzzleInstance]:
+    with open(path, "r") as f:
+        for (line_number,line) in enumerate(f, 1):
+            if line.strip() == "":
+                continue
+            yield parse_puzzle(json.loads(line), line_number)
+
+
+"""Puzzles of a JSON file holding a list of objects, which is loaded whole. The id defaults
+to the position in the list"""
+def read_json(path: str) -> Iterator[PuzzleInstance]:
+    with open(path, "r") as f:
+        puzzles = json.load(f)
+    if not isinstance(puzzles, list):
+        raise ValueError(f"Not a list of puzzles: {path}")
+    for (number,puzzle) in enumerate(puzzles, 1):
+        yield parse_puzzle(puzzle, number)
+
+
+"""Streams the puzzles of a CSV file with the columns 'values' and 'target' (and
+optionally 'id', which defaults to the row number)"""
+def read_csv(path: str) -> Iterator[PuzzleInstance]:
+    with open(path, "r", newline="") as f:
+        for (row_number,row) in enumerate(csv.DictReader(f), 1):
+            yield PuzzleInstance(row.get("id") or str(row_number), parse_values(row["values"]), int(row["target"]))
+
+
+def read_puzzles(path: str) -> Iterator[PuzzleInstance]:
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".jsonl":
+        return read_jsonl(path)
+    if extension == ".json":
+        return read_json(path)
+    if extension == ".csv":
+        return read_csv(path)
+    raise ValueError(f"Unknown puzzle file format: {path}")
+
+
+"""GA configuration every puzzle of a batch is solved with"""
+class BatchSettings(NamedTuple):
+    population_generator: PopulationGenerator
+    population_size: int
+    max_iterations: int
+    m: int
+    m_updater: m_updater.MUpdater
+    minimize: bool
+    selection_method: SelectionOperator
+    crossover_operator: CrossoverOperator
+    crossover_threshold: float
+    mutation_operator: MutationOperator
+    mutation_prob: float
+    best_selector: BestSelector
+    simulation_function: Callable[..., SimulationRecord] = array_simulation.run_array_simulation
+    termination_policies: Tuple[TerminationPolicy, ...] = ()
+    cache_size: Optional[int] = None
+    solve_exact: bool = False
+    validation_level: ValidationLevel = ValidationLevel.FULL
+    numeric_mode: NumericMode = DEFAULT_NUMERIC_MODE
+    seed: Optional[int] = None
+    solve_budget: Optional[int] = None
+
+
+"""Result of one puzzle. 'optimum_fitness' is None when it was not solved exactly"""
+class PuzzleResult(NamedTuple):
+    puzzle: PuzzleInstance
+    record: SimulationRecord
+    optimum_fitness: Optional[float] = None
+
+
+"""Deterministic seed for the initial population of a puzzle"""
+def puzzle_seed(puzzle: PuzzleInstance) -> int:
+    return rng.derive_seed(puzzle.puzzle_id, puzzle.values, float(puzzle.target_value))
+
+
+# Settings and fitness cache of the current process, installed by init_worker
+_settings: Optional[BatchSettings] = None
+_cache: Optional[FitnessCache] = None
+
+
+def init_worker(settings: BatchSettings) -> None:
+    global _settings, _cache
+    _settings = settings
+    _cache = FitnessCache(settings.cache_size)
+    validation.set_validation_level(settings.validation_level)
+
+
+"""Solves one puzzle in the current process"""
+def solve_puzzle(puzzle: PuzzleInstance) -> PuzzleResult:
+    assert _settings is not None
+    assert len(puzzle.values) > 1
+
+    evaluator: IndividualEvaluator = CachedSequenceEvaluator(puzzle.target_value, puzzle.values, cache=_cache, numeric_mode=_settings.numeric_mode)
+    optimum_fitness: Optional[float] = None
+    if _settings.solve_exact:
+        best = BranchAndBoundSequenceSolver(puzzle.target_value, puzzle.values, _settings.numeric_mode, _settings.solve_budget).solve()
+        optimum_fitness = None if best is None else best.get_fitness_value()
+
+    seed = puzzle_seed(puzzle)
+    population = _settings.population_generator.generate(len(puzzle.values)-1, _settings.population_size, random.Random(seed))
+
+    record = _settings.simulation_function(
+        population,
+        _settings.max_iterations,
+        _settings.m,
+        _settings.m_updater,
+        _settings.minimize,
+        evaluator,
+        _settings.selection_method,
+        _settings.crossover_operator,
+        _settings.crossover_threshold,
+        _settings.mutation_operator,
+        _settings.mutation_prob,
+        _settings.best_selector,
+        output_file_name = None,
+        optimum_fitness = optimum_fitness,
+        termination_policies = _settings.termination_policies,
+        generator = None if _settings.seed is None else rng.spawn(_settings.seed, seed)
+    )
+    return PuzzleResult(puzzle, record, optimum_fitness)
+
+
+def solve_chunk(puzzles: List[PuzzleInstance]) -> List[PuzzleResult]:
+    return [solve_puzzle(puzzle) for puzzle in puzzles]
+
+
+"""Solves a stream of puzzles on n_workers processes and yields the results in input order"""
+def solve_puzzles(
+    puzzles: Iterable[PuzzleInstance],
+    settings: BatchSettings,
+    n_workers: int = 1,
+    window: int = 256,
+    chunksize: int = 16
+) -> Iterator[PuzzleResult]:
+    assert n_workers > 0  and  window > 0  and  chunksize > 0
+
+    if n_workers == 1:
+        init_worker(settings)
+        for puzzle in puzzles:
+            yield solve_puzzle(puzzle)
+        return
+
+    puzzles = iter(puzzles)
+    chunks = iter(lambda: list(itertools.islice(puzzles, chunksize)), [])
+    pending = collections.deque()
+    with multiprocessing.Pool(n_workers, initializer=init_worker, initargs=(settings,)) as pool:
+        for chunk in chunks:
+            pending.append(pool.apply_async(solve_chunk, (chunk,)))
+            if len(pending)*chunksize >= window:
+                yield from pending.popleft().get()
+        while len(pending) > 0:
+            yield from pending.popleft().get()
+
+
+"""One JSON line with the puzzle and its results"""
+def format_result(result: PuzzleResult) -> str:
+    record = result.record
+    return json.dumps({
+        "id": result.puzzle.puzzle_id,
+        "values": result.puzzle.values,
+        "target": result.puzzle.target_value,
+        "best_fitness": record.best_fitness,
+        "best_genes": "".join(record.best_genes),
+        "n_generation": record.n_generation,
+        "stop_reason": record.stop_reason,
+        "optimum_fitness": result.optimum_fitness,
+    }) + "\n"
+
+
+"""Writes every result as soon as it arrives (flushed per line), so a consumer can
+follow the output file while the batch runs. Returns the number of puzzles solved"""
+def write_batch_results(results: Iterable[PuzzleResult], path: str) -> int:
+    n_results = 0
+    with open(path, "w") as f:
+        for result in results:
+            f.write(format_result(result))
+            f.flush()
+            n_results += 1
+    return n_results
\ No newline at end of file
@@ -0,0 +1,385 @@
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from individual import Individual
+from sequence.sequence import Sequence, encode_operators
+from sequence.sequence_evaluator import SequenceEvaluator
+from sequence.sequence_generator import RandomSequencePopulationGenerator
+from operators.selection import RouletteWheelSelection, DeterministicSelector, TournamentSelection
+from operators.best_selector import BestProbabilisticSelector, BestDeterministicSelector
+from operators.crossover import OnePointRandomCrossOver, OnePointDeterministicCrossOver, UniformCrossOver, TwoPointRandomCrossOver
+from operators.mutation import StringMutation
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import simulation
+import array_simulation
+import m_updater
+import validation
+from validation import ValidationLevel
+
+
+BENCHMARK_SEED = 0
+POPULATION_SIZES = [16, 64, 256]
+VALUE_LIST_LENGTHS = [8, 16, 32]
+QUICK_POPULATION_SIZES = [16, 64]
+QUICK_VALUE_LIST_LENGTHS = [8]
+SIMULATION_ITERATIONS = 100
+MIN_SAMPLE_NS = 20_000_000      # Each sample runs the operation enough times to take at least this long
+MAX_LOOPS = 1 << 20
+N_SAMPLES = 5                   # The fastest sample is kept, as in timeit
+REGRESSION_TOLERANCE = 0.25     # Relative slowdown (or memory growth) flagged as a regression
+MEMORY_NOISE_BYTES = 4096       # Smaller memory differences are never flagged
+
+"""Timed operation: runs the prepared work and returns the number of operations done"""
+Operation = Callable[[], int]
+
+"""Builds the operation for a (population_size, n_values) case, prepared for 'loops' repetitions"""
+CaseBuilder = Callable[[int, int, int], Operation]
+
+
+"""One operator (or a whole simulation) measured over the population size x value list length matrix"""
+class Benchmark(NamedTuple):
+    name: str
+    unit: str
+    build: CaseBuilder
+
+
+"""Measurement of a benchmark case. 'ops_per_second' is in 'unit's, e.g. generations/sec"""
+class BenchmarkResult(NamedTuple):
+    name: str
+    unit: str
+    population_size: int
+    n_values: int
+    ns_per_op: float
+    ops_per_second: float
+    peak_memory_bytes: int
+
+    def key(self) -> str:
+        return f"{self.name}[population={self.population_size},values={self.n_values}]"
+
+
+"""A metric of a case that got worse than its baseline by more than the tolerance"""
+class Regression(NamedTuple):
+    key: str
+    metric: str
+    baseline: float
+    current: float
+
+    def __str__(self) -> str:
+        return f"{self.key} {self.metric}: {self.baseline:.6g} -> {self.current:.6g} ({self.current/self.baseline - 1:+.1%})"
+
+
+"""Puzzle of a case: random values (the length of the operator lists is n_values-1) and a
+target, drawn from the benchmark seed so every run measures the same work"""
+def make_puzzle(n_values: int) -> Tuple[List[int], int]:
+    generator = random.Random(BENCHMARK_SEED)
+    values = [generator.randint(1, 100) for _ in range(n_values)]
+    return values, generator.randint(100, 1000)
+
+
+def make_population(population_size: int, n_values: int) -> List[Individual]:
+    random.seed(BENCHMARK_SEED)
+    return RandomSequencePopulationGenerator.generate(n_values-1, population_size)
+
+
+"""Population with fitness values, which is all the selectors look at. The fitness values
+are positive (the roulette needs it when minimizing)"""
+def make_evaluated_population(population_size: int, n_values: int) -> List[Individual]:
+    population = make_population(population_size, n_values)
+    for individual in population:
+        individual.set_fitness_value(random.uniform(1, 1000))
+    return population
+
+
+def build_roulette_select(population_size: int, n_values: int, loops: int) -> Operation:
+    population = make_evaluated_population(population_size, n_values)
+    roulette = RouletteWheelSelection()
+    def operation() -> int:
+        for _ in range(loops):
+            roulette.select(population, population_size, True)
+        return loops*population_size
+    return operation
+
+
+def build_deterministic_select(population_size: int, n_values: int, loops: int) -> Operation:
+    population = make_evaluated_population(population_size, n_values)
+    deterministic = DeterministicSelector()
+    def operation() -> int:
+        for _ in range(loops):
+            deterministic.select(population, population_size//2, True)
+        return loops*population_size
+    return operation
+
+
+def build_tournament_select(population_size: int, n_values: int, loops: int) -> Operation:
+    population = make_evaluated_population(population_size, n_values)
+    tournament = TournamentSelection(2)
+    def operation() -> int:
+        for _ in range(loops):
+            tournament.select(population, population_size, True)
+        return loops*population_size
+    return operation
+
+
+def build_best_probabilistic(population_size: int, n_values: int, loops: int) -> Operation:
+    population = make_evaluated_population(population_size, n_values)
+    def operation() -> int:
+        for _ in range(loops):
+            BestProbabilisticSelector.select_best(population, population_size//2, True)
+        return loops*population_size
+    return operation
+
+
+def build_best_deterministic(population_size: int, n_values: int, loops: int) -> Operation:
+    population = make_evaluated_population(population_size, n_values)
+    def operation() -> int:
+        for _ in range(loops):
+            BestDeterministicSelector.select_best(population, population_size//2, True)
+        return loops*population_size
+    return operation
+
+
+def build_crossover(crossover_operator) -> CaseBuilder:
+    def build(population_size: int, n_values: int, loops: int) -> Operation:
+        population = make_population(population_size, n_values)
+        pairs = list(zip(population[0::2], population[1::2]))
+        def operation() -> int:
+            for _ in range(loops):
+                for (parent1,parent2) in pairs:
+                    crossover_operator.crossover(parent1, parent2)
+            return loops*len(pairs)
+        return operation
+    return build
+
+
+def build_string_mutation(population_size: int, n_values: int, loops: int) -> Operation:
+    population = make_population(population_size, n_values)
+    def operation() -> int:
+        for _ in range(loops):
+            for individual in population:
+                StringMutation.mutate(individual, 1.0)
+        return loops*population_size
+    return operation
+
+
+"""The evaluator skips clean individuals, so every loop evaluates a population of its own"""
+def build_sequence_evaluator(population_size: int, n_values: int, loops: int) -> Operation:
+    (values, target_value) = make_puzzle(n_values)
+    evaluator = SequenceEvaluator(target_value, values)
+    gene_lists = [individual.get_genes() for individual in make_population(population_size, n_values)]
+    populations = [[Sequence(genes) for genes in gene_lists] for _ in range(loops)]
+    def operation() -> int:
+        for population in populations:
+            evaluator.evaluate_population(population)
+        return loops*population_size
+    return operation
+
+
+def build_evaluate_operator_codes(population_size: int, n_values: int, loops: int) -> Operation:
+    (values, target_value) = make_puzzle(n_values)
+    evaluator = SequenceEvaluator(target_value, values)
+    rows = [bytes(encode_operators(individual.get_genes())) for individual in make_population(population_size, n_values)]
+    def operation() -> int:
+        for _ in range(loops):
+            evaluator.evaluate_operator_codes(rows)
+        return loops*population_size
+    return operation
+
+
+"""End-to-end generations: the simulation stops early if it reaches the target, so the
+operations are the generations actually run"""
+def build_simulation(simulation_function: Callable[..., simulation.SimulationRecord]) -> CaseBuilder:
+    def build(population_size: int, n_values: int, loops: int) -> Operation:
+        (values, target_value) = make_puzzle(n_values)
+        evaluator = SequenceEvaluator(target_value, values)
+        populations = [make_population(population_size, n_values) for _ in range(loops)]
+        def operation() -> int:
+            n_generations = 0
+            for population in populations:
+                record = simulation_function(
+                    population,
+                    SIMULATION_ITERATIONS,
+                    population_size//2 - (population_size//2) % 2,
+                    m_updater.MUpdaterConstantM(),
+                    True,
+                    evaluator,
+                    RouletteWheelSelection(),
+                    OnePointRandomCrossOver(),
+                    0.8,
+                    StringMutation,
+                    0.2,
+                    BestDeterministicSelector,
+                    output_file_name=None
+                )
+                n_generations += max(record.n_generation, 1)
+            return n_generations
+        return operation
+    return build
+
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark("roulette_select", "draw", build_roulette_select),
+    Benchmark("deterministic_select", "individual", build_deterministic_select),
+    Benchmark("tournament_select", "draw", build_tournament_select),
+    Benchmark("best_probabilistic_selector", "individual", build_best_probabilistic),
+    Benchmark("best_deterministic_selector", "individual", build_best_deterministic),
+    Benchmark("one_point_random_crossover", "pair", build_crossover(OnePointRandomCrossOver())),
+    Benchmark("one_point_deterministic_crossover", "pair", build_crossover(OnePointDeterministicCrossOver(3))),
+    Benchmark("uniform_crossover", "pair", build_crossover(UniformCrossOver())),
+    Benchmark("two_point_random_crossover", "pair", build_crossover(TwoPointRandomCrossOver())),
+    Benchmark("string_mutation", "individual", build_string_mutation),
+    Benchmark("sequence_evaluator", "individual", build_sequence_evaluator),
+    Benchmark("evaluate_operator_codes", "individual", build_evaluate_operator_codes),
+    Benchmark("run_simulation", "generation", build_simulation(simulation.run_simulation)),
+    Benchmark("run_array_simulation", "generation", build_simulation(array_simulation.run_array_simulation)),
+]
+
+
+"""Times one sample of 'loops' repetitions and returns (elapsed ns, operations)"""
+def time_sample(build: CaseBuilder, population_size: int, n_values: int, loops: int) -> Tuple[int, int]:
+    operation = build(population_size, n_values, loops)
+    start = time.perf_counter_ns()
+    n_ops = operation()
+    return time.perf_counter_ns() - start, n_ops
+
+
+"""Peak memory allocated by a single repetition of the operation (its preparation excluded)"""
+def measure_peak_memory(build: CaseBuilder, population_size: int, n_values: int) -> int:
+    operation = build(population_size, n_values, 1)
+    tracemalloc.start()
+    try:
+        operation()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+"""Doubles the repetitions until a sample takes MIN_SAMPLE_NS, then keeps the fastest of
+N_SAMPLES samples"""
+def run_case(benchmark: Benchmark, population_size: int, n_values: int, n_samples: int = N_SAMPLES) -> BenchmarkResult:
+    loops = 1
+    (elapsed, n_ops) = time_sample(benchmark.build, population_size, n_values, loops)
+    while elapsed < MIN_SAMPLE_NS  and  loops < MAX_LOOPS:
+        loops *= 2
+        (elapsed, n_ops) = time_sample(benchmark.build, population_size, n_values, loops)
+
+    ns_per_op = elapsed/n_ops
+    for _ in range(n_samples-1):
+        (elapsed, n_ops) = time_sample(benchmark.build, population_size, n_values, loops)
+        ns_per_op = min(ns_per_op, elapsed/n_ops)
+
+    return BenchmarkResult(
+        benchmark.name,
+        benchmark.unit,
+        population_size,
+        n_values,
+        ns_per_op,
+        1e9/ns_per_op,
+        measure_peak_memory(benchmark.build, population_size, n_values)
+    )
+
+
+def run_benchmarks(
+    benchmarks: List[Benchmark],
+    population_sizes: List[int],
+    value_list_lengths: List[int],
+    n_samples: int = N_SAMPLES,
+    report: Optional[Callable[[BenchmarkResult], None]] = None
+) -> List[BenchmarkResult]:
+    results: List[BenchmarkResult] = []
+    for benchmark in benchmarks:
+        for n_values in value_list_lengths:
+            for population_size in population_sizes:
+                result = run_case(benchmark, population_size, n_values, n_samples)
+                results.append(result)
+                if report is not None:
+                    report(result)
+    return results
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "validation_level": validation.get_validation_level().name
+    }
+
+
+def save_baseline(path: str, results: List[BenchmarkResult]) -> None:
+    with open(path, "w") as f:
+        json.dump(
+            {"environment": environment(), "results": {result.key(): result._asdict() for result in results}},
+            f,
+            indent=2
+        )
+
+
+def load_baseline(path: str) -> Dict[str, BenchmarkResult]:
+    with open(path, "r") as f:
+        baseline = json.load(f)
+    return {key: BenchmarkResult(**fields) for (key,fields) in baseline["results"].items()}
+
+
+"""Cases slower (ns/op) or using more memory than their baseline by more than 'tolerance'.
+Cases missing from the baseline are not compared"""
+def find_regressions(
+    results: List[BenchmarkResult],
+    baseline: Dict[str, BenchmarkResult],
+    tolerance: float = REGRESSION_TOLERANCE
+) -> List[Regression]:
+    regressions: List[Regression] = []
+    for result in results:
+        base = baseline.get(result.key())
+        if base is None:
+            continue
+        if result.ns_per_op > base.ns_per_op*(1+tolerance):
+            regressions.append(Regression(result.key(), "ns_per_op", base.ns_per_op, result.ns_per_op))
+        if result.peak_memory_bytes > base.peak_memory_bytes*(1+tolerance) + MEMORY_NOISE_BYTES:
+            regressions.append(Regression(result.key(), "peak_memory_bytes", base.peak_memory_bytes, result.peak_memory_bytes))
+    return regressions
+
+
+def print_result(result: BenchmarkResult) -> None:
+    print(f"{result.key():<72} {result.ns_per_op:>14.1f} ns/op {result.ops_per_second:>14.1f} {result.unit}s/sec {result.peak_memory_bytes/1024:>10.1f} KiB", flush=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks the operators and the simulations over population sizes and value list lengths")
+    parser.add_argument("--save", metavar="PATH", help="save the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="flag the regressions against a saved JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE, help="relative slowdown flagged as a regression")
+    parser.add_argument("--quick", action="store_true", help="smaller matrix and fewer samples")
+    parser.add_argument("--filter", default="", help="only the benchmarks whose name contains this text")
+    parser.add_argument("--validation", choices=[level.name.lower() for level in ValidationLevel], default="off")
+    args = parser.parse_args(argv)
+
+    validation.set_validation_level(ValidationLevel[args.validation.upper()])
+    benchmarks = [benchmark for benchmark in BENCHMARKS if args.filter in benchmark.name]
+    results = run_benchmarks(
+        benchmarks,
+        QUICK_POPULATION_SIZES if args.quick else POPULATION_SIZES,
+        QUICK_VALUE_LIST_LENGTHS if args.quick else VALUE_LIST_LENGTHS,
+        2 if args.quick else N_SAMPLES,
+        print_result
+    )
+
+    if args.save is not None:
+        save_baseline(args.save, results)
+
+    if args.compare is not None:
+        regressions = find_regressions(results, load_baseline(args.compare), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if len(regressions) > 0:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
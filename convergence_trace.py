@@ -0,0 +1,175 @@
+from array import array
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Sequence, Tuple
+from termination import distinct_ratio
+from result_sink import to_little_endian, read_array
+import os
+import struct
+
+"""Metrics of every recorded generation, with their array typecodes in the trace files"""
+COLUMNS = [
+    ("generation", "I"),
+    ("best_fitness", "d"),
+    ("mean_fitness", "d"),
+    ("m", "I"),
+    ("diversity", "d"),
+    ("n_offspring", "I"),
+]
+
+
+"""One recorded generation. 'best_fitness' is the best of the run so far, 'm' the one the
+generation was bred with, 'diversity' the fraction of distinct gene lists"""
+class TraceRow(NamedTuple):
+    generation: int
+    best_fitness: float
+    mean_fitness: float
+    m: int
+    diversity: float
+    n_offspring: int
+
+
+"""Per-generation metrics of one run, recorded every 'every' generations into a preallocated buffer"""
+class ConvergenceTrace:
+    ROW = struct.Struct("<" + "".join(typecode for (_,typecode) in COLUMNS))
+
+    def __init__(self, max_iterations: int, every: int = 1) -> None:
+        assert max_iterations >= 0  and  every > 0
+        self.every: int = every
+        self.capacity: int = max_iterations//every + 2
+        self.buffer: bytearray = bytearray(self.capacity * ConvergenceTrace.ROW.size)
+        self.n_rows: int = 0
+        self.last_generation: int = -1
+
+    def samples(self, n_generation: int) -> bool:
+        return n_generation % self.every == 0
+
+    def record(self, n_generation: int, best_fitness: float, mean_fitness: float, m: int, diversity: float, n_offspring: int) -> None:
+        assert self.n_rows < self.capacity
+        ConvergenceTrace.ROW.pack_into(
+            self.buffer, self.n_rows * ConvergenceTrace.ROW.size,
+            n_generation, best_fitness, mean_fitness, m, diversity, n_offspring
+        )
+        self.n_rows += 1
+        self.last_generation = n_generation
+
+    """Records the metrics of a population: its fitness values and gene lists"""
+    def record_population(
+        self,
+        n_generation: int,
+        best_fitness: float,
+        fitness_values: List[float],
+        m: int,
+        population_genes: List[Sequence],
+        n_offspring: int
+    ) -> None:
+        self.record(n_generation, best_fitness, sum(fitness_values)/len(fitness_values), m, distinct_ratio(population_genes), n_offspring)
+
+    def rows(self) -> Iterator[TraceRow]:
+        for row in ConvergenceTrace.ROW.iter_unpack(memoryview(self.buffer)[:self.n_rows * ConvergenceTrace.ROW.size]):
+            yield TraceRow(*row)
+
+    def columns(self) -> Dict[str, array]:
+        values = list(zip(*self.rows())) if self.n_rows > 0 else [[] for _ in COLUMNS]
+        return {name: array(typecode, column) for ((name,typecode),column) in zip(COLUMNS, values)}
+
+
+"""Bytes of one row over all the columns"""
+ROW_BYTES = sum(array(typecode).itemsize for (_,typecode) in COLUMNS)
+
+
+"""Columnar trace file of flushed blocks, one per trace; 'append' keeps the complete blocks of an existing file"""
+class TraceWriter:
+    MAGIC = b"GAT2"
+    BLOCK_MAGIC = b"GATB"
+    BLOCK_HEADER = struct.Struct("<4sII")
+
+    def __init__(self, path: str, append: bool = False) -> None:
+        self.path: str = path
+        if append  and  os.path.exists(path)  and  os.path.getsize(path) > 0:
+            self.file: BinaryIO = open(path, "r+b")
+            (_, end) = scan_blocks(self.file)
+            self.file.seek(end)
+            self.file.truncate()
+        else:
+            self.file: BinaryIO = open(path, "wb")
+            self.file.write(TraceWriter.MAGIC)
+            self.file.flush()
+
+    def write(self, key: str, trace: ConvergenceTrace) -> None:
+        encoded_key = key.encode()
+        self.file.write(TraceWriter.BLOCK_HEADER.pack(TraceWriter.BLOCK_MAGIC, len(encoded_key), trace.n_rows))
+        self.file.write(encoded_key)
+        for column in trace.columns().values():
+            self.file.write(to_little_endian(column))
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.close()
+
+
+"""(key, offset of the columns, number of rows) of every complete block of a trace file,
+and the offset where the complete blocks end. Only the block headers are read"""
+def scan_blocks(f: BinaryIO) -> Tuple[List[Tuple[str, int, int]], int]:
+    size = os.fstat(f.fileno()).st_size
+    f.seek(0)
+    if f.read(len(TraceWriter.MAGIC)) != TraceWriter.MAGIC:
+        raise ValueError(f"Not a trace file: {f.name}")
+
+    blocks: List[Tuple[str, int, int]] = []
+    end = len(TraceWriter.MAGIC)
+    while end + TraceWriter.BLOCK_HEADER.size <= size:
+        f.seek(end)
+        (magic, key_size, n_rows) = TraceWriter.BLOCK_HEADER.unpack(f.read(TraceWriter.BLOCK_HEADER.size))
+        if magic != TraceWriter.BLOCK_MAGIC:
+            raise ValueError(f"Corrupted trace file: {f.name} (no block at offset {end})")
+        columns_offset = end + TraceWriter.BLOCK_HEADER.size + key_size
+        block_end = columns_offset + n_rows*ROW_BYTES
+        # A block cut short by a killed writer
+        if block_end > size:
+            break
+        blocks.append((f.read(key_size).decode(), columns_offset, n_rows))
+        end = block_end
+    return blocks, end
+
+
+"""Reads the traces of a trace file by key. Only the block headers are read when opening
+it; reading a trace only reads its own block"""
+class TraceReader:
+    def __init__(self, path: str) -> None:
+        self.file: BinaryIO = open(path, "rb")
+        (blocks, _) = scan_blocks(self.file)
+
+        # Blocks of every key, in writing order (a key may have been traced more than once)
+        self.blocks: Dict[str, List[Tuple[int, int]]] = {}
+        for (key,offset,n_rows) in blocks:
+            self.blocks.setdefault(key, []).append((offset, n_rows))
+
+    def keys(self) -> List[str]:
+        return list(self.blocks)
+
+    """Columns of the 'occurrence'-th trace written with the key"""
+    def read(self, key: str, occurrence: int = 0) -> Dict[str, array]:
+        (offset, n_rows) = self.blocks[key][occurrence]
+        self.file.seek(offset)
+        columns: Dict[str, array] = {}
+        for (name,typecode) in COLUMNS:
+            columns[name] = read_array(self.file, typecode, n_rows)
+        return columns
+
+    def read_rows(self, key: str, occurrence: int = 0) -> List[TraceRow]:
+        columns = self.read(key, occurrence)
+        return [TraceRow(*row) for row in zip(*columns.values())]
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "TraceReader":
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.close()
\ No newline at end of file
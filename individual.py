@@ -1,20 +1,27 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import List, Optional
 
 
-"""Prototype interface for individuals"""
+"""Prototype interface for individuals, with immutable genes shared by their clones"""
 class Individual(ABC):
+    __slots__ = ("gene_list", "fitness_value")
+
     def __init__(self, gene_list):
-        self.gene_list: list = gene_list.copy()
+        self.gene_list: tuple = tuple(gene_list)
         self.fitness_value: Optional[float] = None
 
-    def set_gene_list(self, new_gene_list: list) -> None:
+    def set_gene_list(self, new_gene_list) -> None:
         assert new_gene_list is not None
-        self.gene_list = new_gene_list.copy()
+        self.gene_list = tuple(new_gene_list)
         self.fitness_value = None
 
+    """A mutable copy of the genes"""
     def get_gene_list(self) -> list:
-        return self.gene_list.copy()
+        return list(self.gene_list)
+
+    """The genes themselves, without a copy"""
+    def get_genes(self) -> tuple:
+        return self.gene_list
 
     def set_fitness_value(self, new_fitness_value: float) -> None:
         assert new_fitness_value is not None
@@ -37,9 +44,18 @@ class Individual(ABC):
     def clone(self, gene_list):
         raise NotImplemented()
 
+    """Called on prototypes that will never change again (see PopulationSnapshot), so
+    their clones can share their state instead of copying it"""
+    def freeze(self) -> None:
+        pass
+
 
 """Interface for population evaluator"""
 class IndividualEvaluator(ABC):
     @abstractmethod
     def evaluate_individual(individual: Individual) -> None:
-        raise NotImplemented()
\ No newline at end of file
+        raise NotImplemented()
+
+    def evaluate_population(self, population: List[Individual]) -> None:
+        for individual in population:
+            self.evaluate_individual(individual)
\ No newline at end of file
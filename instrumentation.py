@@ -0,0 +1,195 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Dict, Iterator, List, Tuple
+from individual import IndividualEvaluator
+from result_sink import SimulationRecord
+import time
+
+# Phases of a generation, as reported to the instrumentation
+SELECTION = "selection"
+CROSSOVER = "crossover"
+MUTATION = "mutation"
+REPLACEMENT = "replacement"
+EVALUATION = "evaluation"
+CHECK_ONLY_INSTANCE = "check_only_instance"
+REPORT = "report"
+PHASES = [SELECTION, CROSSOVER, MUTATION, REPLACEMENT, EVALUATION, CHECK_ONLY_INSTANCE, REPORT]
+
+
+"""Hooks the simulations call around each phase. Without an instrumentation the simulations
+use NULL_INSTRUMENTATION, which does nothing"""
+class SimulationInstrumentation(ABC):
+    @abstractmethod
+    def start_run(self, individual_evaluator: IndividualEvaluator) -> None:
+        raise NotImplemented()
+
+    @abstractmethod
+    def start_phase(self, phase: str) -> None:
+        raise NotImplemented()
+
+    """'n_evaluations' is the number of individuals handed to the evaluator in the phase"""
+    @abstractmethod
+    def end_phase(self, phase: str, n_evaluations: int = 0) -> None:
+        raise NotImplemented()
+
+    @abstractmethod
+    def end_run(self, record: SimulationRecord) -> None:
+        raise NotImplemented()
+
+    """start_phase and end_phase around a block: with instrumentation.phase(SELECTION): ..."""
+    @contextmanager
+    def phase(self, phase: str, n_evaluations: int = 0) -> Iterator[None]:
+        self.start_phase(phase)
+        try:
+            yield
+        finally:
+            self.end_phase(phase, n_evaluations)
+
+
+"""Instrumentation of the simulations run without one: every hook is a no-op"""
+class NullInstrumentation(SimulationInstrumentation):
+    def start_run(self, individual_evaluator: IndividualEvaluator) -> None:
+        pass
+
+    def start_phase(self, phase: str) -> None:
+        pass
+
+    def end_phase(self, phase: str, n_evaluations: int = 0) -> None:
+        pass
+
+    def end_run(self, record: SimulationRecord) -> None:
+        pass
+
+    def phase(self, phase: str, n_evaluations: int = 0) -> ContextManager[None]:
+        return NULL_PHASE
+
+
+NULL_PHASE = nullcontext()
+NULL_INSTRUMENTATION = NullInstrumentation()
+
+
+"""Aggregates of one phase: wall time, calls, evaluations and fitness cache lookups"""
+class PhaseStats:
+    def __init__(self) -> None:
+        self.calls: int = 0
+        self.wall_ns: int = 0
+        self.evaluations: int = 0
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+
+    def add(self, other: "PhaseStats") -> None:
+        self.calls += other.calls
+        self.wall_ns += other.wall_ns
+        self.evaluations += other.evaluations
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+
+
+"""The hyperparameters of a results record, without its results"""
+def configuration_key(record: SimulationRecord) -> Tuple:
+    return (
+        record.population_size,
+        record.initial_m,
+        record.m_updater,
+        record.selection_method,
+        record.crossover_operator,
+        record.crossover_threshold,
+        record.mutation_operator,
+        record.mutation_threshold,
+        record.best_selector
+    )
+
+
+"""Built-in instrumentation: aggregates the phase stats of every run per configuration"""
+class PhaseTimingCollector(SimulationInstrumentation):
+    def __init__(self) -> None:
+        self.configurations: Dict[Tuple, Dict[str, PhaseStats]] = {}
+        self.runs: Dict[Tuple, int] = {}
+        self.current: Dict[str, PhaseStats] = {}
+        self.cache = None
+        self.phase_start: Tuple[int, int, int] = (0, 0, 0)
+
+    def start_run(self, individual_evaluator: IndividualEvaluator) -> None:
+        self.current = {}
+        self.cache = getattr(individual_evaluator, "cache", None)
+
+    def cache_counters(self) -> Tuple[int, int]:
+        return (0, 0) if self.cache is None else (self.cache.hits, self.cache.misses)
+
+    def start_phase(self, phase: str) -> None:
+        (hits, misses) = self.cache_counters()
+        self.phase_start = (time.perf_counter_ns(), hits, misses)
+
+    def end_phase(self, phase: str, n_evaluations: int = 0) -> None:
+        end = time.perf_counter_ns()
+        (hits, misses) = self.cache_counters()
+        (start, start_hits, start_misses) = self.phase_start
+
+        stats = self.current.get(phase)
+        if stats is None:
+            stats = self.current[phase] = PhaseStats()
+        stats.calls += 1
+        stats.wall_ns += end - start
+        stats.evaluations += n_evaluations
+        stats.cache_hits += hits - start_hits
+        stats.cache_misses += misses - start_misses
+
+    def end_run(self, record: SimulationRecord) -> None:
+        key = configuration_key(record)
+        phases = self.configurations.setdefault(key, {})
+        for (phase,stats) in self.current.items():
+            phases.setdefault(phase, PhaseStats()).add(stats)
+        self.runs[key] = self.runs.get(key, 0) + 1
+        self.current = {}
+
+    """Adds the aggregates of another collector (e.g. the one of a worker process)"""
+    def merge(self, other: "PhaseTimingCollector") -> None:
+        for (key,phases) in other.configurations.items():
+            own_phases = self.configurations.setdefault(key, {})
+            for (phase,stats) in phases.items():
+                own_phases.setdefault(phase, PhaseStats()).add(stats)
+            self.runs[key] = self.runs.get(key, 0) + other.runs[key]
+
+    def total_wall_ns(self, key: Tuple) -> int:
+        return sum(stats.wall_ns for stats in self.configurations[key].values())
+
+    """The 'n' configurations with the largest total wall time"""
+    def hot_configurations(self, n: int) -> List[Tuple]:
+        return sorted(self.configurations, key=self.total_wall_ns, reverse=True)[:n]
+
+    """(configuration, phase, runs, stats) of every phase of every configuration"""
+    def rows(self) -> Iterator[Tuple[Tuple, str, int, PhaseStats]]:
+        for (key,phases) in self.configurations.items():
+            for phase in PHASES:
+                if phase in phases:
+                    yield key, phase, self.runs[key], phases[phase]
+
+    """Writes one semicolon separated line per configuration and phase, with the same
+    hyperparameter fields as the results files"""
+    def write(self, path: str) -> None:
+        with open(path, "w") as f:
+            for (key,phase,runs,stats) in self.rows():
+                f.write(format_phase_stats(key, phase, runs, stats))
+
+
+def format_phase_stats(key: Tuple, phase: str, runs: int, stats: PhaseStats) -> str:
+    (population_size, initial_m, updater, selection_method, crossover_operator, crossover_threshold, mutation_operator, mutation_threshold, best_selector) = key
+    return "".join([
+        f"population_size={population_size};",
+        f"initial_m={initial_m};",
+        f"m_updater={updater};",
+        f"selection_method={selection_method};",
+        f"crossover_operator={crossover_operator};",
+        f"crossover_threshold={crossover_threshold};",
+        f"mutation_operator={mutation_operator};",
+        f"mutation_threshold={mutation_threshold};",
+        f"best_selector={best_selector};",
+        f"phase={phase};",
+        f"runs={runs};",
+        f"calls={stats.calls};",
+        f"wall_ns={stats.wall_ns};",
+        f"evaluations={stats.evaluations};",
+        f"cache_hits={stats.cache_hits};",
+        f"cache_misses={stats.cache_misses};",
+        "\n"
+    ])
\ No newline at end of file
@@ -0,0 +1,305 @@
+from abc import ABC, abstractstaticmethod
+from typing import List, NamedTuple, Optional, Tuple
+from array_simulation import GeneMatrix, evolve_generation, decode_row, evaluate_rows
+from sequence.sequence import encode_operators
+from sequence.sequence_evaluator import SequenceEvaluator
+from operators.crossover import CrossoverOperator
+from operators.mutation import MutationOperator
+from operators.selection import SelectionOperator, best_indices
+from operators.best_selector import BestDeterministicSelector
+from population import PopulationGenerator, BestSelector
+import copy
+import multiprocessing
+import random
+import m_updater
+import simulation
+
+"""A migrant is the genes of an individual (operator codes) with its fitness value"""
+Migrant = Tuple[bytes, float]
+
+
+"""Strategy interface for the migration topologies: which islands send their migrants to each island"""
+class MigrationTopology(ABC):
+    @abstractstaticmethod
+    def sources(island: int, n_islands: int) -> List[int]:
+        raise NotImplemented()
+
+    @abstractstaticmethod
+    def __str__() -> str:
+        raise NotImplemented()
+
+
+"""Each island receives the migrants of the previous one"""
+class RingTopology(MigrationTopology):
+    @staticmethod
+    def sources(island: int, n_islands: int) -> List[int]:
+        return [(island - 1) % n_islands] if n_islands > 1 else []
+
+    @staticmethod
+    def __str__() -> str:
+        return "ring"
+
+
+"""Each island receives the migrants of all the others"""
+class FullyConnectedTopology(MigrationTopology):
+    @staticmethod
+    def sources(island: int, n_islands: int) -> List[int]:
+        return [source for source in range(n_islands) if source != island]
+
+    @staticmethod
+    def __str__() -> str:
+        return "fully_connected"
+
+
+"""Operator configuration of one island, as in one point of the main.py grid"""
+class IslandConfig(NamedTuple):
+    seed: int
+    selection_method: SelectionOperator
+    crossover_operator: CrossoverOperator
+    crossover_threshold: float
+    mutation_operator: MutationOperator
+    mutation_prob: float
+    best_selector: BestSelector
+    m: int
+    m_updater: m_updater.MUpdater
+
+
+"""What an island reports after an epoch"""
+class EpochReport(NamedTuple):
+    emigrants: List[Migrant]
+    best: Migrant
+    n_generation: int
+
+
+"""Result of an island model run. 'n_generation' is the generation of the first island that
+reached the optimum, if any; 'island_generations' are the generations every island ran"""
+class IslandsResult(NamedTuple):
+    n_generation: int
+    best_fitness: float
+    best_genes: Tuple[str, ...]
+    best_island: int
+    island_generations: Tuple[int, ...]
+
+
+"""One population of the island model, evolved with the array engine and its own generator"""
+class Island:
+    def __init__(
+        self,
+        config: IslandConfig,
+        population_generator: PopulationGenerator,
+        operator_list_size: int,
+        population_size: int,
+        individual_evaluator: SequenceEvaluator,
+        minimize: bool
+    ) -> None:
+        self.config: IslandConfig = config
+        self.individual_evaluator: SequenceEvaluator = individual_evaluator
+        self.minimize: bool = minimize
+
+        # Own generator, the random module is left untouched
+        self.generator: random.Random = random.Random(config.seed)
+        population = population_generator.generate(operator_list_size, population_size, self.generator)
+
+        rows = [bytearray(encode_operators(individual.get_genes())) for individual in population]
+        self.matrix: GeneMatrix = GeneMatrix.stack(rows, operator_list_size, evaluate_rows(rows, individual_evaluator))
+
+        # Own m_updater too: several islands may be configured with the same one
+        self.m_updater: m_updater.MUpdater = copy.deepcopy(config.m_updater)
+        self.m_updater.set_initial_m(config.m)
+        self.m: int = config.m
+        self.n_generation: int = 0
+
+        best_index = self.matrix.best_index()
+        self.best: Migrant = (bytes(self.matrix.row(best_index)), self.matrix.fitness_values[best_index])
+
+    """Replaces the worst rows with the immigrants"""
+    def receive(self, immigrants: List[Migrant]) -> None:
+        immigrants = immigrants[:len(self.matrix)-1]
+        if len(immigrants) == 0:
+            return
+        kept = BestDeterministicSelector.select_best_indices(self.matrix.fitness_values, len(immigrants), self.minimize)
+        self.matrix = GeneMatrix.stack(
+            self.matrix.take(kept) + [bytearray(genes) for (genes,_) in immigrants],
+            self.matrix.n_genes,
+            self.matrix.take_fitness(kept) + [fitness_value for (_,fitness_value) in immigrants]
+        )
+        self.update_best()
+
+    def update_best(self) -> None:
+        best_index = self.matrix.best_index()
+        if self.matrix.fitness_values[best_index] < self.best[1]:
+            self.best = (bytes(self.matrix.row(best_index)), self.matrix.fitness_values[best_index])
+
+    """Receives the immigrants and evolves for up to 'n_generations' generations, stopping
+    early when 'stop_fitness' is reached. Returns the 'n_migrants' best rows as emigrants"""
+    def run_epoch(self, immigrants: List[Migrant], n_generations: int, stop_fitness: float, n_migrants: int) -> EpochReport:
+        self.receive(immigrants)
+
+        for _ in range(n_generations):
+            if self.best[1] <= stop_fitness:
+                break
+            (self.matrix, _) = evolve_generation(
+                self.matrix,
+                self.m,
+                self.minimize,
+                self.individual_evaluator,
+                self.config.selection_method,
+                self.config.crossover_operator,
+                self.config.crossover_threshold,
+                self.config.mutation_operator,
+                self.config.mutation_prob,
+                self.config.best_selector,
+                generator = self.generator
+            )
+            self.n_generation += 1
+            self.m = self.m_updater.update_m()
+            self.update_best()
+
+        emigrants = [
+            (bytes(self.matrix.row(i)), self.matrix.fitness_values[i])
+            for i in best_indices(self.matrix.fitness_values, min(n_migrants, len(self.matrix)), self.minimize)
+        ]
+        return EpochReport(emigrants, self.best, self.n_generation)
+
+
+"""Worker process loop: runs the epochs sent by the coordinator until it receives None"""
+def island_worker(connection, island: Island) -> None:
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        connection.send(island.run_epoch(*message))
+    connection.close()
+
+
+"""Runs the epochs of the islands in the current process or in one worker process each"""
+class IslandPool:
+    def __init__(self, islands: List[Island], in_process: bool) -> None:
+        self.islands: List[Island] = islands
+        self.in_process: bool = in_process
+        self.connections = []
+        self.processes = []
+        if not in_process:
+            for island in islands:
+                (parent_end, child_end) = multiprocessing.Pipe()
+                process = multiprocessing.Process(target=island_worker, args=(child_end, island), daemon=True)
+                process.start()
+                self.connections.append(parent_end)
+                self.processes.append(process)
+
+    def run_epochs(self, messages: List[tuple]) -> List[EpochReport]:
+        if self.in_process:
+            return [island.run_epoch(*message) for (island,message) in zip(self.islands, messages)]
+        for (connection,message) in zip(self.connections, messages):
+            connection.send(message)
+        return [connection.recv() for connection in self.connections]
+
+    def close(self) -> None:
+        for connection in self.connections:
+            connection.send(None)
+            connection.close()
+        for process in self.processes:
+            process.join()
+
+
+"""Picks the best 'n_migrants' of the emigrants sent by the source islands of every island,
+plus the global best, which reaches every island"""
+def route_migrants(
+    reports: List[EpochReport],
+    topology: MigrationTopology,
+    n_migrants: int,
+    global_best: Migrant,
+    minimize: bool
+) -> List[List[Migrant]]:
+    immigrants: List[List[Migrant]] = []
+    for island in range(len(reports)):
+        candidates = [migrant for source in topology.sources(island, len(reports)) for migrant in reports[source].emigrants]
+        candidates.sort(key=lambda migrant: migrant[1], reverse=(not minimize))
+        selected = candidates[:n_migrants]
+        if global_best != reports[island].best  and  global_best not in selected:
+            selected.append(global_best)
+        immigrants.append(selected)
+    return immigrants
+
+
+"""Island model: every 'migration_interval' generations the 'n_migrants' best of each island migrate along the topology
+The stop is epoch-granular: the other islands finish their epoch when one reaches the optimum"""
+def run_islands(
+    configs: List[IslandConfig],
+    population_generator: PopulationGenerator,
+    operator_list_size: int,
+    population_size: int,
+    individual_evaluator: SequenceEvaluator,
+    minimize: bool,
+    max_iterations: int,
+    migration_interval: int,
+    n_migrants: int,
+    topology: MigrationTopology = RingTopology,
+    optimum_fitness: Optional[float] = None,
+    in_process: bool = False
+) -> IslandsResult:
+    assert len(configs) > 0
+    assert migration_interval > 0  and  n_migrants >= 0
+
+    stop_fitness = simulation.stop_fitness(optimum_fitness)
+    islands = [
+        Island(config, population_generator, operator_list_size, population_size, individual_evaluator, minimize)
+        for config in configs
+    ]
+    pool = IslandPool(islands, in_process)
+
+    try:
+        immigrants: List[List[Migrant]] = [[] for _ in islands]
+        n_generation = 0
+        island_generations = [0 for _ in islands]
+        best_island = min(range(len(islands)), key=lambda i: islands[i].best[1])
+        global_best = islands[best_island].best
+
+        while n_generation < max_iterations  and  not global_best[1] <= stop_fitness:
+            n_generations = min(migration_interval, max_iterations - n_generation)
+            reports = pool.run_epochs([
+                (immigrants[i], n_generations, stop_fitness, n_migrants) for i in range(len(islands))
+            ])
+            island_generations = [report.n_generation for report in reports]
+            # An island that reached the optimum stopped there, the others ran the whole epoch
+            solved = [report.n_generation for report in reports if report.best[1] <= stop_fitness]
+            n_generation = min(solved) if len(solved) > 0 else max(island_generations)
+
+            for (i,report) in enumerate(reports):
+                if report.best[1] < global_best[1]:
+                    best_island, global_best = i, report.best
+
+            immigrants = route_migrants(reports, topology, n_migrants, global_best, minimize)
+    finally:
+        pool.close()
+
+    return IslandsResult(n_generation, global_best[1], tuple(decode_row(global_best[0])), best_island, tuple(island_generations))
+
+
+"""Island configurations drawn from the lists of the main.py grid"""
+def island_configs(
+    n_islands: int,
+    seed: int,
+    selection_methods: List[SelectionOperator],
+    crossover_operators: List[CrossoverOperator],
+    crossover_thresholds: List[float],
+    mutation_operators: List[MutationOperator],
+    mutation_probs: List[float],
+    best_selectors: List[BestSelector],
+    ms: List[int],
+    m_updaters: List[m_updater.MUpdater]
+) -> List[IslandConfig]:
+    generator = random.Random(seed)
+    return [
+        IslandConfig(
+            generator.getrandbits(64),
+            generator.choice(selection_methods),
+            generator.choice(crossover_operators),
+            generator.choice(crossover_thresholds),
+            generator.choice(mutation_operators),
+            generator.choice(mutation_probs),
+            generator.choice(best_selectors),
+            generator.choice(ms),
+            generator.choice(m_updaters)
+        ) for _ in range(n_islands)
+    ]
\ No newline at end of file
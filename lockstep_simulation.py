@@ -0,0 +1,141 @@
+from typing import List, NamedTuple, Optional, Tuple
+from individual import Individual
+from sequence.sequence import Sequence, encode_operators
+from sequence.sequence_evaluator import SequenceEvaluator
+from operators.crossover import CrossoverOperator
+from operators.mutation import MutationOperator
+from operators.selection import SelectionOperator
+from population import BestSelector
+from result_sink import ResultSink, SimulationRecord
+from array_simulation import GeneMatrix, breed_generation, replace_rows, merge_rows, evaluate_rows, initial_fitness_values, decode_row
+from termination import TerminationPolicy
+import copy
+import random
+import m_updater
+import rng
+import simulation
+
+
+"""One configuration of a lockstep batch: the arguments of a run_array_simulation call"""
+class LockstepConfiguration(NamedTuple):
+    population: List[Individual]
+    m: int
+    m_updater: m_updater.MUpdater
+    selection_method: SelectionOperator
+    crossover_operator: CrossoverOperator
+    crossover_threshold: float
+    mutation_operator: MutationOperator
+    mutation_threshold: float
+    best_selector: BestSelector
+    generator: Optional[random.Random] = None
+
+
+"""Runs the configurations one generation of all of them at a time, with the same records as run_array_simulation
+Only the evaluation is batched: the selection, crossover, mutation and replacement run one run at a time"""
+def run_lockstep_simulations(
+    configurations: List[LockstepConfiguration],
+    MAX_ITERATIONS: int,
+    minimize: bool,
+    individual_evaluator: SequenceEvaluator,
+    output_file_name: Optional[str] = "results.txt",
+    optimum_fitness: Optional[float] = None,
+    result_sink: Optional[ResultSink] = None,
+    ordered_population: bool = False,
+    termination_policies: Tuple[TerminationPolicy, ...] = ()
+) -> List[SimulationRecord]:
+    generators = [rng.simulation_generator(configuration.generator) for configuration in configurations]
+    m_updaters = [copy.copy(configuration.m_updater) for configuration in configurations]
+    ms: List[int] = []
+    matrices: List[GeneMatrix] = []
+    for (configuration,updater) in zip(configurations, m_updaters):
+        updater.set_initial_m(configuration.m)
+        ms.append(configuration.m)
+
+        population = configuration.population
+        rows = [bytearray(encode_operators(individual.get_genes())) for individual in population]
+        matrix = GeneMatrix.stack(rows, len(rows[0]), initial_fitness_values(population, rows, individual_evaluator))
+        matrices.append(matrix.ordered(minimize) if ordered_population else matrix)
+
+    best_indices = [matrix.best_index() for matrix in matrices]
+    best_genes = [matrix.row(i) for (matrix,i) in zip(matrices, best_indices)]
+    best_fitness = [matrix.fitness_values[i] for (matrix,i) in zip(matrices, best_indices)]
+
+    # The population of a run, for its termination policies
+    population_genes = lambda run: (lambda: matrices[run].take(range(len(matrices[run]))))
+    fitness_values = lambda run: (lambda: matrices[run].fitness_values)
+
+    progresses: List[simulation.RunProgress] = []
+    for run in range(len(configurations)):
+        progress = simulation.RunProgress(MAX_ITERATIONS, optimum_fitness, copy.deepcopy(termination_policies))
+        progress.start(best_fitness[run], ms[run], fitness_values(run), population_genes(run))
+        progresses.append(progress)
+    runs = [run for run in range(len(configurations)) if progresses[run].running()]
+
+    while len(runs) > 0:
+        # The random part of every run, one at a time, each one with its own generator
+        bred: List[Tuple[List[int], List[bytearray]]] = []
+        for run in runs:
+            configuration = configurations[run]
+            assert ms[run]>0  and  ms[run] % 2 == 0
+            assert len(matrices[run]) % 2 == 0
+
+            bred.append(breed_generation(
+                matrices[run],
+                ms[run],
+                minimize,
+                configuration.selection_method,
+                configuration.crossover_operator,
+                configuration.crossover_threshold,
+                configuration.mutation_operator,
+                configuration.mutation_threshold,
+                configuration.best_selector,
+                generator = generators[run],
+                ordered = ordered_population
+            ))
+
+        # The offspring of all the runs, evaluated at once
+        offspring_fitness = evaluate_rows([row for (_,offspring) in bred for row in offspring], individual_evaluator)
+
+        start = 0
+        for (run,(kept,offspring)) in zip(runs, bred):
+            run_offspring_fitness = offspring_fitness[start : start+len(offspring)]
+            start += len(offspring)
+            if ordered_population:
+                matrix = merge_rows(matrices[run], kept, offspring, run_offspring_fitness, minimize)
+            else:
+                matrix = replace_rows(matrices[run], kept, offspring, run_offspring_fitness)
+            matrices[run] = matrix
+
+            generation_best = 0 if (ordered_population  and  minimize) else matrix.best_index()
+            if matrix.fitness_values[generation_best] < best_fitness[run]:
+                best_genes[run], best_fitness[run] = matrix.row(generation_best), matrix.fitness_values[generation_best]
+
+            progresses[run].end_generation(best_fitness[run], ms[run], len(offspring), fitness_values(run), population_genes(run))
+            ms[run] = m_updaters[run].update_m()
+
+        # The finished runs are masked out of the next generations
+        runs = [run for run in runs if progresses[run].running()]
+
+    records: List[SimulationRecord] = []
+    for (run,configuration) in enumerate(configurations):
+        best_individual = Sequence(decode_row(best_genes[run]))
+        best_individual.set_fitness_value(best_fitness[run])
+
+        record = simulation.make_record(
+            progresses[run].n_generation,
+            best_individual,
+            matrices[run].to_population(),
+            configuration.m,
+            m_updaters[run],
+            configuration.selection_method,
+            configuration.crossover_operator,
+            configuration.crossover_threshold,
+            configuration.mutation_operator,
+            configuration.mutation_threshold,
+            configuration.best_selector,
+            optimum_fitness,
+            progresses[run].finish(fitness_values(run), population_genes(run))
+        )
+        simulation.report_results(record, output_file_name, result_sink)
+        records.append(record)
+    return records
\ No newline at end of file
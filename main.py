@@ -1,7 +1,10 @@
-from typing import List
-from individual import Individual, IndividualEvaluator
+from typing import List, Optional, Tuple
+from individual import IndividualEvaluator
 import sequence.sequence_generator
 import sequence.sequence_evaluator
+import sequence.sequence_cache
+import sequence.sequence_solver
+import sequence.numeric_mode
 import operators.crossover
 from operators.crossover import CrossoverOperator
 import operators.mutation
@@ -10,8 +13,15 @@ import operators.selection
 from operators.selection import SelectionOperator
 from population import PopulationGenerator, BestSelector
 import operators.best_selector
-import random
-import simulation, m_updater
+import simulation, array_simulation, m_updater, sweep, islands
+import result_sink
+import instrumentation
+import termination
+from convergence_trace import TraceWriter
+import batch
+import successive_halving
+import validation
+from validation import ValidationLevel
 
 
 VALUES = [75, 3, 1, 4, 50, 6, 12, 8]
@@ -21,13 +31,71 @@ MINIMIZE = True
 MUTATION_P = 0.1
 MAX_ITERATIONS = 250
 N_REPEATS = 5
+FITNESS_CACHE_SIZE = 4**OPERATOR_LIST_SIZE   # Every possible operator list fits
+N_WORKERS = 1           # Number of processes running the grid (1 = serial)
+TASK_CHUNKSIZE = 16     # Tasks sent to a worker at once
+LOCKSTEP_SIZE = 1       # Consecutive tasks simulated in lockstep, their offspring evaluated together (1 = one by one)
+RESULT_SINK = result_sink.TextResultSink     # or result_sink.BinaryResultSink / result_sink.SQLiteResultSink
+RESUME = True           # Skip the tasks already in the completed index (False starts from scratch)
+COMPLETED_INDEX_FILE_NAME = "completed_tasks_{fingerprint}.txt"     # One index per puzzle, settings and results format
+VALIDATION_LEVEL = ValidationLevel.OFF     # Invariants are checked in development runs, not in the sweep
+INSTRUMENT = False      # Time every phase of every simulation, per configuration
+PHASE_STATS_FILE_NAME = "phase_stats.txt"
+TRACE_EVERY = None      # Record the convergence of every task every TRACE_EVERY generations (None = no traces)
+TRACE_FILE_NAME = "traces.bin"
+STAGNATION_GENERATIONS = 50     # Stagnation limit, when the termination policy is enabled below
+SIMULATION_SEED = 0     # Every task (or puzzle) runs with its own generator, spawned from this seed and the task
+SOLVE_BUDGET = 10_000_000       # Nodes the exact solver may explore for the optimum of the puzzle (None = no limit)
+
+# Island model (main_islands): one process per island, migrating every MIGRATION_INTERVAL generations
+N_ISLANDS = 4
+ISLAND_POPULATION_SIZE = OPERATOR_LIST_SIZE*2
+MIGRATION_INTERVAL = 10
+N_MIGRANTS = 2
+MIGRATION_TOPOLOGY = islands.RingTopology
+
+# Successive halving (main_halving): every configuration starts with HALVING_MIN_BUDGET generations
+# and the best 1/HALVING_ETA survive each round, with HALVING_ETA times the budget, up to MAX_ITERATIONS
+HALVING_MIN_BUDGET = 10
+HALVING_ETA = 3
+
+# Batch mode (main_batch): every puzzle of a JSON lines / CSV file solved with one configuration
+BATCH_POPULATION_SIZE = 14
+BATCH_M = 6
+BATCH_WINDOW = 256      # Puzzles read ahead of the results
+BATCH_CACHE_SIZE = 1_000_000    # Fitness cache entries per process, shared by its puzzles
+BATCH_SOLVE_EXACT = False       # Exact optimum of each puzzle first (branch and bound), to stop at it
+BATCH_SOLVE_BUDGET = 10_000_000 # Nodes the exact solver may explore per puzzle (None = no limit)
 
 population_generator: PopulationGenerator = sequence.sequence_generator.RandomSequencePopulationGenerator
-individual_evaluator: IndividualEvaluator = sequence.sequence_evaluator.SequenceEvaluator(TARGET_VALUE, VALUES)
+# Arithmetic of the evaluations: PythonNumericMode (exact integers, the default), RationalNumericMode,
+# Float64NumericMode or SaturatingNumericMode (constant cost per operator, for long value lists)
+numeric_mode = sequence.numeric_mode.DEFAULT_NUMERIC_MODE
+# A single cached evaluator is shared by every run_simulation call for this puzzle
+fitness_cache = sequence.sequence_cache.FitnessCache(FITNESS_CACHE_SIZE)
+individual_evaluator: IndividualEvaluator = sequence.sequence_cache.CachedSequenceEvaluator(TARGET_VALUE, VALUES, cache=fitness_cache, numeric_mode=numeric_mode)
+
+# Engine running each simulation: simulation.run_simulation (Individual objects) or
+# array_simulation.run_array_simulation (gene matrix, same results, scales to large populations)
+simulation_function = array_simulation.run_array_simulation
+
+# Early termination policies of the sweep runs, reported as the stop reason of the records.
+# None by default, so every run goes on until the optimum or MAX_ITERATIONS. Available:
+# termination.StagnationTermination(STAGNATION_GENERATIONS), termination.DiversityTermination(min_distinct_ratio, min_spread)
+# and termination.TimeBudgetTermination(seconds)
+termination_policies: Tuple[termination.TerminationPolicy, ...] = ()
+
+
+"""Fitness of the exact optimum, which lets every run stop as soon as it is reached (even when 0 is
+not reachable). None when the solver runs out of SOLVE_BUDGET nodes"""
+def optimum_fitness() -> Optional[float]:
+    best = sequence.sequence_solver.BranchAndBoundSequenceSolver(TARGET_VALUE, VALUES, numeric_mode, SOLVE_BUDGET).solve()
+    return None if best is None else best.get_fitness_value()
+
 
 selection_methods: List[SelectionOperator] = [
-    operators.selection.RouletteWheelSelection,
-    operators.selection.DeterministicSelector
+    operators.selection.RouletteWheelSelection(),
+    operators.selection.DeterministicSelector()
 ]
 
 crossover_operators: List[CrossoverOperator] = [
@@ -54,41 +122,155 @@ m_updaters: List[m_updater.MUpdater] = [
 
 population_sizes = range(2, (OPERATOR_LIST_SIZE*2)+1, 2)
 
+crossover_thresholds = [i/5 for i in range(6)]
+mutation_probs = [i/5 for i in range(6)]
+
+
+def main(n_workers: int = N_WORKERS, chunksize: int = TASK_CHUNKSIZE, resume: bool = RESUME, lockstep_size: int = LOCKSTEP_SIZE):
+    tasks = sweep.build_tasks(
+        N_REPEATS,
+        population_sizes,
+        selection_methods,
+        crossover_operators,
+        crossover_thresholds,
+        mutation_operators,
+        mutation_probs,
+        best_selectors,
+        m_updaters
+    )
+    settings = sweep.SweepSettings(
+        population_generator,
+        individual_evaluator,
+        OPERATOR_LIST_SIZE,
+        MAX_ITERATIONS,
+        MINIMIZE,
+        optimum_fitness(),
+        simulation_function,
+        VALIDATION_LEVEL,
+        termination_policies,
+        SIMULATION_SEED,
+        TRACE_EVERY
+    )
+
+    # Only schedule what a previous (interrupted) sweep of the same settings did not complete
+    index_file_name = COMPLETED_INDEX_FILE_NAME.format(fingerprint=sweep.run_fingerprint(settings, RESULT_SINK))
+    index = sweep.CompletedTaskIndex(simulation.RESULT_FILE_PATH + index_file_name, reset=(not resume))
+    tasks = sweep.pending_tasks(tasks, index)
+
+    # Only this process writes to the results files (one per seed)
+    collector = instrumentation.PhaseTimingCollector() if INSTRUMENT else None
+    trace_writer = None if TRACE_EVERY is None else TraceWriter(simulation.RESULT_FILE_PATH + TRACE_FILE_NAME, append=resume)
+    try:
+        sweep.write_sweep_results(
+            sweep.run_sweep(tasks, settings, n_workers, chunksize, collector, lockstep_size, trace_writer),
+            lambda task: f"results_{task.repeat}{RESULT_SINK.FILE_EXTENSION}",
+            RESULT_SINK,
+            index
+        )
+    finally:
+        # The traces of the tasks run so far stay readable
+        if trace_writer is not None:
+            trace_writer.close()
+
+    # The phase stats of the tasks run now, next to the results files (a resumed sweep with
+    # nothing left to run keeps the previous ones)
+    if collector is not None  and  len(tasks) > 0:
+        collector.write(simulation.RESULT_FILE_PATH + PHASE_STATS_FILE_NAME)
+
+
+"""Successive halving over the grid of main(); returns the surviving configurations, best first"""
+def main_halving(n_workers: int = N_WORKERS, chunksize: int = TASK_CHUNKSIZE) -> List[str]:
+    tasks = sweep.build_tasks(
+        N_REPEATS,
+        population_sizes,
+        selection_methods,
+        crossover_operators,
+        crossover_thresholds,
+        mutation_operators,
+        mutation_probs,
+        best_selectors,
+        m_updaters
+    )
+    settings = sweep.SweepSettings(
+        population_generator,
+        individual_evaluator,
+        OPERATOR_LIST_SIZE,
+        MAX_ITERATIONS,
+        MINIMIZE,
+        optimum_fitness(),
+        simulation_function,
+        VALIDATION_LEVEL,
+        termination_policies,
+        SIMULATION_SEED
+    )
+
+    rungs = successive_halving.successive_halving(tasks, settings, HALVING_MIN_BUDGET, HALVING_ETA, n_workers=n_workers, chunksize=chunksize)
+    *_, last_rung = rungs
+
+    sweep.write_sweep_results(
+        last_rung.results,
+        lambda task: f"results_halving_{task.repeat}{RESULT_SINK.FILE_EXTENSION}",
+        RESULT_SINK
+    )
+    return last_rung.ranking
+
+
+def main_islands(seed: int = 0) -> islands.IslandsResult:
+    validation.set_validation_level(VALIDATION_LEVEL)
+    configs = islands.island_configs(
+        N_ISLANDS,
+        seed,
+        selection_methods,
+        crossover_operators,
+        crossover_thresholds,
+        mutation_operators,
+        mutation_probs,
+        best_selectors,
+        list(range(2, ISLAND_POPULATION_SIZE+1, 2)),
+        m_updaters
+    )
+    return islands.run_islands(
+        configs,
+        population_generator,
+        OPERATOR_LIST_SIZE,
+        ISLAND_POPULATION_SIZE,
+        individual_evaluator,
+        MINIMIZE,
+        MAX_ITERATIONS,
+        MIGRATION_INTERVAL,
+        N_MIGRANTS,
+        MIGRATION_TOPOLOGY,
+        optimum_fitness()
+    )
+
 
-def main():
-    # Repeat n_repeats times
-    for repeat in range(N_REPEATS):
-        seed = repeat
-        random.seed(seed)
-
-        # Try different population sizes
-        for population_size in population_sizes:
-
-            population: List[Individual] = population_generator.generate(OPERATOR_LIST_SIZE, population_size)
-
-            for selection_method in selection_methods:
-                for crossover_operator in crossover_operators:
-                    for crossover_threshold in [i/5 for i in range(6)]:
-                        for mutation_operator in mutation_operators:
-                            for mutation_prob in [i/5 for i in range(6)]:
-                                for best_selector in best_selectors:
-                                    for m in range(2, len(population)+1, 2):
-                                        for m_updater in m_updaters:
-                                            simulation.run_simulation(
-                                                population,
-                                                MAX_ITERATIONS,
-                                                m,
-                                                m_updater,
-                                                MINIMIZE,
-                                                individual_evaluator,
-                                                selection_method,
-                                                crossover_operator,
-                                                crossover_threshold,
-                                                mutation_operator,
-                                                mutation_prob,
-                                                best_selector,
-                                                output_file_name = f"results_{seed}.txt"
-                                            )
+def main_batch(input_file_name: str, output_file_name: str, n_workers: int = N_WORKERS, chunksize: int = TASK_CHUNKSIZE) -> int:
+    settings = batch.BatchSettings(
+        population_generator,
+        BATCH_POPULATION_SIZE,
+        MAX_ITERATIONS,
+        BATCH_M,
+        m_updaters[0],
+        MINIMIZE,
+        operators.selection.DeterministicSelector(),
+        crossover_operators[0],
+        0.8,
+        operators.mutation.StringMutation,
+        0.2,
+        operators.best_selector.BestDeterministicSelector,
+        simulation_function,
+        termination_policies,
+        BATCH_CACHE_SIZE,
+        BATCH_SOLVE_EXACT,
+        VALIDATION_LEVEL,
+        numeric_mode,
+        SIMULATION_SEED,
+        BATCH_SOLVE_BUDGET
+    )
+    return batch.write_batch_results(
+        batch.solve_puzzles(batch.read_puzzles(input_file_name), settings, n_workers, BATCH_WINDOW, chunksize),
+        output_file_name
+    )
 
 
 if __name__ == "__main__":
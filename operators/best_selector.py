@@ -1,13 +1,18 @@
 from individual import Individual
-from typing import List
+from typing import List, Set
+import heapq
+import math
 import random
+import rng
+from rng import GLOBAL_GENERATOR
 from population import BestSelector
+from operators.selection import RouletteWheelSelection, best_indices
 
 
 """Returns the population excluding the 'remove_size' worst ones."""
 class BestDeterministicSelector(BestSelector):
     @staticmethod
-    def select_best(population: List[Individual], remove_size: int, minimize: bool) -> List[Individual]:
+    def select_best(population: List[Individual], remove_size: int, minimize: bool, generator: random.Random = GLOBAL_GENERATOR) -> List[Individual]:
         if remove_size == 0:
             return population.copy()
         if remove_size == len(population):
@@ -16,11 +21,26 @@ class BestDeterministicSelector(BestSelector):
         assert 0 < remove_size < len(population)
         new_size = len(population) - remove_size
 
-        selected = sorted(population, reverse=(not minimize))[:new_size]
+        selected = [
+            population[i] 
+            for i in best_indices([individual.get_fitness_value() for individual in population], new_size, minimize)
+        ]
         assert len(selected) < len(population)
         assert len(selected) + remove_size == len(population)
 
         return selected
+
+    @staticmethod
+    def select_best_indices(fitness_values: List[float], remove_size: int, minimize: bool, generator: random.Random = GLOBAL_GENERATOR, ordered: bool = False) -> List[int]:
+        if remove_size == 0:
+            return list(range(len(fitness_values)))
+        if remove_size == len(fitness_values):
+            return []
+
+        assert 0 < remove_size < len(fitness_values)
+        new_size = len(fitness_values) - remove_size
+
+        return best_indices(fitness_values, new_size, minimize, ordered)
     
     @staticmethod
     def __str__() -> str:
@@ -32,44 +52,49 @@ fitness values have a higher chance of being selected. Unlike in Roulette select
 does not allow for duplicates"""
 class BestProbabilisticSelector(BestSelector):
     @staticmethod
-    def select_best(population: List[Individual], remove_size: int, minimize: bool) -> List[Individual]:
+    def select_best(population: List[Individual], remove_size: int, minimize: bool, generator: random.Random = GLOBAL_GENERATOR) -> List[Individual]:
         if remove_size == 0:
             return population.copy()
         if remove_size == len(population):
             return []
         
-        fitness_values = {i:individual.get_fitness_value() for (i,individual) in enumerate(population)}
-        if minimize:
-            probabilities = {key:sum(fitness_values.values())/value for (key,value) in fitness_values.items()}
-            probabilities = {key:value/sum(probabilities.values()) for (key,value) in probabilities.items()}
-        else:
-            probabilities = {key:value/sum(fitness_values.values()) for (key,value) in fitness_values.items()}
-        assert 1 - sum(probabilities.values()) < 1e-5
-        accumulator = 0
-        cumulative_probabilities = {}
-        for (key,value) in probabilities.items():
-            cumulative_probabilities[key] = value+accumulator
-            accumulator += value
-        
-        assert 0 < remove_size < len(population)
-        to_remove = set()
-
-        while len(to_remove) < remove_size:
-            # Calculate random number
-            p = random.random()*sum(probabilities.values())
-            assert p>=0  and  p<=sum(probabilities.values())
-
-            selected_individual = population[
-                next(k for (k,v) in cumulative_probabilities.items() if v>=p)
-            ]
-
-            to_remove.add(selected_individual)
+        to_remove = BestProbabilisticSelector.select_removed_indices(
+            [individual.get_fitness_value() for individual in population],
+            remove_size,
+            minimize,
+            generator
+        )
         
-        best_selected = [ind for ind in population if ind not in to_remove]
+        best_selected = [ind for (i,ind) in enumerate(population) if i not in to_remove]
         assert len(to_remove) == remove_size
         assert len(best_selected) + len(to_remove) == len(population)
 
         return best_selected
+
+    @staticmethod
+    def select_best_indices(fitness_values: List[float], remove_size: int, minimize: bool, generator: random.Random = GLOBAL_GENERATOR, ordered: bool = False) -> List[int]:
+        if remove_size == 0:
+            return list(range(len(fitness_values)))
+        if remove_size == len(fitness_values):
+            return []
+
+        to_remove = BestProbabilisticSelector.select_removed_indices(fitness_values, remove_size, minimize, generator)
+        return [i for i in range(len(fitness_values)) if i not in to_remove]
+
+    """Roulette wheel sample of 'remove_size' distinct positions to remove (Efraimidis-Spirakis)"""
+    @staticmethod
+    def select_removed_indices(fitness_values: List[float], remove_size: int, minimize: bool, generator: random.Random = GLOBAL_GENERATOR) -> Set[int]:
+        assert 0 < remove_size < len(fitness_values)
+
+        probabilities = RouletteWheelSelection.get_probabilities(fitness_values, minimize)
+        keys = [
+            math.log(1.0 - draw)/probability if probability > 0 else -math.inf
+            for (probability,draw) in zip(probabilities, rng.random_floats(generator, len(probabilities)))
+        ]
+
+        to_remove = set(heapq.nlargest(remove_size, range(len(keys)), key=keys.__getitem__))
+        assert len(to_remove) == remove_size
+        return to_remove
     
     @staticmethod
     def __str__() -> str:
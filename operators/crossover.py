@@ -1,14 +1,48 @@
 from abc import ABC, abstractmethod
 from individual import Individual
-from typing import List
+from typing import List, Sequence, Tuple
 import random
+import validation
+import rng
+from rng import GLOBAL_GENERATOR
+from validation import ValidationLevel
+
+
+"""Indices of the pairs that pass the crossover probability, with all their thresholds drawn at once"""
+def crossed_pair_indices(n_pairs: int, crossover_probability: float, generator: random.Random = GLOBAL_GENERATOR) -> List[int]:
+    return [i for (i,draw) in enumerate(rng.random_floats(generator, n_pairs)) if draw <= crossover_probability]
+
+
+"""Children of two parents, each cloned from the parent it shares its first genes with"""
+def clone_children(parent1: Individual, parent2: Individual, children_genes: Tuple[Sequence, Sequence]) -> List[Individual]:
+    return [parent.clone(genes) for (parent,genes) in zip((parent1, parent2), children_genes)]
 
 
 """Strategy interface for all crossover operators"""
 class CrossoverOperator(ABC):
     @abstractmethod
-    def crossover(self, parent1: Individual, parent2: Individual) -> List[Individual]:
+    def crossover(self, parent1: Individual, parent2: Individual, generator: random.Random = GLOBAL_GENERATOR) -> List[Individual]:
+        raise NotImplemented()
+
+    """Same crossover over two gene sequences (tuples, lists, bytes...), returning the
+    children genes, of the same type"""
+    @abstractmethod
+    def crossover_genes(self, genes1: Sequence, genes2: Sequence, generator: random.Random = GLOBAL_GENERATOR) -> Tuple[Sequence, Sequence]:
         raise NotImplemented()
+
+    """Crosses the pairs of a generation that pass the crossover probability, returning (pair position, children genes)"""
+    def crossover_pairs(
+        self,
+        pairs: List[Tuple[Sequence, Sequence]],
+        crossover_probability: float,
+        generator: random.Random = GLOBAL_GENERATOR
+    ) -> List[Tuple[int, Sequence, Sequence]]:
+        crossed: List[Tuple[int, Sequence, Sequence]] = []
+        for (i,(genes1,genes2)) in enumerate(pairs):
+            if generator.random() <= crossover_probability:
+                crossed.append((i, *self.crossover_genes(genes1, genes2, generator)))
+        return crossed
+
     @abstractmethod
     def __str__(self) -> str:
         raise NotImplemented()
@@ -21,18 +55,23 @@ class OnePointDeterministicCrossOver(CrossoverOperator):
         assert crossover_point >= 0
         self.crossover_point: int = crossover_point
 
-    def crossover(self, parent1: Individual, parent2: Individual) -> List[Individual]:
-        operators1, operators2 = parent1.get_gene_list(), parent2.get_gene_list()
+    def crossover_genes(self, genes1: Sequence, genes2: Sequence, generator: random.Random = GLOBAL_GENERATOR) -> Tuple[Sequence, Sequence]:
+        assert len(genes1) == len(genes2)
+        return (
+            genes1[:self.crossover_point] + genes2[self.crossover_point:],
+            genes2[:self.crossover_point] + genes1[self.crossover_point:]
+        )
+
+    def crossover(self, parent1: Individual, parent2: Individual, generator: random.Random = GLOBAL_GENERATOR) -> List[Individual]:
+        operators1, operators2 = parent1.get_genes(), parent2.get_genes()
 
         assert len(operators1) == len(operators2)
 
-        children = [
-            parent1.clone(operators1[:self.crossover_point] + operators2[self.crossover_point:]),
-            parent1.clone(operators2[:self.crossover_point] + operators1[self.crossover_point:])
-        ]
+        children = clone_children(parent1, parent2, self.crossover_genes(operators1, operators2, generator))
 
         assert len(children) == 2
-        assert len(children[0].get_gene_list()) == len(children[1].get_gene_list()) == len(operators1)
+        if validation.enabled(ValidationLevel.CHEAP):
+            assert len(children[0].get_genes()) == len(children[1].get_genes()) == len(operators1)
 
         return children
     
@@ -42,21 +81,123 @@ class OnePointDeterministicCrossOver(CrossoverOperator):
 
 """Concrete strategy for 1-point random crossover"""
 class OnePointRandomCrossOver(CrossoverOperator):
-    def crossover(self, parent1: Individual, parent2: Individual) -> List[Individual]:
-        operators1, operators2 = parent1.get_gene_list(), parent2.get_gene_list()
-        assert len(operators1) == len(operators2)
+    def crossover_genes(self, genes1: Sequence, genes2: Sequence, generator: random.Random = GLOBAL_GENERATOR) -> Tuple[Sequence, Sequence]:
+        assert len(genes1) == len(genes2)
 
-        crossover_point = random.randint(0, len(operators1))
+        crossover_point = generator.randint(0, len(genes1))
 
-        children = [
-            parent1.clone(operators1[:crossover_point] + operators2[crossover_point:]),
-            parent1.clone(operators2[:crossover_point] + operators1[crossover_point:])
-        ]
+        return (
+            genes1[:crossover_point] + genes2[crossover_point:],
+            genes2[:crossover_point] + genes1[crossover_point:]
+        )
+
+    def crossover(self, parent1: Individual, parent2: Individual, generator: random.Random = GLOBAL_GENERATOR) -> List[Individual]:
+        operators1, operators2 = parent1.get_genes(), parent2.get_genes()
+        assert len(operators1) == len(operators2)
+
+        children = clone_children(parent1, parent2, self.crossover_genes(operators1, operators2, generator))
 
         assert len(children) == 2
-        assert len(children[0].get_gene_list()) == len(children[1].get_gene_list())
+        if validation.enabled(ValidationLevel.CHEAP):
+            assert len(children[0].get_genes()) == len(children[1].get_genes())
 
         return children
     
     def __str__(self) -> str:
         return "one_point_random"
+
+
+"""Concrete strategy for uniform crossover"""
+class UniformCrossOver(CrossoverOperator):
+    def __init__(self, swap_probability: float = 0.5) -> None:
+        super().__init__()
+        assert 0 <= swap_probability <= 1
+        self.swap_probability: float = swap_probability
+
+    """Children genes (of the type of 'genes1') for the given swap draws, one per gene"""
+    def swap_genes(self, genes1: Sequence, genes2: Sequence, draws: List[float]) -> Tuple[Sequence, Sequence]:
+        assert len(genes1) == len(genes2) == len(draws)
+        swap_probability = self.swap_probability
+        child1 = [gene2 if draw < swap_probability else gene1 for (gene1,gene2,draw) in zip(genes1, genes2, draws)]
+        child2 = [gene1 if draw < swap_probability else gene2 for (gene1,gene2,draw) in zip(genes1, genes2, draws)]
+        return type(genes1)(child1), type(genes1)(child2)
+
+    def crossover_genes(self, genes1: Sequence, genes2: Sequence, generator: random.Random = GLOBAL_GENERATOR) -> Tuple[Sequence, Sequence]:
+        return self.swap_genes(genes1, genes2, rng.random_floats(generator, len(genes1)))
+
+    def crossover_pairs(
+        self,
+        pairs: List[Tuple[Sequence, Sequence]],
+        crossover_probability: float,
+        generator: random.Random = GLOBAL_GENERATOR
+    ) -> List[Tuple[int, Sequence, Sequence]]:
+        crossed = crossed_pair_indices(len(pairs), crossover_probability, generator)
+        if len(crossed) == 0:
+            return []
+        n_genes = len(pairs[0][0])
+        draws = rng.random_floats(generator, len(crossed)*n_genes)
+
+        return [
+            (i, *self.swap_genes(pairs[i][0], pairs[i][1], draws[start : start+n_genes]))
+            for (i,start) in zip(crossed, range(0, len(draws), n_genes))
+        ]
+
+    def crossover(self, parent1: Individual, parent2: Individual, generator: random.Random = GLOBAL_GENERATOR) -> List[Individual]:
+        operators1, operators2 = parent1.get_genes(), parent2.get_genes()
+        assert len(operators1) == len(operators2)
+
+        children = clone_children(parent1, parent2, self.crossover_genes(operators1, operators2, generator))
+
+        assert len(children) == 2
+        if validation.enabled(ValidationLevel.CHEAP):
+            assert len(children[0].get_genes()) == len(children[1].get_genes()) == len(operators1)
+
+        return children
+
+    def __str__(self) -> str:
+        return f"uniform_{self.swap_probability}"
+
+
+"""Concrete strategy for 2-point random crossover"""
+class TwoPointRandomCrossOver(CrossoverOperator):
+    """Children genes for the segment between the points given by two draws"""
+    @staticmethod
+    def swap_segment(genes1: Sequence, genes2: Sequence, draw1: float, draw2: float) -> Tuple[Sequence, Sequence]:
+        assert len(genes1) == len(genes2)
+        (start, end) = sorted((int(draw1*(len(genes1)+1)), int(draw2*(len(genes1)+1))))
+        return (
+            genes1[:start] + genes2[start:end] + genes1[end:],
+            genes2[:start] + genes1[start:end] + genes2[end:]
+        )
+
+    def crossover_genes(self, genes1: Sequence, genes2: Sequence, generator: random.Random = GLOBAL_GENERATOR) -> Tuple[Sequence, Sequence]:
+        return TwoPointRandomCrossOver.swap_segment(genes1, genes2, *rng.random_floats(generator, 2))
+
+    def crossover_pairs(
+        self,
+        pairs: List[Tuple[Sequence, Sequence]],
+        crossover_probability: float,
+        generator: random.Random = GLOBAL_GENERATOR
+    ) -> List[Tuple[int, Sequence, Sequence]]:
+        crossed = crossed_pair_indices(len(pairs), crossover_probability, generator)
+        draws = rng.random_floats(generator, 2*len(crossed))
+
+        return [
+            (i, *TwoPointRandomCrossOver.swap_segment(pairs[i][0], pairs[i][1], draws[2*j], draws[2*j+1]))
+            for (j,i) in enumerate(crossed)
+        ]
+
+    def crossover(self, parent1: Individual, parent2: Individual, generator: random.Random = GLOBAL_GENERATOR) -> List[Individual]:
+        operators1, operators2 = parent1.get_genes(), parent2.get_genes()
+        assert len(operators1) == len(operators2)
+
+        children = clone_children(parent1, parent2, self.crossover_genes(operators1, operators2, generator))
+
+        assert len(children) == 2
+        if validation.enabled(ValidationLevel.CHEAP):
+            assert len(children[0].get_genes()) == len(children[1].get_genes()) == len(operators1)
+
+        return children
+
+    def __str__(self) -> str:
+        return "two_point_random"
\ No newline at end of file
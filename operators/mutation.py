@@ -1,13 +1,21 @@
 from abc import ABC, abstractstaticmethod, abstractmethod
 from individual import Individual
 from sequence.sequence import ARITHMETIC_OPERATORS
+from typing import MutableSequence, Sequence
 import random
+from rng import GLOBAL_GENERATOR
 
 
 """Strategy interface for all mutation operators"""
 class MutationOperator(ABC):
     @abstractstaticmethod
-    def mutate(child: Individual, pm: float) -> None:
+    def mutate(child: Individual, pm: float, generator: random.Random = GLOBAL_GENERATOR) -> None:
+        raise NotImplemented()
+
+    """Same mutation, in place, over a mutable gene sequence whose genes are taken
+    from 'alphabet'. Returns whether the genes changed"""
+    @abstractstaticmethod
+    def mutate_genes(genes: MutableSequence, pm: float, alphabet: Sequence, generator: random.Random = GLOBAL_GENERATOR) -> bool:
         raise NotImplemented()
     
     @abstractstaticmethod
@@ -15,17 +23,23 @@ class MutationOperator(ABC):
         raise NotImplemented()
 
 
-"""Changes one char in the gene_list"""
+"""Changes one char in the gene_list. The genes of an individual are immutable, so the
+mutated genes are a new tuple (the draws are the same as those of mutate_genes)"""
 class StringMutation(MutationOperator):
     @staticmethod
-    def mutate(individual: Individual, mutation_probability: float) -> None:
-        operators = individual.get_gene_list()
+    def mutate(individual: Individual, mutation_probability: float, generator: random.Random = GLOBAL_GENERATOR) -> None:
+        if generator.random() <= mutation_probability:
+            operators = individual.get_genes()
+            index = generator.randint(0, len(operators)-1)
+            individual.set_gene_list(operators[:index] + (generator.choice(ARITHMETIC_OPERATORS),) + operators[index+1:])
 
-        if random.random() <= mutation_probability:
-            index = random.randint(0, len(operators)-1)
-            new_operator = random.choice(ARITHMETIC_OPERATORS)
-            operators[index] = new_operator
-            individual.set_gene_list(operators)
+    @staticmethod
+    def mutate_genes(genes: MutableSequence, mutation_probability: float, alphabet: Sequence, generator: random.Random = GLOBAL_GENERATOR) -> bool:
+        if generator.random() <= mutation_probability:
+            index = generator.randint(0, len(genes)-1)
+            genes[index] = generator.choice(alphabet)
+            return True
+        return False
     
     @staticmethod
     def __str__() -> str:
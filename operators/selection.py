@@ -1,17 +1,43 @@
-from abc import ABC, abstractstaticmethod
+from abc import ABC, abstractmethod
 from individual import Individual
-from typing import List, Optional, Dict
+from typing import List, Optional
+import bisect
+import heapq
+import itertools
 import random
+import validation
+import rng
+from rng import GLOBAL_GENERATOR
+from validation import ValidationLevel
+
+"""best_indices switches from a heap to a full sort when k is larger than len/PARTIAL_SORT_RATIO"""
+PARTIAL_SORT_RATIO = 4
+
+
+"""Positions of the k best fitness values, best first, as a stable sort would give them"""
+def best_indices(fitness_values: List[float], k: int, minimize: bool, ordered: bool = False) -> List[int]:
+    if ordered:
+        return list(range(k))
+    positions = range(len(fitness_values))
+    if k*PARTIAL_SORT_RATIO <= len(fitness_values):
+        partial_sort = heapq.nsmallest if minimize else heapq.nlargest
+        return partial_sort(k, positions, key=fitness_values.__getitem__)
+    return sorted(positions, key=fitness_values.__getitem__, reverse=(not minimize))[:k]
 
 
 """Strategy interface for all selection operators"""
 class SelectionOperator(ABC):
-    @abstractstaticmethod
-    def select(population: List[Individual], m:int, minimize: bool) -> List[Individual]:
+    @abstractmethod
+    def select(self, population: List[Individual], m:int, minimize: bool, generator: random.Random = GLOBAL_GENERATOR) -> List[Individual]:
+        raise NotImplemented()
+
+    """Same selection over a list of fitness values, returning the selected positions"""
+    @abstractmethod
+    def select_indices(self, fitness_values: List[float], m: int, minimize: bool, generator: random.Random = GLOBAL_GENERATOR, ordered: bool = False) -> List[int]:
         raise NotImplemented()
     
-    @abstractstaticmethod
-    def __str__() -> str:
+    @abstractmethod
+    def __str__(self) -> str:
         raise NotImplemented
 
 
@@ -19,101 +45,172 @@ class SelectionOperator(ABC):
 correspond to the random number generated"""
 class RouletteWheelSelection(SelectionOperator):
     @staticmethod
-    def get_fitness_value_list(population: List[Individual], alternative_fitness: Optional[List[float]] = None) -> Dict[int, float]:
+    def get_fitness_value_list(population: List[Individual], alternative_fitness: Optional[List[float]] = None) -> List[float]:
         if alternative_fitness is None:
-            return {i:individual.get_fitness_value() for (i,individual) in enumerate(population)}
+            return [individual.get_fitness_value() for individual in population]
         else:
-            return {i:fitness_value for (i,fitness_value) in enumerate(alternative_fitness)}
+            return list(alternative_fitness)
     
     @staticmethod
-    def get_probabilities(fitness_values: Dict[int, float], minimize: bool) -> Dict[int, float]:
-        sum_fitness = sum(fitness_values.values())
+    def get_probabilities(fitness_values: List[float], minimize: bool) -> List[float]:
+        sum_fitness = sum(fitness_values)
 
         if minimize:
-            probabilities: Dict[int, float] = {key:sum_fitness/value for (key,value) in fitness_values.items()}
-            probabilities: Dict[int, float] = {key:value/sum(probabilities.values()) for (key,value) in probabilities.items()}
+            inverse_fitness: List[float] = [sum_fitness/value for value in fitness_values]
+            sum_inverse_fitness = sum(inverse_fitness)
+            probabilities: List[float] = [value/sum_inverse_fitness for value in inverse_fitness]
         else:
-            probabilities: Dict[int, float] = {key:value/sum_fitness for (key,value) in fitness_values.items()}
+            probabilities: List[float] = [value/sum_fitness for value in fitness_values]
 
-        assert 1 - sum(probabilities.values()) < 1e-5
+        if validation.enabled(ValidationLevel.CHEAP):
+            assert 1 - sum(probabilities) < 1e-5
         return probabilities
         
     @staticmethod
-    def get_cumulative_probabilities(probabilities: Dict[int, float]) -> Dict[int, float]:
-        accumulator = 0
-        cumulative_probabilities = {}
-        for (key,value) in probabilities.items():
-            cumulative_probabilities[key] = value+accumulator
-            accumulator += value
-        
-        return cumulative_probabilities
+    def get_cumulative_probabilities(probabilities: List[float]) -> List[float]:
+        return list(itertools.accumulate(probabilities))
     
     @staticmethod
-    def turn_wheel(population: List[Individual], selection_size, cumulative_probabilities, sum_probabilities) -> List[Individual]:
-        selected: List[Individual] = []
-
-        for i in range(selection_size):
-            p = random.random()*sum_probabilities
-            assert p>=0  and  p<=sum_probabilities
-
-            selected.append(
-                population[
-                    next(   # The first one
-                        k for (k,v) in cumulative_probabilities.items() if v>=p     # Only those above the threshold
-                    )
-                ].clone()
-            )
+    def turn_wheel_indices(
+        selection_size: int,
+        cumulative_probabilities: List[float],
+        sum_probabilities: float,
+        generator: random.Random = GLOBAL_GENERATOR
+    ) -> List[int]:
+        last = len(cumulative_probabilities) - 1
+        check_draws = validation.enabled(ValidationLevel.FULL)
+        selected: List[int] = []
+
+        for draw in rng.random_floats(generator, selection_size):
+            p = draw*sum_probabilities
+            if check_draws:
+                assert p>=0  and  p<=sum_probabilities
+
+            # The first one whose cumulative probability is above the threshold
+            selected.append(min(bisect.bisect_left(cumulative_probabilities, p), last))
         
         assert len(selected) == selection_size
 
         return selected
 
     @staticmethod
+    def turn_wheel(
+        population: List[Individual],
+        selection_size: int,
+        cumulative_probabilities: List[float],
+        sum_probabilities: float,
+        generator: random.Random = GLOBAL_GENERATOR
+    ) -> List[Individual]:
+        return [
+            population[i].clone() 
+            for i in RouletteWheelSelection.turn_wheel_indices(selection_size, cumulative_probabilities, sum_probabilities, generator)
+        ]
+
     def select(
+        self,
         population: List[Individual],
         m: int, 
         minimize: bool, 
         alternative_fitness: Optional[List[float]] = None, 
+        generator: random.Random = GLOBAL_GENERATOR
     ) -> List[Individual]:
         if m == 0:
             return []
         
         assert 0 < m <= len(population)
 
-        fitness_values: Dict[int, float] = RouletteWheelSelection.get_fitness_value_list(population, alternative_fitness)
-        probabilities: Dict[int, float] = RouletteWheelSelection.get_probabilities(fitness_values, minimize)
-        cumulative_probabilities: Dict[int, float] = RouletteWheelSelection.get_cumulative_probabilities(probabilities)
+        fitness_values: List[float] = RouletteWheelSelection.get_fitness_value_list(population, alternative_fitness)
+        probabilities: List[float] = RouletteWheelSelection.get_probabilities(fitness_values, minimize)
+        cumulative_probabilities: List[float] = RouletteWheelSelection.get_cumulative_probabilities(probabilities)
 
         selected: List[Individual] = RouletteWheelSelection.turn_wheel(
             population,
             m,
             cumulative_probabilities,
-            sum(probabilities.values())    
+            sum(probabilities),
+            generator
         )
 
         assert len(selected) == m
         return selected
 
-    @staticmethod
-    def __str__() -> str:
+    def select_indices(self, fitness_values: List[float], m: int, minimize: bool, generator: random.Random = GLOBAL_GENERATOR, ordered: bool = False) -> List[int]:
+        if m == 0:
+            return []
+        
+        assert 0 < m <= len(fitness_values)
+
+        probabilities: List[float] = RouletteWheelSelection.get_probabilities(fitness_values, minimize)
+
+        return RouletteWheelSelection.turn_wheel_indices(
+            m,
+            RouletteWheelSelection.get_cumulative_probabilities(probabilities),
+            sum(probabilities),
+            generator
+        )
+
+    def __str__(self) -> str:
         return "roulette"
 
 
 """This deterministic selection method returns the m best individuals within the population"""
 class DeterministicSelector(SelectionOperator):
-    @staticmethod
-    def select(population: List[Individual], m: int, minimize: bool) -> List[Individual]:
+    def select(self, population: List[Individual], m: int, minimize: bool, generator: random.Random = GLOBAL_GENERATOR) -> List[Individual]:
         if m == 0:
             return []
         assert 0 < m <= len(population)
 
-        m_best_population = (sorted(population, reverse=(not minimize)))[:m]
-        assert min(population) in m_best_population
-        assert (max(population) not in m_best_population)  or  (m==len(m_best_population))
+        m_best_population = [
+            population[i] 
+            for i in best_indices([individual.get_fitness_value() for individual in population], m, minimize)
+        ]
 
         assert len(m_best_population) == m
         return m_best_population
 
-    @staticmethod
-    def __str__() -> str:
-        return "deterministic"
\ No newline at end of file
+    def select_indices(self, fitness_values: List[float], m: int, minimize: bool, generator: random.Random = GLOBAL_GENERATOR, ordered: bool = False) -> List[int]:
+        if m == 0:
+            return []
+        assert 0 < m <= len(fitness_values)
+
+        return best_indices(fitness_values, m, minimize, ordered)
+
+    def __str__(self) -> str:
+        return "deterministic"
+
+
+"""Tournament selection: each of the 'm' selected individuals is the best of 'k' random ones"""
+class TournamentSelection(SelectionOperator):
+    def __init__(self, k: int = 2) -> None:
+        super().__init__()
+        assert k > 0
+        self.k: int = k
+
+    def select_indices(self, fitness_values: List[float], m: int, minimize: bool, generator: random.Random = GLOBAL_GENERATOR, ordered: bool = False) -> List[int]:
+        if m == 0:
+            return []
+        assert 0 < m <= len(fitness_values)
+
+        # The contenders of every tournament are 'k' consecutive draws
+        n = len(fitness_values)
+        contenders = [int(draw*n) for draw in rng.random_floats(generator, m*self.k)]
+
+        # All the tournaments at once, one contender at a time; the first of the best wins
+        selected = contenders[0::self.k]
+        for j in range(1, self.k):
+            if minimize:
+                selected = [i if fitness_values[i] <= fitness_values[c] else c for (i,c) in zip(selected, contenders[j::self.k])]
+            else:
+                selected = [i if fitness_values[i] >= fitness_values[c] else c for (i,c) in zip(selected, contenders[j::self.k])]
+
+        assert len(selected) == m
+        return selected
+
+    def select(self, population: List[Individual], m: int, minimize: bool, generator: random.Random = GLOBAL_GENERATOR) -> List[Individual]:
+        return [
+            population[i].clone()
+            for i in self.select_indices([individual.get_fitness_value() for individual in population], m, minimize, generator)
+        ]
+
+    def __str__(self) -> str:
+        return f"tournament_{self.k}"
\ No newline at end of file
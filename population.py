@@ -1,21 +1,48 @@
 from abc import ABC, abstractstaticmethod
-from individual import Individual
-from typing import List
+from individual import Individual, IndividualEvaluator
+from typing import List, Tuple
+from rng import GLOBAL_GENERATOR
+import random
 
 
 """Factory-method interface for all population generators"""
 class PopulationGenerator(ABC):
     @abstractstaticmethod
-    def generate(list_size: int, population_size: int) -> List[Individual]:
+    def generate(list_size: int, population_size: int, generator: random.Random = GLOBAL_GENERATOR) -> List[Individual]:
         raise NotImplemented()
 
 
 """Strategy interface for all methods responsible to return the best individuals in a population"""
 class BestSelector(ABC):
     @abstractstaticmethod
-    def select_best(population: List[Individual], remove_size: int, minimize: bool) -> List[Individual]:
+    def select_best(population: List[Individual], remove_size: int, minimize: bool, generator: random.Random = GLOBAL_GENERATOR) -> List[Individual]:
+        raise NotImplemented()
+
+    """Same selection over fitness values (sorted best first when 'ordered'), returning the kept positions"""
+    @abstractstaticmethod
+    def select_best_indices(fitness_values: List[float], remove_size: int, minimize: bool, generator: random.Random = GLOBAL_GENERATOR, ordered: bool = False) -> List[int]:
         raise NotImplemented()
     
     @abstractstaticmethod
     def __str__() -> str:
-        raise NotImplemented()
\ No newline at end of file
+        raise NotImplemented()
+
+
+"""Immutable, evaluated initial population; every run gets clones of its frozen individuals"""
+class PopulationSnapshot:
+    def __init__(self, population: List[Individual], individual_evaluator: IndividualEvaluator) -> None:
+        prototypes = [individual.clone() for individual in population]
+        individual_evaluator.evaluate_population(prototypes)
+        for prototype in prototypes:
+            prototype.freeze()
+        self.prototypes: Tuple[Individual, ...] = tuple(prototypes)
+
+    """A fresh population for one run"""
+    def population(self) -> List[Individual]:
+        return [prototype.clone() for prototype in self.prototypes]
+
+    def fitness_values(self) -> List[float]:
+        return [prototype.get_fitness_value() for prototype in self.prototypes]
+
+    def __len__(self) -> int:
+        return len(self.prototypes)
\ No newline at end of file
@@ -0,0 +1,206 @@
+from abc import ABC, abstractmethod
+from array import array
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional, Tuple
+import math
+import sqlite3
+import struct
+import sys
+
+
+"""Bytes of an array in little-endian order, the byte order of the binary files"""
+def to_little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+"""Reads an array of 'length' little-endian values of the 'typecode' type"""
+def read_array(f: BinaryIO, typecode: str, length: int) -> array:
+    values = array(typecode)
+    values.frombytes(f.read(values.itemsize * length))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+"""Typed results of one simulation"""
+class SimulationRecord(NamedTuple):
+    n_generation: int
+    best_fitness: float
+    best_genes: Tuple[str, ...]
+    population_size: int
+    initial_m: int
+    m_updater: str
+    selection_method: str
+    crossover_operator: str
+    crossover_threshold: float
+    mutation_operator: str
+    mutation_threshold: float
+    best_selector: str
+    gap_to_optimum: Optional[float] = None
+    stop_reason: Optional[str] = None
+
+
+"""One line of the semicolon separated results file"""
+def format_record(record: SimulationRecord) -> str:
+    fields = [
+        f"{record.n_generation};",
+        f"{record.best_fitness};",
+        f"{list(record.best_genes)};",
+        f"population_size={record.population_size};",
+        f"initial_m={record.initial_m};",
+        f"m_updater={record.m_updater};",
+        f"selection_method={record.selection_method};",
+        f"crossover_operator={record.crossover_operator};",
+        f"crossover_threshold={record.crossover_threshold};",
+        f"mutation_threshold={record.mutation_threshold};",
+        f"best_selector={record.best_selector};",
+    ]
+    if record.gap_to_optimum is not None:
+        fields.append(f"gap_to_optimum={record.gap_to_optimum};")
+    if record.stop_reason is not None:
+        fields.append(f"stop_reason={record.stop_reason};")
+    fields.append("\n")
+    return "".join(fields)
+
+
+"""Strategy interface for all result sinks. Records are buffered in memory and
+written in bulk every 'buffer_size' records and when the sink is closed"""
+class ResultSink(ABC):
+    FILE_EXTENSION = ""
+
+    def __init__(self, path: str, buffer_size: int = 1000) -> None:
+        assert buffer_size > 0
+        self.path: str = path
+        self.buffer_size: int = buffer_size
+        self.buffer: List[SimulationRecord] = []
+
+    def write(self, record: SimulationRecord) -> None:
+        self.buffer.append(record)
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if len(self.buffer) > 0:
+            self.write_records(self.buffer)
+            self.buffer = []
+
+    def close(self) -> None:
+        self.flush()
+
+    @abstractmethod
+    def write_records(self, records: List[SimulationRecord]) -> None:
+        raise NotImplemented()
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.close()
+
+
+"""The semicolon separated text format of results/results_{seed}.txt"""
+class TextResultSink(ResultSink):
+    FILE_EXTENSION = ".txt"
+
+    def write_records(self, records: List[SimulationRecord]) -> None:
+        with open(self.path, "a") as f:
+            f.write("".join(format_record(record) for record in records))
+
+
+"""Columnar binary format: every flush appends a block of little-endian columns in SimulationRecord order"""
+class BinaryResultSink(ResultSink):
+    FILE_EXTENSION = ".bin"
+    MAGIC = b"GAR2"
+    HEADER = struct.Struct("<4sI")
+    COLUMN_TYPES = ["q", "d", "s", "q", "q", "s", "s", "s", "d", "s", "d", "s", "d", "s"]
+
+    def write_records(self, records: List[SimulationRecord]) -> None:
+        with open(self.path, "ab") as f:
+            f.write(BinaryResultSink.HEADER.pack(BinaryResultSink.MAGIC, len(records)))
+            for (column,typecode) in zip(zip(*records), BinaryResultSink.COLUMN_TYPES):
+                if typecode == "s":
+                    encoded = [BinaryResultSink.encode_text(value) for value in column]
+                    f.write(to_little_endian(array("I", [len(value) for value in encoded])))
+                    f.write(b"".join(encoded))
+                else:
+                    values = [float("nan") if value is None else value for value in column]
+                    f.write(to_little_endian(array(typecode, values)))
+
+    @staticmethod
+    def encode_text(value) -> bytes:
+        if value is None:
+            return b""
+        if isinstance(value, tuple):
+            value = " ".join(value)
+        return value.encode()
+
+    """Reads all the records of a binary results file, one block at a time"""
+    @staticmethod
+    def read(path: str) -> Iterator[SimulationRecord]:
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(BinaryResultSink.HEADER.size)
+                if len(header) == 0:
+                    return
+                (magic, n_rows) = BinaryResultSink.HEADER.unpack(header)
+                assert magic == BinaryResultSink.MAGIC
+
+                columns = []
+                for typecode in BinaryResultSink.COLUMN_TYPES:
+                    if typecode == "s":
+                        lengths = read_array(f, "I", n_rows)
+                        columns.append([f.read(length).decode() for length in lengths])
+                    else:
+                        columns.append(list(read_array(f, typecode, n_rows)))
+
+                for row in zip(*columns):
+                    record = SimulationRecord(*row)
+                    yield record._replace(
+                        best_genes=tuple(record.best_genes.split(" ")),
+                        gap_to_optimum=None if math.isnan(record.gap_to_optimum) else record.gap_to_optimum,
+                        stop_reason=record.stop_reason if record.stop_reason else None
+                    )
+
+
+"""SQLite table with one typed column per SimulationRecord field. Every flush is a
+single transaction"""
+class SQLiteResultSink(ResultSink):
+    FILE_EXTENSION = ".sqlite"
+    COLUMNS = [
+        ("n_generation", "INTEGER"),
+        ("best_fitness", "REAL"),
+        ("best_genes", "TEXT"),
+        ("population_size", "INTEGER"),
+        ("initial_m", "INTEGER"),
+        ("m_updater", "TEXT"),
+        ("selection_method", "TEXT"),
+        ("crossover_operator", "TEXT"),
+        ("crossover_threshold", "REAL"),
+        ("mutation_operator", "TEXT"),
+        ("mutation_threshold", "REAL"),
+        ("best_selector", "TEXT"),
+        ("gap_to_optimum", "REAL"),
+        ("stop_reason", "TEXT"),
+    ]
+
+    def __init__(self, path: str, buffer_size: int = 1000, table: str = "results") -> None:
+        super().__init__(path, buffer_size)
+        self.table: str = table
+        self.connection = sqlite3.connect(path)
+        columns = ", ".join(f"{name} {sql_type}" for (name,sql_type) in SQLiteResultSink.COLUMNS)
+        self.connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+        self.connection.commit()
+
+    def write_records(self, records: List[SimulationRecord]) -> None:
+        names = ", ".join(name for (name,_) in SQLiteResultSink.COLUMNS)
+        placeholders = ", ".join("?" for _ in SQLiteResultSink.COLUMNS)
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT INTO {self.table} ({names}) VALUES ({placeholders})",
+                [record._replace(best_genes=" ".join(record.best_genes)) for record in records]
+            )
+
+    def close(self) -> None:
+        super().close()
+        self.connection.close()
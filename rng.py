@@ -0,0 +1,32 @@
+from typing import List, Optional, Union
+import hashlib
+import random
+
+"""The random module itself, drawn from by the operators that are not given a generator"""
+GLOBAL_GENERATOR = random
+
+"""Seed of the simulations that are not given a generator: the one they always used"""
+DEFAULT_SIMULATION_SEED = 0
+
+
+"""Seed of the stream identified by 'key' under 'root_seed', a hash of both"""
+def derive_seed(root_seed: Union[int, str], *key) -> int:
+    digest = hashlib.sha256("/".join(str(part) for part in (root_seed,) + key).encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+"""Independent generator for the stream identified by 'key' under 'root_seed'"""
+def spawn(root_seed: int, *key) -> random.Random:
+    return random.Random(derive_seed(root_seed, *key))
+
+
+"""Generator of a simulation: seeded with DEFAULT_SIMULATION_SEED when none is given"""
+def simulation_generator(generator: Optional[random.Random] = None) -> random.Random:
+    return random.Random(DEFAULT_SIMULATION_SEED) if generator is None else generator
+
+
+"""'n' uniform floats in [0, 1), the same ones as n consecutive generator.random() calls.
+The operators draw the random numbers of a whole generation at once through it"""
+def random_floats(generator: random.Random, n: int) -> List[float]:
+    draw = generator.random
+    return [draw() for _ in range(n)]
\ No newline at end of file
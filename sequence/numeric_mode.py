@@ -0,0 +1,120 @@
+from abc import ABC, abstractmethod
+from fractions import Fraction
+from typing import Callable, List
+import math
+import operator
+
+"""Result of an operator list with a division by zero (or an overflow in the exact
+modes). It is NaN, so every later operator keeps it undefined"""
+UNDEFINED = math.nan
+
+"""Fitness of the undefined results, and the largest fitness of any result"""
+UNDEFINED_FITNESS = float(2**1000)
+
+
+"""Strategy interface for the arithmetic used to evaluate the operator lists"""
+class NumericMode(ABC):
+    functions: List[Callable] = []
+
+    """The values, in the representation of the mode"""
+    def convert(self, values: List[int]) -> list:
+        return list(values)
+
+    def undefined(self, operator_code: int, left, right):
+        return UNDEFINED
+
+    """Applies one operator, with the undefined result when it raises"""
+    def apply(self, operator_code: int, left, right):
+        try:
+            return self.functions[operator_code](left, right)
+        except ArithmeticError:
+            return self.undefined(operator_code, left, right)
+
+    """Distance to the target, as a float bounded by UNDEFINED_FITNESS (the undefined
+    results and the ones too large to represent have that fitness)"""
+    def fitness(self, result, target_value) -> float:
+        try:
+            distance = abs(result - target_value)
+        except ArithmeticError:
+            return UNDEFINED_FITNESS
+        return distance if distance < UNDEFINED_FITNESS else UNDEFINED_FITNESS
+
+    @abstractmethod
+    def __str__(self) -> str:
+        raise NotImplemented()
+
+
+"""Python arithmetic, as the expressions themselves. The default"""
+class PythonNumericMode(NumericMode):
+    functions = [operator.add, operator.sub, operator.mul, operator.truediv]
+
+    def __str__(self) -> str:
+        return "python"
+
+
+"""Exact rational arithmetic: every result is a Fraction, so there is no rounding (and
+no bound on the size of the numerators and denominators either)"""
+class RationalNumericMode(NumericMode):
+    functions = [operator.add, operator.sub, operator.mul, operator.truediv]
+
+    def convert(self, values: List[int]) -> list:
+        return [Fraction(value) for value in values]
+
+    def fitness(self, result, target_value) -> float:
+        if isinstance(result, float):
+            return UNDEFINED_FITNESS
+        distance = abs(result - Fraction(target_value))
+        return float(distance) if distance < UNDEFINED_FITNESS else UNDEFINED_FITNESS
+
+    def __str__(self) -> str:
+        return "rational"
+
+
+"""Fixed-width float64 arithmetic: the cost of an operator is constant. Overflows become
++-inf (and inf-inf NaN), whose fitness is UNDEFINED_FITNESS"""
+class Float64NumericMode(NumericMode):
+    functions = [operator.add, operator.sub, operator.mul, operator.truediv]
+
+    def convert(self, values: List[int]) -> list:
+        return [float(value) for value in values]
+
+    def __str__(self) -> str:
+        return "float64"
+
+
+"""float64 arithmetic whose results saturate at +-limit, so the magnitudes stay ordered
+and finite however long the list is. Division by zero is still undefined"""
+class SaturatingNumericMode(NumericMode):
+    def __init__(self, limit: float = 1e15) -> None:
+        assert 0 < limit < UNDEFINED_FITNESS
+        self.limit: float = limit
+        self.functions = [self.add, self.sub, self.mul, self.truediv]
+
+    def convert(self, values: List[int]) -> list:
+        return [self.saturate(float(value)) for value in values]
+
+    """NaN goes through"""
+    def saturate(self, value: float) -> float:
+        if value > self.limit:
+            return self.limit
+        if value < -self.limit:
+            return -self.limit
+        return value
+
+    def add(self, left: float, right: float) -> float:
+        return self.saturate(left + right)
+
+    def sub(self, left: float, right: float) -> float:
+        return self.saturate(left - right)
+
+    def mul(self, left: float, right: float) -> float:
+        return self.saturate(left * right)
+
+    def truediv(self, left: float, right: float) -> float:
+        return self.saturate(left / right)
+
+    def __str__(self) -> str:
+        return f"saturating_{self.limit}"
+
+
+DEFAULT_NUMERIC_MODE: NumericMode = PythonNumericMode()
\ No newline at end of file
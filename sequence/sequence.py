@@ -1,43 +1,157 @@
 ARITHMETIC_OPERATORS = ["+", "-", "*", "/"]
 from typing import List, Optional
 from individual import Individual
+from sequence.numeric_mode import NumericMode, DEFAULT_NUMERIC_MODE
+import validation
+from validation import ValidationLevel
 
+"""Small integer code for each arithmetic operator (its index in ARITHMETIC_OPERATORS)"""
+OPERATOR_CODES = {op:code for (code,op) in enumerate(ARITHMETIC_OPERATORS)}
+
+"""Binary function for each operator code in the default numeric mode. '/' is true
+division, so it raises ZeroDivisionError exactly like the expression it replaces"""
+OPERATOR_FUNCTIONS = DEFAULT_NUMERIC_MODE.functions
+
+
+def encode_operators(operators: List[str]) -> List[int]:
+    return [OPERATOR_CODES[op] for op in operators]
+
+
+"""Result of the operator list. A division by zero (or an overflow) makes it undefined
+instead of raising"""
 def calculate_operation_result(
     operators: List[str], 
-    values: List[int]
+    values: List[int],
+    numeric_mode: NumericMode = DEFAULT_NUMERIC_MODE
 ):
     assert len(operators) > 0
     assert len(operators)+1 == len(values)
 
     res = values[0]
-    for operator,value in zip(operators, values[1:]):
-        res = eval(f"{res}{operator}{value}")
+    for operator_code,value in zip(encode_operators(operators), values[1:]):
+        res = numeric_mode.apply(operator_code, res, value)
     
     return res
 
 
-"""Implements the Individual prototype interface"""
+"""Evaluates the encoded operator lists of the rows of 'operator_codes' column by column"""
+def calculate_operation_results(
+    operator_codes: List[List[int]],
+    values: List[int],
+    numeric_mode: NumericMode = DEFAULT_NUMERIC_MODE
+) -> list:
+    if validation.enabled(ValidationLevel.CHEAP):
+        assert all(len(codes)+1 == len(values) for codes in operator_codes)
+
+    functions = numeric_mode.functions
+    results = [values[0]] * len(operator_codes)
+    for (column,value) in enumerate(values[1:]):
+        try:
+            results = [
+                functions[codes[column]](res, value) for (res,codes) in zip(results, operator_codes)
+            ]
+        except ArithmeticError:
+            results = [
+                numeric_mode.apply(codes[column], res, value) for (res,codes) in zip(results, operator_codes)
+            ]
+
+    return results
+
+
+"""Implements the Individual prototype interface.
+Re-evaluating only recomputes the prefix results from the first changed operator on"""
 class Sequence(Individual):
+    __slots__ = ("value", "prefix_results", "prefix_values", "dirty_from")
+
     def __init__(self, operator_list: List[str]):
         super().__init__(operator_list)
         assert operator_list is not None
         self.value: Optional[float] = None
+        self.prefix_results: List[float] = []
+        self.prefix_values: Optional[List[int]] = None
+        self.dirty_from: int = 0
     
     def set_gene_list(self, operators: List[str]):
+        first_change = next(
+            (i for (i,(old,new)) in enumerate(zip(self.gene_list, operators)) if old != new),
+            min(len(self.gene_list), len(operators))
+        )
+        self.dirty_from = min(self.dirty_from, first_change)
         super().set_gene_list(operators)
         self.value = None
 
-    def calculate_value(self, values: List[int]) -> None:
-        self.value = calculate_operation_result(self.get_gene_list(), values)
+    """Position of the first operator that must be recomputed for the given values
+    (len(genes) when the individual is clean)"""
+    def dirty_start(self, values: List[int]) -> int:
+        return self.dirty_from if self.prefix_values is values else 0
+
+    """Recomputes the stale prefix results, from the first changed operator on, and
+    returns the value of the whole operator list"""
+    def update_prefix_results(self, values: List[int], numeric_mode: NumericMode = DEFAULT_NUMERIC_MODE) -> float:
+        assert len(self.gene_list)+1 == len(values)
+        start = self.dirty_start(values)
+
+        if start < len(self.gene_list):
+            if start == 0:
+                self.prefix_results = [None] * len(self.gene_list)
+            elif isinstance(self.prefix_results, tuple):
+                # Shared with a frozen prototype: copy on write
+                self.prefix_results = list(self.prefix_results)
+            functions = numeric_mode.functions
+            res = values[0] if start == 0 else self.prefix_results[start-1]
+            for i in range(start, len(self.gene_list)):
+                code = OPERATOR_CODES[self.gene_list[i]]
+                try:
+                    res = functions[code](res, values[i+1])
+                except ArithmeticError:
+                    res = numeric_mode.undefined(code, res, values[i+1])
+                self.prefix_results[i] = res
+            self.prefix_values = values
+            self.dirty_from = len(self.gene_list)
+
+        self.value = self.prefix_results[-1]
+        return self.value
+
+    """Installs prefix results computed elsewhere (e.g. cached) for the given values"""
+    def set_prefix_results(self, prefix_results: List[float], values: List[int]) -> None:
+        assert len(prefix_results) == len(self.gene_list)
+        self.prefix_results = list(prefix_results)
+        self.prefix_values = values
+        self.dirty_from = len(self.gene_list)
+        self.value = self.prefix_results[-1]
+
+    def calculate_value(self, values: List[int], numeric_mode: NumericMode = DEFAULT_NUMERIC_MODE) -> None:
+        self.update_prefix_results(values, numeric_mode)
         assert self.value is not None
 
+    def set_value(self, value: float) -> None:
+        assert value is not None
+        self.value = value
+
     def get_value(self) -> float:
         if self.value is None:
             raise ValueError("There is no value")
         return self.value
 
+    """The clone keeps the prefix results, value and fitness it shares with this individual"""
     def clone(self, operator_list=None):
-        return Sequence(operator_list if operator_list is not None else super().get_gene_list())
+        child = Sequence(operator_list if operator_list is not None else self.gene_list)
+
+        shared = 0
+        while shared < self.dirty_from  and  shared < len(child.gene_list)  and  child.gene_list[shared] == self.gene_list[shared]:
+            shared += 1
+        if shared > 0:
+            child.prefix_results = self.prefix_results if isinstance(self.prefix_results, tuple) else self.prefix_results.copy()
+            child.prefix_values = self.prefix_values
+            child.dirty_from = shared
+            if shared == len(child.gene_list) == len(self.gene_list):
+                child.value = self.value
+                child.fitness_value = self.fitness_value
+
+        return child
+
+    def freeze(self) -> None:
+        self.prefix_results = tuple(self.prefix_results)
     
     def __str__(self) -> str:
         return f"{super().get_gene_list()} -> {super().get_fitness_value()}"
\ No newline at end of file
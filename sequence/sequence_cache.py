@@ -0,0 +1,111 @@
+from sequence.sequence import Sequence, encode_operators
+from sequence.sequence_evaluator import SequenceEvaluator
+from sequence.numeric_mode import NumericMode, DEFAULT_NUMERIC_MODE
+from collections import OrderedDict
+from typing import List, Optional, Sequence as GeneSequence, Tuple
+
+CacheEntry = Tuple[float, float, Optional[tuple]]
+
+
+"""Bounded LRU memo of evaluated genomes, keyed by (values, target, operator codes)"""
+class FitnessCache:
+    def __init__(self, max_size: Optional[int] = None) -> None:
+        assert max_size is None  or  max_size > 0
+        self.max_size: Optional[int] = max_size
+        self.entries: "OrderedDict[tuple, CacheEntry]" = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    @staticmethod
+    def make_key(values: tuple, target_value: int, operator_codes: GeneSequence[int]) -> tuple:
+        return (values, target_value, bytes(operator_codes))
+
+    """Entries without prefix results are misses when the lookup needs them"""
+    def get(self, key: tuple, with_prefix_results: bool = False) -> Optional[CacheEntry]:
+        entry = self.entries.get(key)
+        if entry is None  or  (with_prefix_results  and  entry[2] is None):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: tuple, value: float, fitness_value: float, prefix_results: Optional[tuple] = None) -> None:
+        self.entries[key] = (value, fitness_value, prefix_results)
+        self.entries.move_to_end(key)
+        if self.max_size is not None  and  len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits/lookups if lookups > 0 else 0.0
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __str__(self) -> str:
+        return f"size={len(self)};hits={self.hits};misses={self.misses};evictions={self.evictions}"
+
+
+"""SequenceEvaluator that looks every genome up in a FitnessCache before scoring it"""
+class CachedSequenceEvaluator(SequenceEvaluator):
+    def __init__(
+        self,
+        target_value: int,
+        values: List[int],
+        cache: Optional[FitnessCache] = None,
+        max_size: Optional[int] = None,
+        numeric_mode: NumericMode = DEFAULT_NUMERIC_MODE
+    ) -> None:
+        super().__init__(target_value, values, numeric_mode)
+        assert cache is None  or  max_size is None
+        self.cache: FitnessCache = cache if cache is not None else FitnessCache(max_size)
+        # 3 == Fraction(3) == 3.0, so the mode is part of the key of the values
+        self.values_key: tuple = (numeric_mode.__str__(), tuple(self.values))
+
+    def evaluate_individual(self, individual: Sequence) -> None:
+        self.evaluate_population([individual])
+
+    """Only individuals without any valid prefix result are looked up; the others are
+    cheaper to recompute from their first changed operator"""
+    def evaluate_population(self, population: List[Sequence]) -> None:
+        fitness = self.numeric_mode.fitness
+        for individual in population:
+            if individual.dirty_start(self.values) > 0:
+                individual.set_fitness_value(fitness(individual.update_prefix_results(self.values, self.numeric_mode), self.target_value))
+                continue
+
+            key = FitnessCache.make_key(self.values_key, self.target_value, encode_operators(individual.get_genes()))
+            entry = self.cache.get(key, with_prefix_results=True)
+            if entry is not None:
+                individual.set_prefix_results(entry[2], self.values)
+                individual.set_fitness_value(entry[1])
+            else:
+                value = individual.update_prefix_results(self.values, self.numeric_mode)
+                fitness_value = fitness(value, self.target_value)
+                self.cache.put(key, value, fitness_value, tuple(individual.prefix_results))
+                individual.set_fitness_value(fitness_value)
+
+    def evaluate_operator_codes(self, operator_codes: List[GeneSequence[int]]) -> List[Tuple[float, float]]:
+        evaluations: List[Optional[Tuple[float, float]]] = []
+        missing: List[int] = []
+
+        for (i,codes) in enumerate(operator_codes):
+            entry = self.cache.get(FitnessCache.make_key(self.values_key, self.target_value, codes))
+            if entry is None:
+                missing.append(i)
+            evaluations.append(None if entry is None else (entry[0], entry[1]))
+
+        if len(missing) > 0:
+            computed = super().evaluate_operator_codes([operator_codes[i] for i in missing])
+            for (i,(value,fitness_value)) in zip(missing, computed):
+                evaluations[i] = (value, fitness_value)
+                self.cache.put(FitnessCache.make_key(self.values_key, self.target_value, operator_codes[i]), value, fitness_value)
+
+        return evaluations
@@ -1,15 +1,35 @@
-from sequence.sequence import Sequence
+from sequence.sequence import Sequence, calculate_operation_results
+from sequence.numeric_mode import NumericMode, DEFAULT_NUMERIC_MODE
 from individual import IndividualEvaluator
-from typing import List
+from typing import List, Sequence as GeneSequence, Tuple
 
 
-"""Concrete evaluator for Sequence"""
+"""Concrete evaluator for Sequence, in the representation of its numeric mode"""
 class SequenceEvaluator(IndividualEvaluator):
-    def __init__(self, target_value: int, values: List[int]) -> None:
+    def __init__(self, target_value: int, values: List[int], numeric_mode: NumericMode = DEFAULT_NUMERIC_MODE) -> None:
         super().__init__()
         self.target_value: int = target_value
-        self.values = values.copy()
+        self.numeric_mode: NumericMode = numeric_mode
+        self.values = numeric_mode.convert(values)
     
     def evaluate_individual(self, individual: Sequence) -> None:
-        individual.calculate_value(self.values)
-        individual.set_fitness_value(abs(individual.get_value() - self.target_value))
\ No newline at end of file
+        individual.calculate_value(self.values, self.numeric_mode)
+        individual.set_fitness_value(self.numeric_mode.fitness(individual.get_value(), self.target_value))
+
+    """Clean individuals are not recomputed and the others only from their first
+    changed operator on"""
+    def evaluate_population(self, population: List[Sequence]) -> None:
+        fitness = self.numeric_mode.fitness
+        for individual in population:
+            individual.set_fitness_value(fitness(individual.update_prefix_results(self.values, self.numeric_mode), self.target_value))
+
+    """Evaluates encoded operator lists (one row of operator codes each) and returns
+    the (value, fitness) pair of every row"""
+    def evaluate_operator_codes(self, operator_codes: List[GeneSequence[int]]) -> List[Tuple[float, float]]:
+        results = calculate_operation_results(operator_codes, self.values, self.numeric_mode)
+        fitness = self.numeric_mode.fitness
+        return [(value, fitness(value, self.target_value)) for value in results]
+
+    """The puzzle and the arithmetic, which decide every fitness value"""
+    def __str__(self) -> str:
+        return f"target_value={self.target_value};values={self.values};numeric_mode={self.numeric_mode}"
\ No newline at end of file
@@ -0,0 +1,97 @@
+from sequence.sequence import Sequence, ARITHMETIC_OPERATORS
+from sequence.numeric_mode import NumericMode, DEFAULT_NUMERIC_MODE
+from typing import List, Optional, Set, Tuple
+import math
+
+"""Interval of the results that cannot be bounded (an operator raised or was undefined)"""
+UNBOUNDED = (-math.inf, math.inf)
+
+
+"""Smallest interval containing every result reachable from [low, high] when the
+remaining 'values' are combined left to right with any of the operators of the mode"""
+def reachable_interval(low: float, high: float, values: list, numeric_mode: NumericMode = DEFAULT_NUMERIC_MODE) -> Tuple[float, float]:
+    (add, sub, mul, truediv) = numeric_mode.functions
+    try:
+        for value in values:
+            candidates = [add(low, value), add(high, value), sub(low, value), sub(high, value), mul(low, value), mul(high, value)]
+            if value != 0:
+                candidates.extend((truediv(low, value), truediv(high, value)))
+            low, high = min(candidates), max(candidates)
+    except ArithmeticError:
+        return UNBOUNDED
+    if math.isnan(low)  or  math.isnan(high):
+        return UNBOUNDED
+    return low, high
+
+
+"""Distance from the target to the closest point of the interval [low, high]"""
+def interval_distance(low: float, high: float, target_value: int) -> float:
+    if target_value < low:
+        return low - target_value
+    if target_value > high:
+        return target_value - high
+    return 0
+
+
+"""Exact branch and bound solver for the Sequence problem; solve() returns None past 'max_nodes'"""
+class BranchAndBoundSequenceSolver:
+    def __init__(self, target_value: int, values: List[int], numeric_mode: NumericMode = DEFAULT_NUMERIC_MODE, max_nodes: Optional[int] = None) -> None:
+        assert len(values) > 1
+        assert max_nodes is None  or  max_nodes > 0
+        self.target_value: int = target_value
+        self.numeric_mode: NumericMode = numeric_mode
+        self.values: list = numeric_mode.convert(values)
+        self.max_nodes: Optional[int] = max_nodes
+        self.explored_nodes: int = 0
+
+    def solve(self) -> Optional[Sequence]:
+        self.explored_nodes = 0
+        self.exhausted: bool = False
+        self.best_fitness: float = float("inf")
+        self.best_operators: Optional[List[int]] = None
+        self.expanded: Set[Tuple[int, float]] = set()
+
+        self.expand(1, self.values[0], [])
+        if self.exhausted:
+            return None
+        assert self.best_operators is not None
+
+        best = Sequence([ARITHMETIC_OPERATORS[code] for code in self.best_operators])
+        best.calculate_value(self.values, self.numeric_mode)
+        best.set_fitness_value(self.numeric_mode.fitness(best.get_value(), self.target_value))
+        assert best.get_fitness_value() == self.best_fitness
+        return best
+
+    def expand(self, depth: int, result: float, operator_codes: List[int]) -> None:
+        self.explored_nodes += 1
+        if self.max_nodes is not None  and  self.explored_nodes > self.max_nodes:
+            self.exhausted = True
+            return
+
+        if depth == len(self.values):
+            fitness_value = self.numeric_mode.fitness(result, self.target_value)
+            if fitness_value < self.best_fitness:
+                self.best_fitness = fitness_value
+                self.best_operators = operator_codes.copy()
+            return
+
+        # Same partial result at the same depth: the subtree was already explored
+        if (depth, result) in self.expanded:
+            return
+        self.expanded.add((depth, result))
+
+        low, high = reachable_interval(result, result, self.values[depth:], self.numeric_mode)
+        if interval_distance(low, high, self.target_value) >= self.best_fitness:
+            return
+
+        value = self.values[depth]
+        for code in range(len(ARITHMETIC_OPERATORS)):
+            if self.best_fitness == 0  or  self.exhausted:
+                return
+            # An undefined (NaN) result stays undefined whatever follows
+            child = self.numeric_mode.apply(code, result, value)
+            if child != child:
+                continue
+            operator_codes.append(code)
+            self.expand(depth+1, child, operator_codes)
+            operator_codes.pop()
@@ -1,18 +1,30 @@
-from typing import List
+from typing import Callable, List, Optional, Tuple
 from individual import Individual, IndividualEvaluator
-from operators.crossover import CrossoverOperator
+from operators.crossover import CrossoverOperator, clone_children
 from operators.mutation import MutationOperator
 from operators.selection import SelectionOperator
 from population import BestSelector
 import random
 import m_updater
+import rng
+from rng import GLOBAL_GENERATOR
+import validation
+from validation import ValidationLevel
+import termination
+from termination import TerminationPolicy, PopulationGenes
+from convergence_trace import ConvergenceTrace
+from result_sink import ResultSink, SimulationRecord, format_record
+from instrumentation import SimulationInstrumentation, NULL_INSTRUMENTATION, SELECTION, CROSSOVER, MUTATION, REPLACEMENT, EVALUATION, CHECK_ONLY_INSTANCE, REPORT
 
 RESULT_FILE_PATH = "results/"
 
 """Checks that the count for each Individual in the population is 1
-If 2 Individuals are have the same values (==) they should not be the same reference (is)"""
+If 2 Individuals are have the same values (==) they should not be the same reference (is)."""
 def check_only_instance(population: List[Individual]) -> None:
-    assert all((population.count(individual) == 1 for individual in population))
+    if validation.enabled(ValidationLevel.FULL):
+        assert all((population.count(individual) == 1 for individual in population))
+    elif validation.enabled(ValidationLevel.CHEAP):
+        assert len({id(individual) for individual in population}) == len(population)
 
 
 """Given an original population, the new offspring (<=population). It removes the 'worst'
@@ -21,9 +33,10 @@ def replace_worst_with_offpring(
     population: List[Individual],
     offspring: List[Individual],
     minimize: bool,
-    best_selector: BestSelector
+    best_selector: BestSelector,
+    generator: random.Random = GLOBAL_GENERATOR
 ) -> List[Individual]:
-    best_fitted_individuals = best_selector.select_best(population, len(offspring), minimize)
+    best_fitted_individuals = best_selector.select_best(population, len(offspring), minimize, generator)
     new_population = best_fitted_individuals + offspring
 
     assert len(new_population) == len(population)
@@ -34,78 +47,173 @@ def replace_worst_with_offpring(
 def mutate_population(
     the_population: List[Individual],
     mutation_operator: MutationOperator,
-    mutation_probability: float
+    mutation_probability: float,
+    generator: random.Random = GLOBAL_GENERATOR
 )-> None:
     assert 0 <= mutation_probability <= 1
     for individual in the_population:
-        mutation_operator.mutate(individual, mutation_probability)
+        mutation_operator.mutate(individual, mutation_probability, generator)
 
 
-"""Loops over the population and evaluates all the individuals,
+"""Evaluates all the individuals in the population in a single batch,
 by calling the given evaluator"""
 def evaluate_population(
     population: List[Individual], 
     individual_evaluator: IndividualEvaluator
 ) -> None:
-    for individual in population:
-        individual_evaluator.evaluate_individual(individual)
+    individual_evaluator.evaluate_population(population)
 
 
 """Loops over the the population and breeds the individuals"""
 def do_crossover(
     the_population: List[Individual], 
     crossover_probability: float, 
-    crossover_operator: CrossoverOperator
+    crossover_operator: CrossoverOperator,
+    generator: random.Random = GLOBAL_GENERATOR
 ) -> List[Individual]:
     assert len(the_population) % 2 == 0
     assert 0 <= crossover_probability <= 1 
 
-    random.shuffle(the_population)
-    offspring: List[Individual] = []
+    generator.shuffle(the_population)
 
-    while len(the_population) > 0:
-        parent1 = the_population.pop()
-        parent2 = the_population.pop()
+    # Consecutive pairs from the end, all crossed in one call
+    pairs = [(the_population[i], the_population[i-1]) for i in range(len(the_population)-1, 0, -2)]
+    crossed = crossover_operator.crossover_pairs(
+        [(parent1.get_genes(), parent2.get_genes()) for (parent1,parent2) in pairs],
+        crossover_probability,
+        generator
+    )
+
+    offspring: List[Individual] = []
+    for (i,genes1,genes2) in crossed:
+        offspring += clone_children(*pairs[i], (genes1, genes2))
 
-        # Threshold for crossover
-        if random.random() <= crossover_probability:
-            children = crossover_operator.crossover(parent1, parent2)
-            assert len(children) == 2
-            offspring.extend(children)
-    
     return offspring
 
-"""Save the results to file"""
-def write_results(
-    output_file_name: str,
+"""Name of an operator, passed either as a class of static methods or as an instance"""
+def operator_name(operator) -> str:
+    return operator().__str__() if isinstance(operator, type) else operator.__str__()
+
+
+"""Builds the typed record with the results of a simulation"""
+def make_record(
     n_generation: int, 
     best_individual: Individual,
     population: List[Individual],
     initial_m: int,
+    m_updater: m_updater.MUpdater,
     selection_method: SelectionOperator,
     crossover_operator: CrossoverOperator,
     crossover_threshold: float,
     mutation_operator: MutationOperator,
     mutation_threshold: float,
-    best_selector: BestSelector
-):
+    best_selector: BestSelector,
+    optimum_fitness: Optional[float] = None,
+    stop_reason: Optional[str] = None
+) -> SimulationRecord:
+    return SimulationRecord(
+        n_generation,
+        best_individual.get_fitness_value(),
+        best_individual.get_genes(),
+        len(population),
+        initial_m,
+        m_updater.__str__(),
+        operator_name(selection_method),
+        crossover_operator.__str__(),
+        crossover_threshold,
+        operator_name(mutation_operator),
+        mutation_threshold,
+        operator_name(best_selector),
+        None if optimum_fitness is None else best_individual.get_fitness_value() - optimum_fitness,
+        stop_reason
+    )
+
+
+"""Save the results to file"""
+def write_results(output_file_name: str, record: SimulationRecord) -> None:
     with open(RESULT_FILE_PATH + output_file_name, "a") as f:
-        f.write(f"{n_generation};")
-        f.write(f"{best_individual.get_fitness_value()};")
-        f.write(f"{best_individual.get_gene_list()};")
-        f.write(f"population_size={len(population)};")
-        f.write(f"initial_m={initial_m};")
-        f.write(f"m_updater={m_updater};")
-        f.write(f"selection_method={selection_method().__str__()};")
-        f.write(f"crossover_operator={crossover_operator};")
-        f.write(f"crossover_threshold={crossover_threshold};")
-        f.write(f"mutation_threshold={mutation_threshold};")
-        f.write(f"best_selector={best_selector().__str__()};")
-        f.write("\n")
-
-
-
-"""General structure for a genetic algorithm"""
+        f.write(format_record(record))
+
+
+"""Reports the results to the sink or, when there is no sink, to the results file (if any)"""
+def report_results(
+    record: SimulationRecord,
+    output_file_name: Optional[str],
+    result_sink: Optional[ResultSink]
+) -> SimulationRecord:
+    if result_sink is not None:
+        result_sink.write(record)
+    elif output_file_name is not None:
+        write_results(output_file_name, record)
+    return record
+
+
+"""Fitness reaching which ends a run: the optimum, 0 when it is not known"""
+def stop_fitness(optimum_fitness: Optional[float]) -> float:
+    return 0 if optimum_fitness is None else optimum_fitness
+
+
+"""Generation loop shared by the simulation engines: stopping, counting and tracing"""
+class RunProgress:
+    def __init__(
+        self,
+        MAX_ITERATIONS: int,
+        optimum_fitness: Optional[float],
+        termination_policies: Tuple[TerminationPolicy, ...],
+        trace: Optional[ConvergenceTrace] = None
+    ) -> None:
+        self.max_iterations: int = MAX_ITERATIONS
+        self.stop_fitness: float = stop_fitness(optimum_fitness)
+        self.termination_policies: Tuple[TerminationPolicy, ...] = termination_policies
+        self.trace: Optional[ConvergenceTrace] = trace
+        self.n_generation: int = 0
+        self.stop_reason: Optional[str] = None
+
+    """Starts the run from the initial population, bred with 'm'"""
+    def start(self, best_fitness: float, m: int, fitness_values: Callable[[], List[float]], population_genes: PopulationGenes) -> None:
+        termination.start_policies(self.termination_policies, best_fitness)
+        self.best_fitness: float = best_fitness
+        # m of the last generation and its number of offspring, for the trace
+        self.bred_m: int = m
+        self.n_offspring: int = 0
+        if self.trace is not None:
+            self.record_trace(fitness_values, population_genes)
+
+    def running(self) -> bool:
+        return self.stop_reason is None  and  self.n_generation<self.max_iterations  and  not self.best_fitness<=self.stop_fitness
+
+    def end_generation(
+        self,
+        best_fitness: float,
+        bred_m: int,
+        n_offspring: int,
+        fitness_values: Callable[[], List[float]],
+        population_genes: PopulationGenes
+    ) -> None:
+        self.n_generation += 1
+        self.best_fitness = best_fitness
+        self.bred_m, self.n_offspring = bred_m, n_offspring
+
+        if self.trace is not None  and  self.trace.samples(self.n_generation):
+            self.record_trace(fitness_values, population_genes)
+
+        # Early termination, unless the optimum has just been reached
+        if len(self.termination_policies) > 0  and  not self.best_fitness<=self.stop_fitness:
+            self.stop_reason = termination.stop_reason(self.termination_policies, self.n_generation, self.best_fitness, population_genes)
+
+    """Records the last generation in the trace and returns the stop reason of the run"""
+    def finish(self, fitness_values: Callable[[], List[float]], population_genes: PopulationGenes) -> str:
+        if self.trace is not None  and  self.trace.last_generation != self.n_generation:
+            self.record_trace(fitness_values, population_genes)
+        if self.stop_reason is not None:
+            return self.stop_reason
+        return termination.final_stop_reason(self.best_fitness, self.stop_fitness)
+
+    def record_trace(self, fitness_values: Callable[[], List[float]], population_genes: PopulationGenes) -> None:
+        self.trace.record_population(self.n_generation, self.best_fitness, fitness_values(), self.bred_m, population_genes(), self.n_offspring)
+
+
+"""General structure for a genetic algorithm, drawing every random number from 'generator'"""
 def run_simulation(
     population: List[Individual],
     MAX_ITERATIONS: int,
@@ -119,10 +227,20 @@ def run_simulation(
     mutation_operator: MutationOperator,
     mutation_threshold: float,
     best_selector: BestSelector,
-    output_file_name: str = "results.txt"
-):
-    # Seed for reproducibility
-    random.seed(0)
+    output_file_name: Optional[str] = "results.txt",
+    optimum_fitness: Optional[float] = None,
+    result_sink: Optional[ResultSink] = None,
+    instrumentation: Optional[SimulationInstrumentation] = None,
+    termination_policies: Tuple[TerminationPolicy, ...] = (),
+    generator: Optional[random.Random] = None,
+    trace: Optional[ConvergenceTrace] = None
+) -> SimulationRecord:
+    # Own generator, seeded for reproducibility
+    generator = rng.simulation_generator(generator)
+
+    # The phases are only timed with an instrumentation
+    instrumentation = NULL_INSTRUMENTATION if instrumentation is None else instrumentation
+    instrumentation.start_run(individual_evaluator)
 
     # Initialize the m_updater
     m_updater.set_initial_m(m)
@@ -131,55 +249,74 @@ def run_simulation(
     initial_m = m
 
     # Evaluate the initial population
-    evaluate_population(population, individual_evaluator)
+    with instrumentation.phase(EVALUATION, len(population)):
+        evaluate_population(population, individual_evaluator)
     best_individual = min(population)
 
-    n_generation = 0
+    fitness_values = lambda: [individual.get_fitness_value() for individual in population]
+    population_genes = lambda: [individual.get_genes() for individual in population]
+    progress = RunProgress(MAX_ITERATIONS, optimum_fitness, termination_policies, trace)
+    progress.start(best_individual.get_fitness_value(), m, fitness_values, population_genes)
 
-    while n_generation<MAX_ITERATIONS  and  not best_individual.get_fitness_value()==0:
-        check_only_instance(population)
+    while progress.running():
+        with instrumentation.phase(CHECK_ONLY_INSTANCE):
+            check_only_instance(population)
         assert m>0  and  m % 2 == 0
         assert len(population) % 2 == 0
 
         # Select the best individuals within the population
-        selected_population: List[Individual] = selection_method.select(population.copy(), m, minimize)
-        check_only_instance(selected_population)
+        with instrumentation.phase(SELECTION):
+            selected_population: List[Individual] = selection_method.select(population.copy(), m, minimize, generator=generator)
+        with instrumentation.phase(CHECK_ONLY_INSTANCE):
+            check_only_instance(selected_population)
         assert len(selected_population) == m
         assert len(selected_population) <= len(population)
 
         # Crossover between the best individuals chosen (parents)
-        offspring: List[Individual] = do_crossover(selected_population.copy(), crossover_threshold, crossover_operator)
-        check_only_instance(offspring)
+        with instrumentation.phase(CROSSOVER):
+            offspring: List[Individual] = do_crossover(selected_population.copy(), crossover_threshold, crossover_operator, generator)
+        with instrumentation.phase(CHECK_ONLY_INSTANCE):
+            check_only_instance(offspring)
         assert len(offspring) % 2 == 0
         assert len(offspring) <= len(selected_population)
 
         # Mutate generated children
-        mutate_population(offspring, mutation_operator, mutation_threshold)
-        check_only_instance(offspring)
+        with instrumentation.phase(MUTATION):
+            mutate_population(offspring, mutation_operator, mutation_threshold, generator)
+        with instrumentation.phase(CHECK_ONLY_INSTANCE):
+            check_only_instance(offspring)
 
         # Update population list replacing the 'worst' with all the new children
-        population = replace_worst_with_offpring(population, offspring, minimize, best_selector)
-        check_only_instance(population)
+        with instrumentation.phase(REPLACEMENT):
+            population = replace_worst_with_offpring(population, offspring, minimize, best_selector, generator)
+        with instrumentation.phase(CHECK_ONLY_INSTANCE):
+            check_only_instance(population)
 
         # Evaluate the new population fitness
-        evaluate_population(population, individual_evaluator)
+        with instrumentation.phase(EVALUATION, len(population)):
+            evaluate_population(population, individual_evaluator)
 
-        n_generation += 1
-        m = m_updater.update_m()
         best_individual = min(best_individual, min(population))
+        progress.end_generation(best_individual.get_fitness_value(), m, len(offspring), fitness_values, population_genes)
+        m = m_updater.update_m()
 
-
-    # Write the results
-    write_results(
-        output_file_name,
-        n_generation, 
+    # Report the results
+    record = make_record(
+        progress.n_generation, 
         best_individual, 
         population, 
         initial_m, 
+        m_updater,
         selection_method, 
         crossover_operator, 
         crossover_threshold, 
         mutation_operator, 
         mutation_threshold, 
-        best_selector
+        best_selector,
+        optimum_fitness,
+        progress.finish(fitness_values, population_genes)
     )
+    with instrumentation.phase(REPORT):
+        report_results(record, output_file_name, result_sink)
+    instrumentation.end_run(record)
+    return record
\ No newline at end of file
@@ -0,0 +1,60 @@
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+from result_sink import SimulationRecord
+from sweep import SweepSettings, SweepTask, task_key, run_sweep
+import math
+
+"""Results of one task"""
+TaskResult = Tuple[SweepTask, SimulationRecord]
+
+
+"""One round of successive halving: every surviving configuration run (on all its
+repeats) for 'budget' generations, ranked from best to worst"""
+class Rung(NamedTuple):
+    budget: int
+    ranking: List[str]
+    results: List[TaskResult]
+
+
+"""Key of the configuration of a task: the key of the task without its seed"""
+def configuration_key(task: SweepTask) -> str:
+    return task_key(task).split(";", 1)[1]
+
+
+"""Mean best fitness of every configuration over its repeats, ties broken by the mean
+number of generations (reaching the same fitness sooner is better)"""
+def configuration_scores(results: List[TaskResult]) -> Dict[str, Tuple[float, float]]:
+    totals: Dict[str, List[float]] = {}
+    for (task,record) in results:
+        total = totals.setdefault(configuration_key(task), [0.0, 0.0, 0])
+        total[0] += record.best_fitness
+        total[1] += record.n_generation
+        total[2] += 1
+    return {key: (fitness/n, generations/n) for (key,(fitness,generations,n)) in totals.items()}
+
+
+"""Successive halving over the tasks of a grid; yields every rung"""
+def successive_halving(
+    tasks: List[SweepTask],
+    settings: SweepSettings,
+    min_budget: int,
+    eta: int = 3,
+    min_configurations: int = 1,
+    n_workers: int = 1,
+    chunksize: int = 1
+) -> Iterator[Rung]:
+    assert 0 < min_budget <= settings.max_iterations
+    assert eta > 1  and  min_configurations > 0
+
+    budget = min_budget
+    while True:
+        results = list(run_sweep(tasks, settings._replace(max_iterations=budget, trace_every=None), n_workers, chunksize))
+        scores = configuration_scores(results)
+        ranking = sorted(scores, key=scores.__getitem__)
+        yield Rung(budget, ranking, results)
+
+        if budget == settings.max_iterations:
+            return
+
+        survivors = set(ranking[:max(min_configurations, math.ceil(len(ranking)/eta))])
+        tasks = [task for task in tasks if configuration_key(task) in survivors]
+        budget = min(budget*eta, settings.max_iterations)
\ No newline at end of file
@@ -0,0 +1,384 @@
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Type
+from individual import IndividualEvaluator
+from operators.crossover import CrossoverOperator
+from operators.mutation import MutationOperator
+from operators.selection import SelectionOperator
+from population import PopulationGenerator, BestSelector, PopulationSnapshot
+from collections import OrderedDict
+import hashlib
+import itertools
+import multiprocessing
+import os
+import random
+import rng
+import simulation
+import m_updater
+from lockstep_simulation import LockstepConfiguration, run_lockstep_simulations
+from result_sink import ResultSink, SimulationRecord, TextResultSink
+from instrumentation import PhaseTimingCollector
+from termination import TerminationPolicy
+from convergence_trace import ConvergenceTrace, TraceWriter
+import validation
+from validation import ValidationLevel
+
+
+"""Settings shared by every task of a sweep (the puzzle and the fixed GA parameters)"""
+class SweepSettings(NamedTuple):
+    population_generator: PopulationGenerator
+    individual_evaluator: IndividualEvaluator
+    operator_list_size: int
+    max_iterations: int
+    minimize: bool
+    optimum_fitness: Optional[float] = None
+    simulation_function: Callable[..., SimulationRecord] = simulation.run_simulation
+    validation_level: ValidationLevel = ValidationLevel.FULL
+    termination_policies: Tuple[TerminationPolicy, ...] = ()
+    seed: Optional[int] = None
+    trace_every: Optional[int] = None
+
+
+"""One point of the hyperparameter grid. It carries its own seed, so it can be
+run in any process and in any order and still produce the same results"""
+class SweepTask(NamedTuple):
+    repeat: int
+    seed: int
+    population_size: int
+    selection_method: SelectionOperator
+    crossover_operator: CrossoverOperator
+    crossover_threshold: float
+    mutation_operator: MutationOperator
+    mutation_prob: float
+    best_selector: BestSelector
+    m: int
+    m_updater: m_updater.MUpdater
+
+
+"""Deterministic seed for the initial population of a (repeat, population_size) pair"""
+def population_seed(repeat: int, population_size: int) -> int:
+    return rng.derive_seed(repeat, population_size)
+
+
+"""Expands the hyperparameter grid into the list of independent tasks, in the same
+order as the nested loops of a serial sweep"""
+def build_tasks(
+    n_repeats: int,
+    population_sizes: Iterable[int],
+    selection_methods: List[SelectionOperator],
+    crossover_operators: List[CrossoverOperator],
+    crossover_thresholds: List[float],
+    mutation_operators: List[MutationOperator],
+    mutation_probs: List[float],
+    best_selectors: List[BestSelector],
+    m_updaters: List[m_updater.MUpdater]
+) -> List[SweepTask]:
+    tasks: List[SweepTask] = []
+    for (repeat,population_size) in itertools.product(range(n_repeats), population_sizes):
+        seed = population_seed(repeat, population_size)
+        for (selection_method, crossover_operator, crossover_threshold, mutation_operator, mutation_prob, best_selector, m, updater) in itertools.product(
+            selection_methods,
+            crossover_operators,
+            crossover_thresholds,
+            mutation_operators,
+            mutation_probs,
+            best_selectors,
+            range(2, population_size+1, 2),
+            m_updaters
+        ):
+            tasks.append(SweepTask(
+                repeat, seed, population_size,
+                selection_method, crossover_operator, crossover_threshold,
+                mutation_operator, mutation_prob, best_selector, m, updater
+            ))
+    return tasks
+
+
+"""Stable key of a task: the population seed and every hyperparameter, by name"""
+def task_key(task: SweepTask) -> str:
+    return ";".join([
+        f"seed={task.seed}",
+        f"population_size={task.population_size}",
+        f"selection_method={simulation.operator_name(task.selection_method)}",
+        f"crossover_operator={task.crossover_operator}",
+        f"crossover_threshold={task.crossover_threshold}",
+        f"mutation_operator={simulation.operator_name(task.mutation_operator)}",
+        f"mutation_prob={task.mutation_prob}",
+        f"best_selector={simulation.operator_name(task.best_selector)}",
+        f"m={task.m}",
+        f"m_updater={task.m_updater}",
+    ])
+
+
+"""Hash of everything but the task that decides the results of a sweep and where they go"""
+def run_fingerprint(settings: SweepSettings, sink_class: Type[ResultSink]) -> str:
+    description = ";".join([
+        f"individual_evaluator={settings.individual_evaluator}",
+        f"population_generator={settings.population_generator.__qualname__}",
+        f"operator_list_size={settings.operator_list_size}",
+        f"max_iterations={settings.max_iterations}",
+        f"minimize={settings.minimize}",
+        f"optimum_fitness={settings.optimum_fitness}",
+        f"simulation_function={settings.simulation_function.__module__}.{settings.simulation_function.__qualname__}",
+        f"termination_policies={[repr(policy) for policy in settings.termination_policies]}",
+        f"seed={settings.seed}",
+        f"sink={sink_class.__qualname__}",
+    ])
+    return hashlib.sha256(description.encode()).hexdigest()[:16]
+
+
+"""On-disk index of the keys of the completed tasks, one per line. Keys are only
+added once the results of their tasks have been flushed to the result sinks"""
+class CompletedTaskIndex:
+    def __init__(self, path: str, reset: bool = False) -> None:
+        self.path: str = path
+        self.keys: Set[str] = set()
+        if reset  and  os.path.exists(path):
+            os.remove(path)
+        if os.path.exists(path):
+            with open(path) as f:
+                self.keys = {line.rstrip("\n") for line in f if line.endswith("\n")}
+
+    def add_all(self, keys: List[str]) -> None:
+        if len(keys) == 0:
+            return
+        with open(self.path, "a") as f:
+            f.write("".join(f"{key}\n" for key in keys))
+            f.flush()
+            os.fsync(f.fileno())
+        self.keys.update(keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+"""Tasks whose key is not in the index yet, in their original order"""
+def pending_tasks(tasks: List[SweepTask], index: CompletedTaskIndex) -> List[SweepTask]:
+    return [task for task in tasks if task_key(task) not in index]
+
+
+# Settings of the current process, installed by init_worker
+_settings: Optional[SweepSettings] = None
+
+# Collector of the phase stats of the tasks run by the current process, if any
+_collector: Optional[PhaseTimingCollector] = None
+
+# Evaluated initial populations of the current process, by (seed, population_size). The
+# tasks of a (repeat, population_size) pair are consecutive, so only a few are kept
+SNAPSHOT_CACHE_SIZE = 4
+_snapshots: "OrderedDict[Tuple[int, int], PopulationSnapshot]" = OrderedDict()
+
+
+def init_worker(settings: SweepSettings) -> None:
+    global _settings
+    _settings = settings
+    _snapshots.clear()
+    validation.set_validation_level(settings.validation_level)
+
+
+"""The evaluated initial population of a task, generated and scored only once for all
+the tasks with the same seed and population size"""
+def initial_population(task: SweepTask) -> PopulationSnapshot:
+    key = (task.seed, task.population_size)
+    snapshot = _snapshots.get(key)
+    if snapshot is None:
+        population = _settings.population_generator.generate(_settings.operator_list_size, task.population_size, random.Random(task.seed))
+        snapshot = _snapshots[key] = PopulationSnapshot(population, _settings.individual_evaluator)
+        if len(_snapshots) > SNAPSHOT_CACHE_SIZE:
+            _snapshots.popitem(last=False)
+    else:
+        _snapshots.move_to_end(key)
+    return snapshot
+
+
+"""Generator of the simulation of a task. It only depends on the task, so the results
+do not depend on the number of workers or on the order the tasks are run in"""
+def task_generator(task: SweepTask) -> Optional[random.Random]:
+    return None if _settings.seed is None else rng.spawn(_settings.seed, task_key(task))
+
+
+"""A new convergence trace for a task, if the settings ask for traces"""
+def new_trace() -> Optional[ConvergenceTrace]:
+    return None if _settings.trace_every is None else ConvergenceTrace(_settings.max_iterations, _settings.trace_every)
+
+
+"""Runs one task in the current process and returns its results record"""
+def run_task(task: SweepTask, trace: Optional[ConvergenceTrace] = None) -> SimulationRecord:
+    assert _settings is not None
+
+    return _settings.simulation_function(
+        initial_population(task).population(),
+        _settings.max_iterations,
+        task.m,
+        task.m_updater,
+        _settings.minimize,
+        _settings.individual_evaluator,
+        task.selection_method,
+        task.crossover_operator,
+        task.crossover_threshold,
+        task.mutation_operator,
+        task.mutation_prob,
+        task.best_selector,
+        output_file_name = None,
+        optimum_fitness = _settings.optimum_fitness,
+        instrumentation = _collector,
+        termination_policies = _settings.termination_policies,
+        generator = task_generator(task),
+        trace = trace
+    )
+
+
+"""Runs a group of tasks in lockstep in the current process (see run_lockstep_simulations)
+and returns their results records, in order. The records are the ones of the array engine"""
+def run_task_group(tasks: List[SweepTask]) -> List[SimulationRecord]:
+    assert _settings is not None
+
+    return run_lockstep_simulations(
+        [
+            LockstepConfiguration(
+                initial_population(task).population(),
+                task.m,
+                task.m_updater,
+                task.selection_method,
+                task.crossover_operator,
+                task.crossover_threshold,
+                task.mutation_operator,
+                task.mutation_prob,
+                task.best_selector,
+                task_generator(task)
+            )
+            for task in tasks
+        ],
+        _settings.max_iterations,
+        _settings.minimize,
+        _settings.individual_evaluator,
+        output_file_name = None,
+        optimum_fitness = _settings.optimum_fitness,
+        termination_policies = _settings.termination_policies
+    )
+
+
+"""Runs one task in a worker process with its convergence trace (if the settings ask for
+traces), which is sent back with the results record"""
+def run_traced_task(task: SweepTask) -> Tuple[SimulationRecord, None, Optional[ConvergenceTrace]]:
+    trace = new_trace()
+    return run_task(task, trace), None, trace
+
+
+"""Runs one task in a worker process with a collector of its own (and its convergence
+trace, if the settings ask for traces), which are sent back with the results record"""
+def run_instrumented_task(task: SweepTask) -> Tuple[SimulationRecord, PhaseTimingCollector, Optional[ConvergenceTrace]]:
+    global _collector
+    _collector = PhaseTimingCollector()
+    try:
+        trace = new_trace()
+        return run_task(task, trace), _collector, trace
+    finally:
+        _collector = None
+
+
+"""Runs all the tasks on n_workers processes and yields every task with its results record"""
+def run_sweep(
+    tasks: List[SweepTask],
+    settings: SweepSettings,
+    n_workers: int = 1,
+    chunksize: int = 1,
+    collector: Optional[PhaseTimingCollector] = None,
+    lockstep_size: int = 1,
+    trace_writer: Optional[TraceWriter] = None
+) -> Iterator[Tuple[SweepTask, SimulationRecord]]:
+    global _collector
+    assert n_workers > 0  and  chunksize > 0  and  lockstep_size > 0
+    assert (trace_writer is None) == (settings.trace_every is None)
+
+    if lockstep_size > 1:
+        if collector is not None  or  trace_writer is not None:
+            raise ValueError("Lockstep sweeps record neither phase stats nor convergence traces")
+        yield from run_lockstep_sweep(tasks, settings, n_workers, chunksize, lockstep_size)
+        return
+
+    if n_workers == 1:
+        init_worker(settings)
+        _collector = collector
+        try:
+            for task in tasks:
+                trace = new_trace()
+                record = run_task(task, trace)
+                if trace is not None:
+                    trace_writer.write(task_key(task), trace)
+                yield task, record
+        finally:
+            _collector = None
+        return
+
+    with multiprocessing.Pool(n_workers, initializer=init_worker, initargs=(settings,)) as pool:
+        if collector is None  and  trace_writer is None:
+            yield from zip(tasks, pool.imap(run_task, tasks, chunksize))
+            return
+        run_observed_task = run_traced_task if collector is None else run_instrumented_task
+        for (task,(record,task_collector,trace)) in zip(tasks, pool.imap(run_observed_task, tasks, chunksize)):
+            if task_collector is not None:
+                collector.merge(task_collector)
+            if trace is not None:
+                trace_writer.write(task_key(task), trace)
+            yield task, record
+
+
+"""run_sweep of groups of 'lockstep_size' consecutive tasks (the tasks of a group share
+their initial population when they have the same seed and population size)"""
+def run_lockstep_sweep(
+    tasks: List[SweepTask],
+    settings: SweepSettings,
+    n_workers: int,
+    chunksize: int,
+    lockstep_size: int
+) -> Iterator[Tuple[SweepTask, SimulationRecord]]:
+    groups = [tasks[i : i+lockstep_size] for i in range(0, len(tasks), lockstep_size)]
+
+    if n_workers == 1:
+        init_worker(settings)
+        for group in groups:
+            yield from zip(group, run_task_group(group))
+        return
+
+    with multiprocessing.Pool(n_workers, initializer=init_worker, initargs=(settings,)) as pool:
+        for (group,records) in zip(groups, pool.imap(run_task_group, groups, chunksize)):
+            yield from zip(group, records)
+
+
+"""Writes the results of a sweep from the parent process, with one buffered sink per output file"""
+def write_sweep_results(
+    results: Iterable[Tuple[SweepTask, SimulationRecord]],
+    output_file_name: Callable[[SweepTask], str],
+    sink_class: Type[ResultSink] = TextResultSink,
+    index: Optional[CompletedTaskIndex] = None,
+    checkpoint_size: int = 1000
+) -> None:
+    assert checkpoint_size > 0
+    sinks: Dict[str, ResultSink] = {}
+    pending_keys: List[str] = []
+
+    def checkpoint() -> None:
+        if index is not None:
+            index.add_all(pending_keys)
+        pending_keys.clear()
+
+    try:
+        for (task,record) in results:
+            file_name = output_file_name(task)
+            if file_name not in sinks:
+                sinks[file_name] = sink_class(simulation.RESULT_FILE_PATH + file_name)
+            sinks[file_name].write(record)
+
+            if index is not None:
+                pending_keys.append(task_key(task))
+                if len(pending_keys) >= checkpoint_size:
+                    for sink in sinks.values():
+                        sink.flush()
+                    checkpoint()
+    finally:
+        # Closing flushes the remaining records, even when the sweep is interrupted
+        for sink in sinks.values():
+            sink.close()
+        checkpoint()
@@ -0,0 +1,137 @@
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Callable, List, Optional, Sequence
+import time
+
+# Stop reasons reported in the results record
+OPTIMUM = "optimum"
+MAX_ITERATIONS = "max_iterations"
+
+"""Gene lists of the current population, only built when a policy asks for them"""
+PopulationGenes = Callable[[], List[Sequence]]
+
+
+"""Strategy interface for the early termination policies"""
+class TerminationPolicy(ABC):
+    @abstractmethod
+    def start(self, best_fitness: float) -> None:
+        raise NotImplemented()
+
+    @abstractmethod
+    def should_stop(self, n_generation: int, best_fitness: float, population_genes: PopulationGenes) -> bool:
+        raise NotImplemented()
+
+    @abstractmethod
+    def __str__(self) -> str:
+        raise NotImplemented()
+
+
+"""Stops when the best fitness has not improved by more than 'min_delta' in the
+last 'n_generations' generations"""
+class StagnationTermination(TerminationPolicy):
+    def __init__(self, n_generations: int, min_delta: float = 0) -> None:
+        super().__init__()
+        assert n_generations > 0  and  min_delta >= 0
+        self.n_generations: int = n_generations
+        self.min_delta: float = min_delta
+
+    def start(self, best_fitness: float) -> None:
+        self.best_fitness: float = best_fitness
+        self.last_improvement: int = 0
+
+    def should_stop(self, n_generation: int, best_fitness: float, population_genes: PopulationGenes) -> bool:
+        if best_fitness < self.best_fitness - self.min_delta:
+            self.best_fitness = best_fitness
+            self.last_improvement = n_generation
+        return n_generation - self.last_improvement >= self.n_generations
+
+    def __str__(self) -> str:
+        return "stagnation"
+
+    def __repr__(self) -> str:
+        return f"StagnationTermination({self.n_generations}, {self.min_delta})"
+
+
+"""Fraction of distinct gene lists in the population"""
+def distinct_ratio(population_genes: List[Sequence]) -> float:
+    return len({tuple(genes) for genes in population_genes}) / len(population_genes)
+
+
+"""Mean normalized Hamming distance of the gene lists to the consensus gene list (the
+most common gene at each position). 0 when every individual has the same genes"""
+def hamming_spread(population_genes: List[Sequence]) -> float:
+    differing = sum(
+        len(column) - Counter(column).most_common(1)[0][1]
+        for column in zip(*population_genes)
+    )
+    return differing / (len(population_genes) * len(population_genes[0]))
+
+
+"""Stops when the population has collapsed: the fraction of distinct gene lists falls
+below 'min_distinct_ratio' or the Hamming spread below 'min_spread' (None disables)"""
+class DiversityTermination(TerminationPolicy):
+    def __init__(self, min_distinct_ratio: Optional[float] = None, min_spread: Optional[float] = None) -> None:
+        super().__init__()
+        assert min_distinct_ratio is not None  or  min_spread is not None
+        self.min_distinct_ratio: Optional[float] = min_distinct_ratio
+        self.min_spread: Optional[float] = min_spread
+
+    def start(self, best_fitness: float) -> None:
+        pass
+
+    def should_stop(self, n_generation: int, best_fitness: float, population_genes: PopulationGenes) -> bool:
+        genes = population_genes()
+        if self.min_distinct_ratio is not None  and  distinct_ratio(genes) < self.min_distinct_ratio:
+            return True
+        return self.min_spread is not None  and  hamming_spread(genes) < self.min_spread
+
+    def __str__(self) -> str:
+        return "diversity"
+
+    def __repr__(self) -> str:
+        return f"DiversityTermination({self.min_distinct_ratio}, {self.min_spread})"
+
+
+"""Stops once the run has taken 'seconds' of wall-clock time"""
+class TimeBudgetTermination(TerminationPolicy):
+    def __init__(self, seconds: float) -> None:
+        super().__init__()
+        assert seconds > 0
+        self.seconds: float = seconds
+
+    def start(self, best_fitness: float) -> None:
+        self.deadline: float = time.monotonic() + self.seconds
+
+    def should_stop(self, n_generation: int, best_fitness: float, population_genes: PopulationGenes) -> bool:
+        return time.monotonic() >= self.deadline
+
+    def __str__(self) -> str:
+        return "time_budget"
+
+    def __repr__(self) -> str:
+        return f"TimeBudgetTermination({self.seconds})"
+
+
+def start_policies(policies: List[TerminationPolicy], best_fitness: float) -> None:
+    for policy in policies:
+        policy.start(best_fitness)
+
+
+"""Stop reason of the first policy that stops the run, or None to keep running.
+Every policy sees every generation, so their states stay up to date"""
+def stop_reason(
+    policies: List[TerminationPolicy],
+    n_generation: int,
+    best_fitness: float,
+    population_genes: PopulationGenes
+) -> Optional[str]:
+    reason: Optional[str] = None
+    for policy in policies:
+        if policy.should_stop(n_generation, best_fitness, population_genes)  and  reason is None:
+            reason = policy.__str__()
+    return reason
+
+
+"""Reason of a run that no policy stopped"""
+def final_stop_reason(best_fitness: float, stop_fitness: float) -> str:
+    return OPTIMUM if best_fitness <= stop_fitness else MAX_ITERATIONS
\ No newline at end of file
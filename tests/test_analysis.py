@@ -0,0 +1,74 @@
+from result_sink import SimulationRecord, TextResultSink, format_record
+import random
+import analysis
+
+
+def make_records(generator, n):
+    records = []
+    for _ in range(n):
+        best_fitness = generator.choice([0.0, 0.0, 1.5, 4.0, 12.0])
+        records.append(SimulationRecord(
+            generator.randint(1, 250), best_fitness, ("+", "*", "-"), 10, generator.choice([2, 4]), "constant",
+            generator.choice(["roulette", "deterministic"]), "one_point_random", 0.8, "string", 0.2, "deterministic",
+            best_fitness, "optimum" if best_fitness == 0 else generator.choice(["stagnation", "max_iterations"])
+        ))
+    return records
+
+
+def write_records(path, records):
+    with TextResultSink(str(path)) as sink:
+        for record in records:
+            sink.write(record)
+
+
+def summary_lists(summary):
+    return {key: stats.to_list() for (key,stats) in summary.configurations.items()}
+
+
+def test_aggregate_groups_the_runs(tmp_path):
+    records = make_records(random.Random(10), 200)
+    write_records(tmp_path / "results_0.txt", records[:120])
+    write_records(tmp_path / "results_1.txt", records[120:])
+
+    groups = analysis.aggregate([str(tmp_path / "results_0.txt"), str(tmp_path / "results_1.txt")], ["selection_method"], use_index=False)
+    assert sorted(groups) == [("deterministic",), ("roulette",)]
+    for ((selection_method,),stats) in groups.items():
+        runs = [record for record in records if record.selection_method == selection_method]
+        assert stats.runs == len(runs)
+        assert stats.best_fitness == min(record.best_fitness for record in runs)
+        assert stats.generations_sum == sum(record.n_generation for record in runs)
+        assert stats.solved == sum(1 for record in runs if record.gap_to_optimum == 0)
+        assert sum(stats.stop_reasons.values()) == len(runs)
+        assert stats.stop_reasons.get("optimum", 0) == stats.solved
+
+
+def test_index_round_trip_and_appends(tmp_path):
+    path = tmp_path / "results_0.txt"
+    records = make_records(random.Random(11), 60)
+    write_records(path, records[:40])
+
+    summary = analysis.summarize_file(str(path))
+    loaded = analysis.load_index(str(path) + analysis.INDEX_SUFFIX)
+    assert (loaded.offset, loaded.tail_hash, summary_lists(loaded)) == (summary.offset, summary.tail_hash, summary_lists(summary))
+
+    # A line still being written is left for the next scan
+    write_records(path, records[40:])
+    with open(path, "a") as f:
+        f.write(format_record(records[0])[:20])
+    incremental = analysis.summarize_file(str(path))
+    assert sum(stats.runs for stats in incremental.configurations.values()) == 60
+    assert summary_lists(incremental) == summary_lists(analysis.summarize_file(str(path), use_index=False))
+
+    with open(path, "a") as f:
+        f.write(format_record(records[0])[20:])
+    assert sum(stats.runs for stats in analysis.summarize_file(str(path)).configurations.values()) == 61
+
+
+def test_rewritten_file_invalidates_the_index(tmp_path):
+    path = tmp_path / "results_0.txt"
+    write_records(path, make_records(random.Random(12), 30))
+    analysis.summarize_file(str(path))
+
+    path.unlink()
+    write_records(path, make_records(random.Random(13), 30))
+    assert summary_lists(analysis.summarize_file(str(path))) == summary_lists(analysis.summarize_file(str(path), use_index=False))
\ No newline at end of file
@@ -0,0 +1,26 @@
+import batch
+import pytest
+
+PUZZLES = [
+    batch.PuzzleInstance("a", [75, 3, 1, 4], 852),
+    batch.PuzzleInstance("b", [1, 2, 3], 6),
+]
+
+
+def test_every_format_reads_the_same_puzzles(tmp_path):
+    (tmp_path / "puzzles.jsonl").write_text('{"id": "a", "values": [75, 3, 1, 4], "target": 852}\n\n{"id": "b", "values": [1, 2, 3], "target": 6}\n')
+    (tmp_path / "puzzles.json").write_text('[{"id": "a", "values": [75, 3, 1, 4], "target": 852}, {"id": "b", "values": [1, 2, 3], "target": 6}]')
+    (tmp_path / "puzzles.csv").write_text('id,values,target\na,"75,3,1,4",852\nb,1 2 3,6\n')
+
+    for extension in ["jsonl", "json", "csv"]:
+        puzzles = list(batch.read_puzzles(str(tmp_path / f"puzzles.{extension}")))
+        assert puzzles == PUZZLES
+        assert all(type(puzzle.target_value) is int for puzzle in puzzles)
+
+
+def test_non_list_json_and_unknown_formats_are_rejected(tmp_path):
+    (tmp_path / "puzzles.json").write_text('{"id": "a", "values": [1, 2], "target": 3}')
+    with pytest.raises(ValueError):
+        list(batch.read_puzzles(str(tmp_path / "puzzles.json")))
+    with pytest.raises(ValueError):
+        batch.read_puzzles(str(tmp_path / "puzzles.txt"))
\ No newline at end of file
@@ -0,0 +1,56 @@
+from convergence_trace import ConvergenceTrace, TraceWriter, TraceReader, TraceRow
+import os
+import pytest
+
+
+def make_trace(n_generations, every=1):
+    trace = ConvergenceTrace(n_generations, every)
+    for generation in range(n_generations+1):
+        if trace.samples(generation):
+            trace.record(generation, 100.0/(generation+1), 200.0/(generation+1), 4, 1.0 - generation/(n_generations+1), 6)
+    return trace
+
+
+def write_traces(path, traces, append=False):
+    with TraceWriter(path, append) as writer:
+        for (key,trace) in traces:
+            writer.write(key, trace)
+
+
+def test_traces_round_trip(tmp_path):
+    path = str(tmp_path / "traces.bin")
+    traces = [("a", make_trace(10)), ("b", make_trace(30, 4)), ("a", make_trace(3)), ("empty", ConvergenceTrace(5))]
+    write_traces(path, traces)
+
+    with TraceReader(path) as reader:
+        assert reader.keys() == ["a", "b", "empty"]
+        assert reader.read_rows("a") == list(traces[0][1].rows())
+        assert reader.read_rows("b") == list(traces[1][1].rows())
+        assert reader.read_rows("a", occurrence=1) == list(traces[2][1].rows())
+        assert reader.read_rows("empty") == []
+        assert reader.read_rows("b")[1] == TraceRow(4, 20.0, 40.0, 4, 1.0 - 4/31, 6)
+
+
+@pytest.mark.parametrize("cut", [1, 100, 395, 404, 408])
+def test_truncated_block_is_skipped(tmp_path, cut):
+    path = str(tmp_path / "traces.bin")
+    write_traces(path, [("a", make_trace(10)), ("b", make_trace(10))])
+
+    # A writer killed in the middle of the last block: its header, key or columns are cut short
+    os.truncate(path, os.path.getsize(path) - cut)
+    with TraceReader(path) as reader:
+        assert reader.keys() == ["a"]
+        assert reader.read_rows("a") == list(make_trace(10).rows())
+
+    # Appending drops the partial block and writes after the complete ones
+    write_traces(path, [("c", make_trace(5))], append=True)
+    with TraceReader(path) as reader:
+        assert reader.keys() == ["a", "c"]
+        assert reader.read_rows("c") == list(make_trace(5).rows())
+
+
+def test_not_a_trace_file(tmp_path):
+    path = tmp_path / "traces.bin"
+    path.write_bytes(b"GAR2")
+    with pytest.raises(ValueError):
+        TraceReader(str(path))
\ No newline at end of file
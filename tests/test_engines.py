@@ -0,0 +1,75 @@
+from sequence.sequence_evaluator import SequenceEvaluator
+from sequence.sequence_generator import RandomSequencePopulationGenerator
+from operators.selection import RouletteWheelSelection, DeterministicSelector, TournamentSelection
+from operators.crossover import OnePointDeterministicCrossOver, OnePointRandomCrossOver, UniformCrossOver, TwoPointRandomCrossOver
+from operators.mutation import StringMutation
+from operators.best_selector import BestDeterministicSelector, BestProbabilisticSelector
+from lockstep_simulation import LockstepConfiguration, run_lockstep_simulations
+import itertools
+import random
+import pytest
+import array_simulation
+import m_updater
+import simulation
+import termination
+
+VALUES = [75, 3, 1, 4, 50, 6, 12, 8]
+# Out of reach, so no fitness is 0 (the roulette wheel divides by the fitness values)
+TARGET_VALUE = 10**9
+MAX_ITERATIONS = 40
+POPULATION_SIZE = 12
+SEED = 3
+
+CONFIGURATIONS = list(itertools.product(
+    [RouletteWheelSelection(), DeterministicSelector(), TournamentSelection(3)],
+    [OnePointDeterministicCrossOver(len(VALUES)//2), OnePointRandomCrossOver(), UniformCrossOver(), TwoPointRandomCrossOver()],
+    [BestDeterministicSelector, BestProbabilisticSelector],
+    [4, 8]
+))
+
+
+def make_population():
+    return RandomSequencePopulationGenerator.generate(len(VALUES)-1, POPULATION_SIZE, random.Random(SEED))
+
+
+def run(simulation_function, configuration, termination_policies=()):
+    (selection_method, crossover_operator, best_selector, m) = configuration
+    return simulation_function(
+        make_population(),
+        MAX_ITERATIONS,
+        m,
+        m_updater.MUpdaterMultiplicative(0.9),
+        True,
+        SequenceEvaluator(TARGET_VALUE, VALUES),
+        selection_method,
+        crossover_operator,
+        0.8,
+        StringMutation,
+        0.3,
+        best_selector,
+        output_file_name = None,
+        termination_policies = termination_policies,
+        generator = random.Random(SEED)
+    )
+
+
+@pytest.mark.parametrize("configuration", CONFIGURATIONS)
+def test_object_and_array_engines_give_the_same_record(configuration):
+    assert run(simulation.run_simulation, configuration) == run(array_simulation.run_array_simulation, configuration)
+
+
+def test_object_and_array_engines_stop_alike():
+    policies = (termination.StagnationTermination(5),)
+    for configuration in CONFIGURATIONS:
+        record = run(simulation.run_simulation, configuration, policies)
+        assert record == run(array_simulation.run_array_simulation, configuration, policies)
+        assert record.stop_reason in ("stagnation", termination.MAX_ITERATIONS)
+
+
+def test_lockstep_gives_the_array_engine_records():
+    configurations = [
+        LockstepConfiguration(make_population(), m, m_updater.MUpdaterMultiplicative(0.9), selection_method, crossover_operator, 0.8, StringMutation, 0.3, best_selector, random.Random(SEED))
+        for (selection_method, crossover_operator, best_selector, m) in CONFIGURATIONS
+    ]
+    records = run_lockstep_simulations(configurations, MAX_ITERATIONS, True, SequenceEvaluator(TARGET_VALUE, VALUES), output_file_name=None)
+    assert records == [run(array_simulation.run_array_simulation, configuration) for configuration in CONFIGURATIONS]
\ No newline at end of file
@@ -0,0 +1,17 @@
+from instrumentation import PhaseTimingCollector, SELECTION, EVALUATION
+from sequence.sequence_evaluator import SequenceEvaluator
+import pytest
+
+
+def test_a_raising_phase_is_closed():
+    collector = PhaseTimingCollector()
+    collector.start_run(SequenceEvaluator(852, [75, 3, 1, 4]))
+
+    with pytest.raises(ZeroDivisionError):
+        with collector.phase(SELECTION):
+            1/0
+    with collector.phase(EVALUATION, n_evaluations=8):
+        pass
+
+    assert (collector.current[SELECTION].calls, collector.current[SELECTION].evaluations) == (1, 0)
+    assert (collector.current[EVALUATION].calls, collector.current[EVALUATION].evaluations) == (1, 8)
\ No newline at end of file
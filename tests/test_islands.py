@@ -0,0 +1,37 @@
+from sequence.sequence_evaluator import SequenceEvaluator
+from sequence.sequence_generator import RandomSequencePopulationGenerator
+from operators.selection import RouletteWheelSelection, DeterministicSelector
+from operators.crossover import OnePointRandomCrossOver
+from operators.mutation import StringMutation
+from operators.best_selector import BestDeterministicSelector
+import m_updater
+import islands
+
+VALUES = [75, 3, 1, 4, 50, 6, 12, 8]
+POPULATION_SIZE = 14
+
+
+def run(seed, target_value, max_iterations):
+    configs = islands.island_configs(
+        4, seed, [RouletteWheelSelection(), DeterministicSelector()], [OnePointRandomCrossOver()], [0.6, 0.8], [StringMutation],
+        [0.2, 0.4], [BestDeterministicSelector], list(range(2, POPULATION_SIZE+1, 2)), [m_updater.MUpdaterMultiplicative(0.9)]
+    )
+    return islands.run_islands(
+        configs, RandomSequencePopulationGenerator, len(VALUES)-1, POPULATION_SIZE, SequenceEvaluator(target_value, VALUES),
+        True, max_iterations, 10, 2, in_process=True
+    )
+
+
+def test_solved_run_reports_the_generation_of_the_first_solution():
+    solved = [result for result in (run(seed, 852, 300) for seed in range(4)) if result.best_fitness == 0]
+    assert len(solved) > 0
+    for result in solved:
+        assert result.n_generation in result.island_generations
+        assert result.n_generation == min(result.island_generations)
+
+
+def test_unsolved_run_reports_every_generation():
+    result = run(0, 10**9, 35)
+    assert result.best_fitness > 0
+    assert result.n_generation == 35
+    assert result.island_generations == (35, 35, 35, 35)
\ No newline at end of file
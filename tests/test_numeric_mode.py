@@ -0,0 +1,58 @@
+from sequence.sequence import Sequence, calculate_operation_result, encode_operators
+from sequence.sequence_evaluator import SequenceEvaluator
+from sequence.numeric_mode import PythonNumericMode, RationalNumericMode, Float64NumericMode, SaturatingNumericMode, UNDEFINED_FITNESS
+from operators.selection import RouletteWheelSelection
+import math
+import random
+import pytest
+
+NUMERIC_MODES = [PythonNumericMode(), RationalNumericMode(), Float64NumericMode(), SaturatingNumericMode()]
+
+
+"""The fitness of an operator list from every evaluation path of the evaluator"""
+def fitness_values(numeric_mode, operators, values, target_value):
+    evaluator = SequenceEvaluator(target_value, values, numeric_mode)
+    individual = Sequence(operators)
+    evaluator.evaluate_individual(individual)
+    population = [Sequence(operators)]
+    evaluator.evaluate_population(population)
+    [(_, batched)] = evaluator.evaluate_operator_codes([encode_operators(operators)])
+    return [individual.get_fitness_value(), population[0].get_fitness_value(), batched]
+
+
+@pytest.mark.parametrize("numeric_mode", NUMERIC_MODES, ids=str)
+def test_division_by_zero_is_undefined(numeric_mode):
+    values = [4, 0, 3]
+    result = calculate_operation_result(["/", "+"], numeric_mode.convert(values), numeric_mode)
+    assert math.isnan(result)
+    assert numeric_mode.fitness(result, 7) == UNDEFINED_FITNESS
+    assert fitness_values(numeric_mode, ["/", "+"], values, 7) == [UNDEFINED_FITNESS]*3
+
+
+@pytest.mark.parametrize("numeric_mode", NUMERIC_MODES, ids=str)
+def test_undefined_stays_undefined(numeric_mode):
+    # Nothing after the division by zero makes the result defined again, not even '* 0'
+    assert fitness_values(numeric_mode, ["/", "*", "-"], [4, 0, 0, 1], 7) == [UNDEFINED_FITNESS]*3
+
+
+@pytest.mark.parametrize("numeric_mode", NUMERIC_MODES, ids=str)
+def test_defined_results_are_exact_distances(numeric_mode):
+    assert fitness_values(numeric_mode, ["+", "*", "-"], [4, 2, 3, 1], 20) == [3]*3
+    assert fitness_values(numeric_mode, ["/"], [1, 4], 1) == [0.75]*3
+
+
+@pytest.mark.parametrize("numeric_mode", NUMERIC_MODES, ids=str)
+def test_huge_results_are_bounded(numeric_mode):
+    values = [10**300]*4
+    operators = ["*"]*3
+    fitness_value = fitness_values(numeric_mode, operators, values, 1)[0]
+    if isinstance(numeric_mode, SaturatingNumericMode):
+        assert fitness_value == numeric_mode.limit - 1
+    else:
+        assert fitness_value == UNDEFINED_FITNESS
+
+
+def test_roulette_wheel_accepts_undefined_fitness():
+    fitness_values = [UNDEFINED_FITNESS]*9 + [3.0]
+    selected = RouletteWheelSelection().select_indices(fitness_values, 6, True, random.Random(0))
+    assert len(selected) == 6  and  all(0 <= i < len(fitness_values) for i in selected)
\ No newline at end of file
@@ -0,0 +1,23 @@
+from population import PopulationSnapshot
+from sequence.sequence_evaluator import SequenceEvaluator
+from sequence.sequence_generator import RandomSequencePopulationGenerator
+from operators.mutation import StringMutation
+import random
+import simulation
+
+VALUES = [75, 3, 1, 4, 50, 6, 12, 8]
+
+
+def test_snapshot_prototypes_unchanged_by_their_clones():
+    generator = random.Random(2)
+    evaluator = SequenceEvaluator(852, VALUES)
+    snapshot = PopulationSnapshot(RandomSequencePopulationGenerator.generate(len(VALUES)-1, 30, generator), evaluator)
+    state = [(prototype.get_genes(), prototype.get_fitness_value(), tuple(prototype.prefix_results)) for prototype in snapshot.prototypes]
+
+    for _ in range(3):
+        population = snapshot.population()
+        simulation.mutate_population(population, StringMutation, 1.0, generator)
+        evaluator.evaluate_population(population)
+
+    assert [(prototype.get_genes(), prototype.get_fitness_value(), tuple(prototype.prefix_results)) for prototype in snapshot.prototypes] == state
+    assert snapshot.fitness_values() == [fitness_value for (_,fitness_value,_) in state]
\ No newline at end of file
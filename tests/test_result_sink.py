@@ -0,0 +1,51 @@
+from result_sink import SimulationRecord, TextResultSink, BinaryResultSink, SQLiteResultSink
+import ast
+import sqlite3
+
+RECORDS = [
+    SimulationRecord(12, 0.0, ("+", "*", "-"), 20, 4, "multiplicative_0.9", "roulette", "one_point_random", 0.8, "string", 0.2, "deterministic", 0.0, "optimum"),
+    SimulationRecord(250, 3.5, ("/", "/", "+"), 14, 6, "constant", "tournament_3", "uniform_0.5", 0.6, "string", 0.4, "probabilistic", 1.5, "max_iterations"),
+    SimulationRecord(40, 17.0, ("-", "-", "*"), 8, 2, "constant", "deterministic", "two_point_random", 1.0, "string", 0.0, "deterministic", None, None),
+]
+
+
+def write_all(sink):
+    with sink:
+        for record in RECORDS:
+            sink.write(record)
+
+
+def test_text_sink_writes_one_line_per_record(tmp_path):
+    path = str(tmp_path / "results.txt")
+    write_all(TextResultSink(path, buffer_size=2))
+
+    with open(path) as f:
+        lines = f.read().splitlines()
+    assert len(lines) == len(RECORDS)
+    for (line,record) in zip(lines, RECORDS):
+        fields = line.split(";")
+        assert int(fields[0]) == record.n_generation
+        assert float(fields[1]) == record.best_fitness
+        assert tuple(ast.literal_eval(fields[2])) == record.best_genes
+        named = dict(field.split("=", 1) for field in fields[3:] if field != "")
+        assert named["selection_method"] == record.selection_method
+        assert named["crossover_operator"] == record.crossover_operator
+        assert named.get("gap_to_optimum") == (None if record.gap_to_optimum is None else str(record.gap_to_optimum))
+        assert named.get("stop_reason") == record.stop_reason
+
+
+def test_binary_sink_round_trip(tmp_path):
+    path = str(tmp_path / "results.bin")
+    # Two blocks, since the buffer is flushed after every two records
+    write_all(BinaryResultSink(path, buffer_size=2))
+    assert list(BinaryResultSink.read(path)) == RECORDS
+
+
+def test_sqlite_sink_round_trip(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    write_all(SQLiteResultSink(path, buffer_size=2))
+
+    connection = sqlite3.connect(path)
+    rows = connection.execute("SELECT * FROM results ORDER BY rowid").fetchall()
+    connection.close()
+    assert [SimulationRecord(*row)._replace(best_genes=tuple(row[2].split(" "))) for row in rows] == RECORDS
\ No newline at end of file
@@ -0,0 +1,94 @@
+from operators.selection import RouletteWheelSelection, DeterministicSelector, TournamentSelection, best_indices
+from operators.best_selector import BestDeterministicSelector, BestProbabilisticSelector
+import collections
+import random
+import pytest
+
+
+def random_fitness_values(generator, n):
+    return [generator.randint(1, 1000) for _ in range(n)]
+
+
+"""The roulette wheel before the binary search: a linear scan of the cumulative probabilities"""
+def linear_scan_roulette(fitness_values, m, minimize, generator):
+    probabilities = RouletteWheelSelection.get_probabilities(fitness_values, minimize)
+    cumulative_probabilities = {}
+    accumulator = 0
+    for (key,value) in enumerate(probabilities):
+        cumulative_probabilities[key] = value+accumulator
+        accumulator += value
+
+    selected = []
+    for _ in range(m):
+        p = generator.random()*sum(probabilities)
+        selected.append(next(k for (k,v) in cumulative_probabilities.items() if v>=p))
+    return selected
+
+
+@pytest.mark.parametrize("minimize", [True, False])
+def test_roulette_wheel_matches_linear_scan(minimize):
+    generator = random.Random(5)
+    for n in [1, 2, 7, 40, 200]:
+        fitness_values = random_fitness_values(generator, n)
+        m = generator.randint(1, n)
+        seed = generator.getrandbits(32)
+        assert RouletteWheelSelection().select_indices(fitness_values, m, minimize, random.Random(seed)) == linear_scan_roulette(fitness_values, m, minimize, random.Random(seed))
+
+
+"""The probabilistic best selector before the weighted sample: roulette draws until 'remove_size'
+distinct positions are drawn"""
+def rejection_removed_indices(fitness_values, remove_size, minimize, generator):
+    to_remove = set()
+    while len(to_remove) < remove_size:
+        to_remove.update(linear_scan_roulette(fitness_values, 1, minimize, generator))
+    return to_remove
+
+
+@pytest.mark.parametrize("minimize", [True, False])
+def test_probabilistic_best_selector_removes_with_the_same_distribution(minimize):
+    fitness_values = [1, 2, 4, 8, 16]
+    n_samples = 20000
+    sampled = collections.Counter()
+    rejected = collections.Counter()
+    (generator1, generator2) = (random.Random(6), random.Random(7))
+    for _ in range(n_samples):
+        sampled.update(BestProbabilisticSelector.select_removed_indices(fitness_values, 2, minimize, generator1))
+        rejected.update(rejection_removed_indices(fitness_values, 2, minimize, generator2))
+
+    for i in range(len(fitness_values)):
+        assert abs(sampled[i] - rejected[i])/n_samples < 0.02
+
+
+@pytest.mark.parametrize("minimize", [True, False])
+def test_partial_sort_selectors_match_a_full_sort(minimize):
+    generator = random.Random(8)
+    for n in [1, 2, 9, 40, 200]:
+        # Few distinct values, so that ties must keep the population order like a stable sort
+        fitness_values = [generator.randint(0, 10) for _ in range(n)]
+        full_sort = sorted(range(n), key=fitness_values.__getitem__, reverse=(not minimize))
+        for k in range(1, n+1):
+            assert best_indices(fitness_values, k, minimize) == full_sort[:k]
+            assert DeterministicSelector().select_indices(fitness_values, k, minimize) == full_sort[:k]
+            # Removing nothing keeps the population as it is, as it always did
+            kept = list(range(n)) if k == n else full_sort[:k]
+            assert BestDeterministicSelector.select_best_indices(fitness_values, n-k, minimize) == kept
+
+
+def test_ordered_values_select_a_prefix():
+    fitness_values = sorted(random_fitness_values(random.Random(9), 30))
+    for k in range(1, len(fitness_values)+1):
+        assert best_indices(fitness_values, k, True, ordered=True) == best_indices(fitness_values, k, True)
+
+
+@pytest.mark.parametrize("minimize", [True, False])
+def test_tournament_winners_are_the_best_of_their_draws(minimize):
+    fitness_values = random_fitness_values(random.Random(14), 50)
+    for k in [1, 2, 5]:
+        selected = TournamentSelection(k).select_indices(fitness_values, 20, minimize, random.Random(k))
+
+        draws = random.Random(k)
+        for winner in selected:
+            contenders = [int(draws.random()*len(fitness_values)) for _ in range(k)]
+            best = (min if minimize else max)(fitness_values[i] for i in contenders)
+            # The first of the best contenders wins
+            assert winner == next(i for i in contenders if fitness_values[i] == best)
\ No newline at end of file
@@ -0,0 +1,35 @@
+from sequence.sequence import calculate_operation_result
+from sequence.sequence_evaluator import SequenceEvaluator
+from sequence.sequence_generator import RandomSequencePopulationGenerator
+from operators.crossover import OnePointDeterministicCrossOver, OnePointRandomCrossOver, UniformCrossOver, TwoPointRandomCrossOver
+from operators.mutation import StringMutation
+import random
+import pytest
+import simulation
+
+VALUES = [75, 3, 1, 4, 50, 6, 12, 8]
+TARGET_VALUE = 852
+
+
+@pytest.mark.parametrize("crossover_operator", [
+    OnePointDeterministicCrossOver(len(VALUES)//2),
+    OnePointRandomCrossOver(),
+    UniformCrossOver(),
+    TwoPointRandomCrossOver()
+])
+def test_incremental_evaluation_after_crossover_and_mutation(crossover_operator):
+    generator = random.Random(1)
+    evaluator = SequenceEvaluator(TARGET_VALUE, VALUES)
+    population = RandomSequencePopulationGenerator.generate(len(VALUES)-1, 40, generator)
+    evaluator.evaluate_population(population)
+
+    for _ in range(5):
+        offspring = simulation.do_crossover(population.copy(), 0.9, crossover_operator, generator)
+        simulation.mutate_population(offspring, StringMutation, 0.5, generator)
+        evaluator.evaluate_population(offspring)
+
+        for child in offspring:
+            value = calculate_operation_result(list(child.get_genes()), VALUES)
+            assert child.get_value() == value
+            assert child.get_fitness_value() == abs(value - TARGET_VALUE)
+        population = offspring
\ No newline at end of file
@@ -0,0 +1,34 @@
+from sequence.sequence import encode_operators
+from sequence.sequence_cache import CachedSequenceEvaluator
+from sequence.sequence_evaluator import SequenceEvaluator
+from sequence.sequence_generator import RandomSequencePopulationGenerator
+import random
+
+VALUES = [75, 3, 1, 4, 50, 6, 12, 8]
+TARGET_VALUE = 852
+
+
+def test_cached_evaluation_matches_a_plain_one():
+    population = RandomSequencePopulationGenerator.generate(len(VALUES)-1, 60, random.Random(15))
+    expected = [individual.clone() for individual in population]
+    SequenceEvaluator(TARGET_VALUE, VALUES).evaluate_population(expected)
+
+    evaluator = CachedSequenceEvaluator(TARGET_VALUE, VALUES)
+    for _ in range(2):
+        evaluated = [individual.clone() for individual in population]
+        evaluator.evaluate_population(evaluated)
+        assert [(individual.get_value(), individual.get_fitness_value()) for individual in evaluated] == [(individual.get_value(), individual.get_fitness_value()) for individual in expected]
+    assert evaluator.cache.hits == len(population)  and  evaluator.cache.misses == len(population)
+
+
+def test_entries_without_prefix_results_are_not_hits():
+    population = RandomSequencePopulationGenerator.generate(len(VALUES)-1, 20, random.Random(16))
+    evaluator = CachedSequenceEvaluator(TARGET_VALUE, VALUES)
+    evaluator.evaluate_operator_codes([encode_operators(individual.get_genes()) for individual in population])
+    assert (evaluator.cache.hits, evaluator.cache.misses) == (0, len(population))
+
+    # The batched entries hold no prefix results, so the individuals are still computed
+    evaluator.evaluate_population([individual.clone() for individual in population])
+    assert (evaluator.cache.hits, evaluator.cache.misses) == (0, 2*len(population))
+    evaluator.evaluate_operator_codes([encode_operators(individual.get_genes()) for individual in population])
+    assert evaluator.cache.hits == len(population)
\ No newline at end of file
@@ -0,0 +1,42 @@
+from sequence.sequence import ARITHMETIC_OPERATORS, calculate_operation_result
+from sequence.sequence_solver import BranchAndBoundSequenceSolver
+from sequence.numeric_mode import PythonNumericMode, RationalNumericMode, Float64NumericMode
+import itertools
+import random
+import pytest
+
+NUMERIC_MODES = [PythonNumericMode(), RationalNumericMode(), Float64NumericMode()]
+
+
+def instances():
+    generator = random.Random(4)
+    for _ in range(30):
+        # Small values, zeros included, so that some operator lists divide by zero
+        values = [generator.randint(0, 12) for _ in range(generator.randint(2, 6))]
+        yield values, generator.randint(-50, 500)
+
+
+def brute_force_fitness(target_value, values, numeric_mode):
+    converted = numeric_mode.convert(values)
+    return min(
+        numeric_mode.fitness(calculate_operation_result(list(operators), converted, numeric_mode), target_value)
+        for operators in itertools.product(ARITHMETIC_OPERATORS, repeat=len(values)-1)
+    )
+
+
+@pytest.mark.parametrize("numeric_mode", NUMERIC_MODES, ids=str)
+def test_solver_optimum_matches_brute_force(numeric_mode):
+    for (values, target_value) in instances():
+        best = BranchAndBoundSequenceSolver(target_value, values, numeric_mode).solve()
+        assert best.get_fitness_value() == brute_force_fitness(target_value, values, numeric_mode)
+
+        # The solution is an operator list with the optimum fitness
+        value = calculate_operation_result(list(best.get_genes()), numeric_mode.convert(values), numeric_mode)
+        assert numeric_mode.fitness(value, target_value) == best.get_fitness_value()
+
+
+def test_solver_gives_up_past_its_node_budget():
+    values = [75, 3, 1, 4, 50, 6, 12, 8]
+    solver = BranchAndBoundSequenceSolver(852, values, max_nodes=10)
+    assert solver.solve() is None
+    assert BranchAndBoundSequenceSolver(852, values).solve().get_fitness_value() == brute_force_fitness(852, values, PythonNumericMode())
\ No newline at end of file
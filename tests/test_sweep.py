@@ -0,0 +1,81 @@
+from sequence.sequence_evaluator import SequenceEvaluator
+from sequence.sequence_generator import RandomSequencePopulationGenerator
+from operators.selection import DeterministicSelector
+from operators.crossover import OnePointRandomCrossOver
+from operators.mutation import StringMutation
+from operators.best_selector import BestDeterministicSelector
+from result_sink import TextResultSink, BinaryResultSink
+from instrumentation import PhaseTimingCollector
+import itertools
+import pytest
+import array_simulation
+import m_updater
+import simulation
+import sweep
+
+VALUES = [75, 3, 1, 4, 50, 6, 12, 8]
+SETTINGS = sweep.SweepSettings(RandomSequencePopulationGenerator, SequenceEvaluator(852, VALUES), len(VALUES)-1, 20, True, seed=0)
+
+
+def build_tasks():
+    return sweep.build_tasks(1, [6], [DeterministicSelector()], [OnePointRandomCrossOver()], [0.2, 0.8], [StringMutation], [0.1, 0.5], [BestDeterministicSelector], [m_updater.MUpdaterMultiplicative(0.9)])
+
+
+def run_sweep(tasks, index, stop_after=None):
+    results = itertools.islice(sweep.run_sweep(tasks, SETTINGS), stop_after)
+    sweep.write_sweep_results(results, lambda task: "results.txt", index=index, checkpoint_size=1)
+
+
+def read_lines(directory):
+    with open(directory / "results.txt") as f:
+        return f.read().splitlines()
+
+
+def test_resumed_sweep_skips_the_completed_tasks(tmp_path, monkeypatch):
+    tasks = build_tasks()
+    (full, resumed) = (tmp_path / "full", tmp_path / "resumed")
+    full.mkdir()
+    resumed.mkdir()
+
+    monkeypatch.setattr(simulation, "RESULT_FILE_PATH", f"{full}/")
+    run_sweep(tasks, sweep.CompletedTaskIndex(str(full / "index.txt")))
+
+    # Interrupted after 5 tasks, then resumed from the index
+    monkeypatch.setattr(simulation, "RESULT_FILE_PATH", f"{resumed}/")
+    run_sweep(tasks, sweep.CompletedTaskIndex(str(resumed / "index.txt")), stop_after=5)
+    index = sweep.CompletedTaskIndex(str(resumed / "index.txt"))
+    assert len(index) == 5
+    pending = sweep.pending_tasks(tasks, index)
+    assert pending == tasks[5:]
+    run_sweep(pending, index)
+
+    # No task is run twice and the results are the ones of the uninterrupted sweep
+    assert read_lines(resumed) == read_lines(full)
+    assert len(sweep.CompletedTaskIndex(str(resumed / "index.txt"))) == len(tasks)
+    assert sweep.pending_tasks(tasks, sweep.CompletedTaskIndex(str(resumed / "index.txt"))) == []
+
+
+def test_reset_index_starts_from_scratch(tmp_path):
+    path = str(tmp_path / "index.txt")
+    sweep.CompletedTaskIndex(path).add_all([sweep.task_key(task) for task in build_tasks()])
+    assert len(sweep.CompletedTaskIndex(path)) == len(build_tasks())
+    assert len(sweep.CompletedTaskIndex(path, reset=True)) == 0
+
+
+def test_different_settings_keep_separate_indexes():
+    fingerprint = sweep.run_fingerprint(SETTINGS, TextResultSink)
+    assert sweep.run_fingerprint(SETTINGS, TextResultSink) == fingerprint
+    assert sweep.run_fingerprint(SETTINGS._replace(max_iterations=21), TextResultSink) != fingerprint
+    assert sweep.run_fingerprint(SETTINGS._replace(seed=1), TextResultSink) != fingerprint
+    assert sweep.run_fingerprint(SETTINGS, BinaryResultSink) != fingerprint
+
+
+def test_lockstep_sweep_gives_the_records_of_a_sweep():
+    tasks = build_tasks()
+    settings = SETTINGS._replace(simulation_function=array_simulation.run_array_simulation)
+    assert list(sweep.run_sweep(tasks, settings, lockstep_size=5)) == list(sweep.run_sweep(tasks, settings))
+
+
+def test_lockstep_sweep_rejects_phase_stats():
+    with pytest.raises(ValueError):
+        list(sweep.run_sweep(build_tasks(), SETTINGS, collector=PhaseTimingCollector(), lockstep_size=2))
\ No newline at end of file
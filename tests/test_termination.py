@@ -0,0 +1,37 @@
+import termination
+
+
+def no_genes():
+    raise AssertionError("The stagnation policy does not need the population")
+
+
+def test_stagnation_counts_from_the_initial_population():
+    policy = termination.StagnationTermination(3)
+    policy.start(10.0)
+    assert [policy.should_stop(n_generation, 10.0, no_genes) for n_generation in range(1, 5)] == [False, False, True, True]
+
+
+def test_stagnation_restarts_after_an_improvement():
+    policy = termination.StagnationTermination(3, min_delta=0.5)
+    policy.start(10.0)
+    assert not policy.should_stop(1, 10.0, no_genes)
+    assert not policy.should_stop(2, 9.0, no_genes)
+    # Improvements of at most 'min_delta' do not count
+    assert not policy.should_stop(3, 8.8, no_genes)
+    assert not policy.should_stop(4, 8.8, no_genes)
+    assert policy.should_stop(5, 8.8, no_genes)
+
+
+def test_diversity_stops_a_collapsed_population():
+    policy = termination.DiversityTermination(min_distinct_ratio=0.5)
+    policy.start(10.0)
+    assert not policy.should_stop(1, 10.0, lambda: [(0, 1), (1, 0), (2, 2), (0, 1)])
+    assert policy.should_stop(2, 10.0, lambda: [(0, 1), (0, 1), (0, 1), (0, 1)])
+
+
+def test_stop_reasons():
+    policies = [termination.StagnationTermination(1), termination.StagnationTermination(2)]
+    termination.start_policies(policies, 10.0)
+    assert termination.stop_reason(policies, 1, 10.0, no_genes) == "stagnation"
+    assert termination.final_stop_reason(0, 0) == termination.OPTIMUM
+    assert termination.final_stop_reason(3.0, 0) == termination.MAX_ITERATIONS
\ No newline at end of file
@@ -0,0 +1,26 @@
+from enum import IntEnum
+
+
+"""How much invariant checking the simulation and the operators do: OFF, CHEAP or FULL"""
+class ValidationLevel(IntEnum):
+    OFF = 0
+    CHEAP = 1
+    FULL = 2
+
+
+# Level of the current process. Sweep workers set it from their SweepSettings
+_level: ValidationLevel = ValidationLevel.FULL
+
+
+def set_validation_level(level: ValidationLevel) -> None:
+    global _level
+    _level = ValidationLevel(level)
+
+
+def get_validation_level() -> ValidationLevel:
+    return _level
+
+
+"""True when the checks of the given level have to be run"""
+def enabled(level: ValidationLevel) -> bool:
+    return _level >= level